@@ -0,0 +1,277 @@
+"""
+Adaptador de entrada - Captura continua de micrófono con buffer circular y VAD
+"""
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+import numpy as np
+from adapters.input.audio_processing import pcm_to_float32
+
+@dataclass
+class Utterance:
+    """Fragmento de voz delimitado por el VAD"""
+    samples: np.ndarray
+    sample_rate: int
+    started_at: float
+    ended_at: float
+    # Muestra absoluta de inicio: identifica el enunciado en sus parciales y en el final
+    segment_id: Optional[int] = None
+    # Empezó mientras sonaba una respuesta: puede ser el eco de JARVIS o el usuario interrumpiendo
+    during_playback: bool = False
+
+class AudioRingBuffer:
+    """Buffer circular preasignado de muestras float32"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buffer = np.zeros(capacity, dtype=np.float32)
+        self._total_written = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_written(self) -> int:
+        """Número absoluto de muestras escritas desde el inicio"""
+        return self._total_written
+
+    def write(self, samples: np.ndarray):
+        """Escribe muestras sobrescribiendo las más antiguas"""
+        count = samples.shape[0]
+        if count >= self.capacity:
+            samples = samples[-self.capacity:]
+            skipped = count - self.capacity
+            count = self.capacity
+        else:
+            skipped = 0
+
+        with self._lock:
+            start = (self._total_written + skipped) % self.capacity
+            first = min(count, self.capacity - start)
+            self._buffer[start:start + first] = samples[:first]
+            if first < count:
+                self._buffer[:count - first] = samples[first:]
+            self._total_written += skipped + count
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Copia las muestras en el rango absoluto [start, end)"""
+        with self._lock:
+            start = max(start, self._total_written - self.capacity, 0)
+            end = min(end, self._total_written)
+            if end <= start:
+                return np.zeros(0, dtype=np.float32)
+
+            first_index = start % self.capacity
+            count = end - start
+            first = min(count, self.capacity - first_index)
+            if first == count:
+                return self._buffer[first_index:first_index + count].copy()
+            return np.concatenate((self._buffer[first_index:], self._buffer[:count - first]))
+
+class EnergyVAD:
+    """Detector de actividad de voz por energía con umbral de ruido adaptativo"""
+
+    def __init__(
+        self,
+        sample_rate: int,
+        energy_threshold: float = 0.01,
+        noise_ratio: float = 3.0,
+        end_silence_ms: int = 600,
+        min_speech_ms: int = 250,
+        max_utterance_ms: int = 8000,
+        pre_roll_ms: int = 300
+    ):
+        self.energy_threshold = energy_threshold
+        self.noise_ratio = noise_ratio
+        self.end_silence_samples = int(sample_rate * end_silence_ms / 1000)
+        self.min_speech_samples = int(sample_rate * min_speech_ms / 1000)
+        self.max_utterance_samples = int(sample_rate * max_utterance_ms / 1000)
+        self.pre_roll_samples = int(sample_rate * pre_roll_ms / 1000)
+        self.noise_floor = energy_threshold / noise_ratio
+
+        self._speech_start: Optional[int] = None
+        self._last_voiced_end = 0
+        self._voiced_samples = 0
+
+    @property
+    def in_speech(self) -> bool:
+        """Indica si hay un segmento de voz abierto"""
+        return self._speech_start is not None
+
+    @property
+    def speech_start(self) -> Optional[int]:
+        """Muestra absoluta de inicio del segmento abierto"""
+        return self._speech_start
+
+    def process_frame(self, frame: np.ndarray, frame_end: int) -> Optional[Tuple[int, int]]:
+        """Procesa una trama y retorna (inicio, fin) absolutos cuando se cierra un segmento"""
+        rms = float(np.sqrt(np.mean(np.square(frame)))) if frame.size else 0.0
+        threshold = max(self.energy_threshold, self.noise_floor * self.noise_ratio)
+        voiced = rms > threshold
+        frame_start = frame_end - frame.shape[0]
+
+        if not voiced and self._speech_start is None:
+            # Seguir el ruido de fondo solo fuera de la voz
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * rms
+            return None
+
+        if voiced:
+            if self._speech_start is None:
+                self._speech_start = max(frame_start - self.pre_roll_samples, 0)
+                self._voiced_samples = 0
+            self._voiced_samples += frame.shape[0]
+            self._last_voiced_end = frame_end
+
+        too_long = frame_end - self._speech_start >= self.max_utterance_samples
+        ended = frame_end - self._last_voiced_end >= self.end_silence_samples
+        if not (too_long or ended):
+            return None
+
+        segment = (self._speech_start, frame_end)
+        long_enough = self._voiced_samples >= self.min_speech_samples
+        self._speech_start = None
+        self._voiced_samples = 0
+        return segment if long_enough else None
+
+def _put_dropping_oldest(target: queue.Queue, item):
+    """Encola sin bloquear la captura: si la cola está llena se descarta lo más antiguo"""
+    try:
+        target.put_nowait(item)
+    except queue.Full:
+        try:
+            target.get_nowait()
+        except queue.Empty:
+            pass
+        target.put_nowait(item)
+
+class StreamingMicrophoneCapture:
+    """Hilo de captura continua que corta enunciados y los encola para transcripción"""
+
+    def __init__(
+        self,
+        microphone,
+        utterance_queue: "queue.Queue[Utterance]",
+        ring_buffer_seconds: float = 30.0,
+        vad_options: Optional[dict] = None,
+        partial_queue: Optional["queue.Queue[Utterance]"] = None,
+        partial_interval_ms: int = 400,
+        partial_window_seconds: float = 6.0,
+        max_restarts: int = 5,
+        output_active: Optional[Callable[[], bool]] = None,
+        playback_tail_ms: int = 300
+    ):
+        self.microphone = microphone
+        self.utterance_queue = utterance_queue
+        self.ring_buffer_seconds = ring_buffer_seconds
+        self.vad_options = vad_options or {}
+        # Con partial_queue se publican instantáneas del enunciado en curso para la transcripción incremental
+        self.partial_queue = partial_queue
+        self.partial_interval_ms = partial_interval_ms
+        self.partial_window_seconds = partial_window_seconds
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        # Mientras suena una respuesta el micrófono oye a JARVIS: lo que se solape (más el eco) se marca
+        # para que el reconocedor distinga su propia voz de un barge-in
+        self.output_active = output_active
+        self.playback_tail_ms = playback_tail_ms
+        self.overlapping_playback = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Inicia el hilo de captura"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._capture_loop, name="jarvis-capture", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """Detiene la captura"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    @property
+    def is_alive(self) -> bool:
+        """Indica si el hilo de captura sigue en marcha"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _capture_loop(self):
+        """Reabre el micrófono tras un error; abandona tras max_restarts fallos seguidos"""
+        failures = 0
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self._read_microphone()
+                return
+            except Exception as e:
+                # Un fallo tras un rato capturando no cuenta como fallo seguido
+                failures = 1 if time.monotonic() - started > 30.0 else failures + 1
+                if failures > self.max_restarts:
+                    print(f"❌ Error en captura de audio, se abandona la captura continua: {e}")
+                    return
+                print(f"⚠️ Error en captura de audio, reabriendo el micrófono: {e}")
+                self.restarts += 1
+                self._stop_event.wait(min(0.5 * 2 ** failures, 10.0))
+
+    def _read_microphone(self):
+        """Lee tramas del micrófono, alimenta el buffer circular y el VAD"""
+        with self.microphone as source:
+            sample_rate = source.SAMPLE_RATE
+            ring = AudioRingBuffer(int(sample_rate * self.ring_buffer_seconds))
+            vad = EnergyVAD(sample_rate, **self.vad_options)
+            partial_interval = int(sample_rate * self.partial_interval_ms / 1000)
+            playback_tail = int(sample_rate * self.playback_tail_ms / 1000)
+            last_partial = 0
+            muted_until = 0
+
+            while not self._stop_event.is_set():
+                raw = source.stream.read(source.CHUNK)
+                frame = pcm_to_float32(raw, source.SAMPLE_WIDTH)
+                ring.write(frame)
+                if self.output_active is not None and self.output_active():
+                    muted_until = ring.total_written + playback_tail
+
+                segment = vad.process_frame(frame, ring.total_written)
+                if segment:
+                    during_playback = segment[0] < muted_until
+                    if during_playback:
+                        self.overlapping_playback += 1
+                    self._emit(ring, segment, sample_rate, during_playback)
+                elif (
+                    self.partial_queue is not None
+                    and vad.in_speech
+                    and ring.total_written - max(last_partial, vad.speech_start) >= partial_interval
+                ):
+                    self._emit_partial(ring, vad.speech_start, sample_rate, vad.speech_start < muted_until)
+                    last_partial = ring.total_written
+
+    def _emit(self, ring: AudioRingBuffer, segment: Tuple[int, int], sample_rate: int, during_playback: bool = False):
+        """Extrae el enunciado del buffer y lo entrega a la cola"""
+        start, end = segment
+        now = time.time()
+        utterance = Utterance(
+            samples=ring.read(start, end),
+            sample_rate=sample_rate,
+            started_at=now - (ring.total_written - start) / sample_rate,
+            ended_at=now,
+            segment_id=start,
+            during_playback=during_playback
+        )
+        _put_dropping_oldest(self.utterance_queue, utterance)
+
+    def _emit_partial(self, ring: AudioRingBuffer, start: int, sample_rate: int, during_playback: bool = False):
+        """Entrega la ventana más reciente del enunciado abierto; solo interesa la última instantánea"""
+        end = ring.total_written
+        window_start = max(start, end - int(sample_rate * self.partial_window_seconds))
+        now = time.time()
+        partial = Utterance(
+            samples=ring.read(window_start, end),
+            sample_rate=sample_rate,
+            started_at=now - (end - start) / sample_rate,
+            ended_at=now,
+            segment_id=start,
+            during_playback=during_playback
+        )
+        _put_dropping_oldest(self.partial_queue, partial)
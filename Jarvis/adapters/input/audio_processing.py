@@ -0,0 +1,116 @@
+"""
+Adaptador de entrada - Procesamiento de audio en memoria
+"""
+import wave
+from math import gcd
+import numpy as np
+from scipy.signal import resample_poly
+
+WHISPER_SAMPLE_RATE = 16000
+
+def pcm_to_float32(raw_data: bytes, sample_width: int, channels: int = 1) -> np.ndarray:
+    """Convierte PCM entero intercalado a float32 mono normalizado en [-1, 1]"""
+    if sample_width == 1:
+        samples = np.frombuffer(raw_data, dtype=np.uint8).astype(np.float32)
+        samples = (samples - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(raw_data, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        # PCM de 24 bits: se expande a int32 desplazando al byte alto
+        triplets = np.frombuffer(raw_data, dtype=np.uint8).reshape(-1, 3)
+        padded = np.zeros((triplets.shape[0], 4), dtype=np.uint8)
+        padded[:, 1:] = triplets
+        samples = padded.view("<i4").reshape(-1).astype(np.float32) / 2147483648.0
+    elif sample_width == 4:
+        samples = np.frombuffer(raw_data, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Ancho de muestra no soportado: {sample_width}")
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+
+    return samples
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int = WHISPER_SAMPLE_RATE) -> np.ndarray:
+    """Remuestrea con un filtro polifásico vectorizado"""
+    if source_rate == target_rate or samples.size == 0:
+        return samples
+
+    divisor = gcd(source_rate, target_rate)
+    resampled = resample_poly(samples, target_rate // divisor, source_rate // divisor)
+    return resampled.astype(np.float32, copy=False)
+
+def trim_silence(
+    samples: np.ndarray,
+    sample_rate: int,
+    threshold_db: float = -35.0,
+    padding_ms: int = 200,
+    frame_ms: int = 20,
+    floor: float = 1e-3
+) -> np.ndarray:
+    """Recorta el silencio inicial y final según la energía RMS por trama (vacío si no hay voz)"""
+    frame_length = max(1, sample_rate * frame_ms // 1000)
+    frame_count = samples.size // frame_length
+    if frame_count == 0:
+        return samples
+
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    rms = np.sqrt(np.einsum("ij,ij->i", frames, frames) / frame_length)
+
+    # Umbral relativo a la trama más fuerte, con un mínimo absoluto para el ruido de fondo
+    threshold = max(floor, float(rms.max()) * 10.0 ** (threshold_db / 20.0))
+    voiced = np.flatnonzero(rms > threshold)
+    if voiced.size == 0:
+        return samples[:0]
+
+    padding = sample_rate * padding_ms // 1000
+    start = max(0, voiced[0] * frame_length - padding)
+    end = min(samples.size, (voiced[-1] + 1) * frame_length + padding)
+    return samples[start:end]
+
+def normalize_gain(samples: np.ndarray, target_rms_db: float = -20.0, max_gain: float = 10.0) -> np.ndarray:
+    """Lleva el audio a un nivel RMS fijo sin amplificar de más el ruido ni saturar"""
+    if samples.size == 0:
+        return samples
+    rms = float(np.sqrt(np.dot(samples, samples) / samples.size))
+    if rms <= 0.0:
+        return samples
+
+    gain = min(max_gain, 10.0 ** (target_rms_db / 20.0) / rms)
+    peak = float(np.abs(samples).max())
+    if peak * gain > 1.0:
+        gain = 1.0 / peak
+    return samples * np.float32(gain)
+
+def prepare_whisper_input(
+    samples: np.ndarray,
+    sample_rate: int,
+    trim: bool = True,
+    normalize: bool = True,
+    threshold_db: float = -35.0,
+    padding_ms: int = 200,
+    target_rms_db: float = -20.0
+) -> np.ndarray:
+    """Recorta silencio, remuestrea solo lo que queda y normaliza la ganancia en una pasada"""
+    if trim:
+        samples = trim_silence(samples, sample_rate, threshold_db, padding_ms)
+    samples = resample(samples, sample_rate)
+    if normalize:
+        samples = normalize_gain(samples, target_rms_db)
+    return np.ascontiguousarray(samples, dtype=np.float32)
+
+def load_wav(path: str) -> np.ndarray:
+    """Carga un WAV PCM como float32 mono a 16 kHz"""
+    with wave.open(path, "rb") as wav_file:
+        raw = wav_file.readframes(wav_file.getnframes())
+        samples = pcm_to_float32(raw, wav_file.getsampwidth(), wav_file.getnchannels())
+        return resample(samples, wav_file.getframerate())
+
+def save_wav(path: str, samples: np.ndarray, sample_rate: int = WHISPER_SAMPLE_RATE):
+    """Guarda float32 mono como WAV PCM de 16 bits"""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm.tobytes())
@@ -0,0 +1,163 @@
+"""
+Adaptador de entrada - Planificador que agrupa enunciados pendientes en una sola pasada de Whisper
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, ContextManager, List, Tuple
+import numpy as np
+
+# Whisper procesa ventanas fijas de 30 s a 16 kHz
+WHISPER_WINDOW_SAMPLES = 30 * 16000
+
+# Mismos criterios que whisper.transcribe para descartar segmentos sin voz
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+
+_STOP = object()
+
+class BatchingASRScheduler:
+    """Reúne los enunciados que llegan dentro de una ventana corta y los decodifica en lote"""
+
+    def __init__(
+        self,
+        model_lease: Callable[[], ContextManager[Any]],
+        transcribe_single: Callable[[np.ndarray], str],
+        language: str = "es",
+        fp16: bool = False,
+        max_batch_size: int = 8,
+        max_wait_ms: int = 10,
+        result_timeout: float = 120.0
+    ):
+        self.model_lease = model_lease
+        self.transcribe_single = transcribe_single
+        self.language = language
+        self.fp16 = fp16
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.result_timeout = result_timeout
+        self.batches = 0
+        self.batched_items = 0
+        self.largest_batch = 0
+
+        self._pending: "queue.Queue" = queue.Queue()
+        # Tras close() no se acepta nada: un enunciado encolado detrás de _STOP no se procesaría nunca
+        self._closed = False
+        self._submit_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._schedule_loop, name="jarvis-asr-batch", daemon=True)
+        self._thread.start()
+
+    def submit(self, samples: np.ndarray) -> "Future[str]":
+        """Encola un enunciado (float32 mono a 16 kHz) y retorna el futuro de su texto"""
+        future: "Future[str]" = Future()
+        with self._submit_lock:
+            if self._closed:
+                future.set_exception(RuntimeError("El planificador de reconocimiento está cerrado"))
+            else:
+                self._pending.put((samples, future))
+        return future
+
+    def transcribe(self, samples: np.ndarray) -> str:
+        """Transcribe esperando a que se procese su lote (como mucho result_timeout segundos)"""
+        return self.submit(samples).result(timeout=self.result_timeout)
+
+    def close(self):
+        """Procesa lo pendiente y detiene el planificador; lo que no llegue a procesarse falla"""
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._pending.put(_STOP)
+        self._thread.join(timeout=30.0)
+
+        while True:
+            try:
+                item = self._pending.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                _, future = item
+                future.set_exception(RuntimeError("Planificador cerrado antes de procesar el enunciado"))
+
+    def _schedule_loop(self):
+        """Espera el primer enunciado y agrega los que lleguen hasta max_wait o max_batch_size"""
+        while True:
+            item = self._pending.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            stopping = False
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._pending.get(timeout=remaining) if remaining > 0 else self._pending.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._run_batch(batch)
+            if stopping:
+                return
+
+    def _run_batch(self, batch: List[Tuple[np.ndarray, Future]]):
+        """Audio de hasta 30 s va al lote; el más largo (o un lote de uno) usa la transcripción completa"""
+        batchable = [(samples, future) for samples, future in batch if samples.size <= WHISPER_WINDOW_SAMPLES]
+        single = [(samples, future) for samples, future in batch if samples.size > WHISPER_WINDOW_SAMPLES]
+        if len(batchable) == 1:
+            single += batchable
+            batchable = []
+
+        if batchable:
+            try:
+                texts = self._decode_batch([samples for samples, _ in batchable])
+                for (_, future), text in zip(batchable, texts):
+                    future.set_result(text)
+                self.batches += 1
+                self.batched_items += len(batchable)
+                self.largest_batch = max(self.largest_batch, len(batchable))
+            except Exception as e:
+                print(f"❌ Error en lote de reconocimiento: {e}")
+                single += batchable
+
+        for samples, future in single:
+            try:
+                future.set_result(self.transcribe_single(samples))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _decode_batch(self, batch: List[np.ndarray]) -> List[str]:
+        """Una pasada del codificador y del decodificador sobre los espectrogramas apilados"""
+        import torch
+        import whisper
+
+        with self.model_lease() as model:
+            n_mels = model.dims.n_mels
+            mels = torch.stack([
+                whisper.log_mel_spectrogram(whisper.pad_or_trim(samples), n_mels=n_mels)
+                for samples in batch
+            ]).to(model.device)
+
+            options = whisper.DecodingOptions(language=self.language, fp16=self.fp16, without_timestamps=True)
+            with torch.no_grad():
+                results = whisper.decode(model, mels, options)
+
+        texts = []
+        for result in results:
+            silent = result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD
+            texts.append("" if silent else result.text)
+        return texts
+
+    def stats(self) -> dict:
+        """Contadores del planificador"""
+        return {
+            "batches": self.batches,
+            "batched_items": self.batched_items,
+            "largest_batch": self.largest_batch,
+            "pending": self._pending.qsize()
+        }
@@ -0,0 +1,80 @@
+"""
+Adaptador de entrada - Caché LRU de intenciones para transcripciones repetidas
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any, Dict, Tuple
+from core.domain.entities import CommandIntent, VoiceCommand
+from core.domain.services import CommandProcessor
+
+class CachedCommandProcessor(CommandProcessor):
+    """Memoiza cualquier CommandProcessor por (texto normalizado, confianza)"""
+
+    def __init__(self, processor: CommandProcessor, max_entries: int = 256):
+        self.processor = processor
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[Tuple[str, float], CommandIntent]" = OrderedDict()
+        self._version = self._patterns_version()
+        self._lock = threading.Lock()
+
+    def _patterns_version(self) -> Any:
+        """Versión de la tabla de patrones del procesador envuelto (si la expone)"""
+        return getattr(self.processor, "patterns_version", None)
+
+    def process_command(self, command: VoiceCommand) -> CommandIntent:
+        """Retorna una copia de la intención cacheada o la resuelve y la guarda"""
+        if self.max_entries <= 0:
+            return self.processor.process_command(command)
+
+        key = (" ".join(command.text.lower().split()), command.confidence)
+        with self._lock:
+            version = self._patterns_version()
+            if version != self._version:
+                # Cambió la tabla de patrones: las intenciones guardadas ya no son válidas
+                self._entries.clear()
+                self._version = version
+                self.invalidations += 1
+
+            intent = self._entries.get(key)
+            if intent is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._copy(intent)
+            self.misses += 1
+
+        intent = self.processor.process_command(command)
+
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = self._copy(intent)
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return intent
+
+    @staticmethod
+    def _copy(intent: CommandIntent) -> CommandIntent:
+        """Copia para que quien la reciba pueda modificarla sin alterar la caché"""
+        parameters = dict(intent.parameters) if intent.parameters is not None else None
+        return replace(intent, parameters=parameters)
+
+    def clear(self):
+        """Vacía la caché"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de la caché"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
@@ -0,0 +1,118 @@
+"""
+Adaptador de entrada - Compromiso temprano de la intención a partir de hipótesis parciales de Whisper
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional, Tuple
+from core.domain.entities import CommandType, VoiceCommand
+from core.domain.services import CommandProcessor
+
+# Intenciones con objetivo cerrado: "abrir chrome" no cambia aunque sigan palabras; "buscar ..." sí
+DEFAULT_EARLY_COMMIT_INTENTS = (
+    CommandType.OPEN_APPLICATION.value,
+    CommandType.SYSTEM_CONTROL.value,
+    CommandType.MEDIA_CONTROL.value,
+    CommandType.INFORMATION.value
+)
+
+@dataclass
+class _SegmentState:
+    """Hipótesis vistas de un enunciado en curso"""
+    last_key: Optional[Tuple[CommandType, Optional[str]]] = None
+    stable_count: int = 0
+    speculated_key: Optional[Tuple[CommandType, Optional[str]]] = None
+    committed: bool = False
+    closed: bool = False
+
+class EarlyIntentCommit:
+    """Decide cuándo una intención parcial es estable y puede ejecutarse antes de que termine el enunciado"""
+
+    def __init__(
+        self,
+        command_processor: CommandProcessor,
+        wake_word: str = "jarvis",
+        eligible_intents: Iterable[str] = DEFAULT_EARLY_COMMIT_INTENTS,
+        stable_partials: int = 2,
+        max_segments: int = 16,
+        on_match: Optional[Callable[[VoiceCommand], Any]] = None
+    ):
+        self.command_processor = command_processor
+        self.wake_word = wake_word
+        self.eligible_intents = {CommandType(value) for value in eligible_intents}
+        self.stable_partials = max(stable_partials, 1)
+        self.max_segments = max_segments
+        # Se llama una vez por hipótesis fiable que no se compromete aquí (p. ej. para sintetizar la respuesta
+        # especulativamente); los parciales intermedios ("abrir chr", "abrir chro") no la disparan
+        self.on_match = on_match
+        self.commits = 0
+        self._segments: "OrderedDict[int, _SegmentState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _state(self, segment_id: int) -> _SegmentState:
+        """Estado del enunciado; se olvidan los más antiguos"""
+        state = self._segments.get(segment_id)
+        if state is None:
+            state = self._segments[segment_id] = _SegmentState()
+            while len(self._segments) > self.max_segments:
+                self._segments.popitem(last=False)
+        return state
+
+    def is_open(self, segment_id: int) -> bool:
+        """Indica si aún vale la pena decodificar parciales de este enunciado"""
+        with self._lock:
+            state = self._segments.get(segment_id)
+            return state is None or not (state.committed or state.closed)
+
+    def feed(self, segment_id: int, text: str, timestamp: float) -> Optional[VoiceCommand]:
+        """Procesa una hipótesis parcial; retorna el comando cuando la intención se repite stable_partials veces"""
+        text = " ".join(text.lower().split())
+        command = VoiceCommand(text=text, confidence=0.8, timestamp=timestamp)
+
+        key = None
+        if self.wake_word in text:
+            intent = self.command_processor.process_command(command)
+            if intent.recognized:
+                key = (intent.command_type, intent.target)
+
+        with self._lock:
+            state = self._state(segment_id)
+            if state.committed or state.closed:
+                return None
+            if key is None:
+                state.last_key, state.stable_count = None, 0
+                return None
+            if key == state.last_key:
+                state.stable_count += 1
+            else:
+                state.last_key, state.stable_count = key, 1
+            committed = key[0] in self.eligible_intents and state.stable_count >= self.stable_partials
+            if committed:
+                state.committed = True
+                self.commits += 1
+            # Sin objetivo la respuesta no depende del texto parcial; con objetivo se espera a que se repita.
+            # Lo comprometido no se especula: el núcleo lo sintetiza enseguida
+            speculate = (
+                not committed
+                and key != state.speculated_key
+                and (key[1] is None or state.stable_count >= 2)
+            )
+            if speculate:
+                state.speculated_key = key
+
+        if speculate and self.on_match:
+            self.on_match(command)
+        return command if committed else None
+
+    def close(self, segment_id: int):
+        """Marca el enunciado como terminado: sus parciales dejan de decodificarse"""
+        with self._lock:
+            self._state(segment_id).closed = True
+
+    def finish(self, segment_id: int) -> bool:
+        """Cierra el enunciado al llegar la transcripción final; True si ya se comprometió antes"""
+        with self._lock:
+            # Se conserva cerrado para ignorar los parciales que lleguen tarde
+            state = self._state(segment_id)
+            state.closed = True
+            return state.committed
@@ -0,0 +1,169 @@
+"""
+Adaptador de entrada - Motor compilado de coincidencia de intenciones
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from core.domain.entities import CommandType
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+MAX_PREFIX_VARIANTS = 64
+
+class AhoCorasickAutomaton:
+    """Autómata Aho-Corasick para encontrar muchas claves literales en una pasada"""
+
+    def __init__(self, keywords: Iterable[Tuple[str, int]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, int]]] = [[]]
+
+        for keyword, value in keywords:
+            self._add(keyword, value)
+        self._build_failure_links()
+
+    def _add(self, keyword: str, value: int):
+        """Inserta una clave en el trie"""
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((value, len(keyword)))
+
+    def _build_failure_links(self):
+        """Calcula los enlaces de fallo en anchura y propaga las salidas"""
+        pending = list(self._goto[0].values())
+        while pending:
+            next_pending = []
+            for state in pending:
+                for char, child in self._goto[state].items():
+                    fallback = self._fail[state]
+                    while fallback and char not in self._goto[fallback]:
+                        fallback = self._fail[fallback]
+                    self._fail[child] = self._goto[fallback].get(char, 0)
+                    if self._fail[child] == child:
+                        self._fail[child] = 0
+                    self._output[child] = self._output[child] + self._output[self._fail[child]]
+                    next_pending.append(child)
+            pending = next_pending
+
+    def search(self, text: str) -> Dict[int, int]:
+        """Retorna {valor: posición de la primera aparición} de las claves presentes"""
+        found: Dict[int, int] = {}
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for value, length in output[state]:
+                if value not in found:
+                    found[value] = index - length + 1
+        return found
+
+def literal_prefixes(pattern: str) -> Set[str]:
+    """Prefijos literales con los que debe empezar cualquier coincidencia del patrón"""
+    parsed = sre_parse.parse(pattern)
+    if parsed.state.flags & re.IGNORECASE:
+        return set()
+    prefixes, _ = _expand_prefixes(parsed, {""})
+    return prefixes if "" not in prefixes else set()
+
+def _expand_prefixes(items, prefixes: Set[str]) -> Tuple[Set[str], bool]:
+    """Extiende los prefijos con los elementos literales iniciales; indica si se consumió todo"""
+    for op, argument in items:
+        if op is sre_constants.LITERAL:
+            prefixes = {prefix + chr(argument) for prefix in prefixes}
+        elif op is sre_constants.IN and all(item_op is sre_constants.LITERAL for item_op, _ in argument):
+            # Clase de caracteres literal: [bc]
+            if len(prefixes) * len(argument) > MAX_PREFIX_VARIANTS:
+                return prefixes, False
+            prefixes = {prefix + chr(code) for prefix in prefixes for _, code in argument}
+        elif op is sre_constants.SUBPATTERN and not argument[1]:
+            prefixes, complete = _expand_prefixes(argument[-1], prefixes)
+            if not complete:
+                return prefixes, False
+        elif op is sre_constants.BRANCH:
+            # Alternancia: (pausar|reproducir|...)
+            expanded, complete = set(), True
+            for branch in argument[1]:
+                branch_prefixes, branch_complete = _expand_prefixes(branch, prefixes)
+                expanded |= branch_prefixes
+                complete = complete and branch_complete
+            if len(expanded) > MAX_PREFIX_VARIANTS:
+                return prefixes, False
+            prefixes = expanded
+            if not complete:
+                return prefixes, False
+        else:
+            return prefixes, False
+
+    return prefixes, True
+
+class CompiledIntentMatcher:
+    """Clasifica y extrae el objetivo con una pasada Aho-Corasick sobre la tabla de patrones"""
+
+    def __init__(self, command_patterns: Dict[CommandType, Sequence[str]]):
+        self._entries: List[Tuple[CommandType, "re.Pattern"]] = []
+        self._unanchored: List[int] = []
+        keywords = []
+
+        for command_type, patterns in command_patterns.items():
+            for pattern in patterns:
+                index = len(self._entries)
+                self._entries.append((command_type, re.compile(pattern)))
+                prefixes = literal_prefixes(pattern)
+                if prefixes:
+                    keywords.extend((prefix, index) for prefix in prefixes)
+                else:
+                    # Sin prefijo literal el patrón se verifica siempre
+                    self._unanchored.append(index)
+
+        self._automaton = AhoCorasickAutomaton(keywords)
+
+    @property
+    def pattern_count(self) -> int:
+        """Número de patrones compilados"""
+        return len(self._entries)
+
+    def match(self, text: str) -> Optional[Tuple[CommandType, Optional[str]]]:
+        """Retorna (tipo, objetivo) del patrón de mayor prioridad presente en el texto"""
+        candidates = self._automaton.search(text)
+        for index in self._unanchored:
+            candidates.setdefault(index, 0)
+
+        # Solo los patrones cuyo prefijo aparece pueden coincidir; se verifican por prioridad
+        for index in sorted(candidates):
+            command_type, regex = self._entries[index]
+            match = regex.search(text, candidates[index])
+            if match:
+                target = match.group(1) if regex.groups else None
+                return command_type, target
+
+        return None
+
+class KeywordMatcher:
+    """Búsqueda de palabras clave por subcadena en una sola pasada con prioridad por orden"""
+
+    def __init__(self, keyword_table: Sequence[Tuple[object, Sequence[str]]]):
+        self._labels = [label for label, _ in keyword_table]
+        self._automaton = AhoCorasickAutomaton(
+            (keyword, priority)
+            for priority, (_, keywords) in enumerate(keyword_table)
+            for keyword in keywords
+        )
+
+    def match(self, text: str, default=None):
+        """Retorna la etiqueta de mayor prioridad cuya palabra clave aparece en el texto"""
+        found = self._automaton.search(text)
+        return self._labels[min(found)] if found else default
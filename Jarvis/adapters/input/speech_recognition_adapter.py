@@ -1,85 +1,442 @@
-"""
-Adaptador de entrada - Reconocimiento de voz
-"""
-import speech_recognition as sr
-import whisper
-import tempfile
-import os
-from typing import Optional
-from core.domain.entities import VoiceCommand, SentimentType
-from core.domain.services import CommandProcessor
-
-class WhisperSpeechRecognitionAdapter:
-    """Adaptador para reconocimiento de voz usando Whisper"""
-    
-    def __init__(self):
-        self.whisper_model = whisper.load_model("base")
-        self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
-        
-        # Ajustar para ruido ambiental
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
-    
-    def listen(self) -> Optional[VoiceCommand]:
-        """Escucha y convierte voz a texto"""
-        try:
-            with self.microphone as source:
-                print("🎤 Escuchando...")
-                audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=5)
-            
-            # Usar Whisper para reconocimiento
-            audio_data = audio.get_wav_data()
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-            temp_file.write(audio_data)
-            temp_file.close()
-            
-            result = self.whisper_model.transcribe(temp_file.name, language="es")
-            command_text = result["text"].lower()
-            
-            os.unlink(temp_file.name)
-            
-            if command_text.strip():
-                return VoiceCommand(
-                    text=command_text,
-                    confidence=result.get("confidence", 0.8),
-                    timestamp=result.get("timestamp", 0.0)
-                )
-            
-        except Exception as e:
-            print(f"❌ Error en reconocimiento: {e}")
-        
-        return None
-
-class GoogleSpeechRecognitionAdapter:
-    """Adaptador para reconocimiento de voz usando Google Speech"""
-    
-    def __init__(self):
-        self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
-        
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
-    
-    def listen(self) -> Optional[VoiceCommand]:
-        """Escucha usando Google Speech API"""
-        try:
-            with self.microphone as source:
-                print("🎤 Escuchando...")
-                audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=5)
-            
-            command_text = self.recognizer.recognize_google(audio, language='es-ES').lower()
-            
-            if command_text.strip():
-                return VoiceCommand(
-                    text=command_text,
-                    confidence=0.9,
-                    timestamp=0.0
-                )
-            
-        except Exception as e:
-            print(f"❌ Error en reconocimiento: {e}")
-        
-        return None
-
-
+"""
+Adaptador de entrada - Reconocimiento de voz
+"""
+import queue
+import re
+import threading
+import time
+import speech_recognition as sr
+import numpy as np
+from typing import Callable, List, Optional, Tuple
+from core.domain.entities import VoiceCommand, SentimentType
+from core.domain.services import CommandProcessor, NullMetricsRecorder
+from config.application_config import SpeechConfig
+from adapters.input.audio_processing import WHISPER_SAMPLE_RATE, pcm_to_float32, prepare_whisper_input
+from adapters.input.audio_capture import StreamingMicrophoneCapture, Utterance
+from adapters.input.wake_word_detector import WakeWordDetector, resolve_templates_dir
+from adapters.input.whisper_backend import load_whisper_model, uses_fp16
+from adapters.input.batching_asr_scheduler import BatchingASRScheduler
+from adapters.input.early_intent_commit import EarlyIntentCommit
+from adapters.model_pool import ModelPool
+
+# Audio mínimo del primer parcial para decidir el filtro de activación de su enunciado
+PARTIAL_GATE_MIN_SECONDS = 1.0
+
+def matches_spoken_text(text: str, spoken_text: Optional[str], min_overlap: float = 0.6) -> bool:
+    """Indica si una transcripción es el eco de la respuesta que estaba sonando"""
+    words = re.sub(r"[^\w\s]", " ", text.lower()).split()
+    if not words or not spoken_text:
+        return not words
+    spoken_words = set(re.sub(r"[^\w\s]", " ", spoken_text.lower()).split())
+    return sum(word in spoken_words for word in words) / len(words) >= min_overlap
+
+class WhisperSpeechRecognitionAdapter:
+    """Adaptador para reconocimiento de voz usando Whisper"""
+    
+    def __init__(
+        self,
+        config: Optional[SpeechConfig] = None,
+        use_microphone: bool = True,
+        model_pool: Optional[ModelPool] = None,
+        transcribe: bool = True
+    ):
+        self.config = config or SpeechConfig()
+        self.metrics = NullMetricsRecorder()
+        
+        # Whisper importa torch: se carga aquí y no al importar el módulo; el pool puede descargarlo si queda inactivo
+        self.model_pool = model_pool or ModelPool()
+        self.model_key = f"whisper-{self.config.whisper_model}-{self.config.whisper_compute_type}-{self.config.whisper_device or 'auto'}"
+        self._load_model()
+        self._fp16 = uses_fp16(self.config)
+        self._language = self.config.language.split("-")[0]
+        
+        # Con varias fuentes concurrentes (servidor, repeticiones) los enunciados se decodifican en lote
+        self.batch_scheduler: Optional[BatchingASRScheduler] = None
+        if self.config.asr_batching:
+            self.batch_scheduler = BatchingASRScheduler(
+                lambda: self.model_pool.lease(self.model_key),
+                self._run_whisper,
+                language=self._language,
+                fp16=self._fp16,
+                max_batch_size=self.config.asr_max_batch_size,
+                max_wait_ms=self.config.asr_max_wait_ms
+            )
+        self.recognizer = sr.Recognizer()
+        self.microphone = sr.Microphone() if use_microphone else None
+        self.wake_word_detector = self._setup_wake_word_detector()
+        
+        # Ajustar para ruido ambiental (el VAD de la captura continua ya sigue el ruido de fondo)
+        if self.microphone and not self.config.streaming_capture:
+            with self.microphone as source:
+                self.recognizer.adjust_for_ambient_noise(source, duration=1)
+        
+        # Captura continua: el micrófono sigue escuchando mientras Whisper transcribe
+        self._capture: Optional[StreamingMicrophoneCapture] = None
+        self._utterances: "queue.Queue[Utterance]" = queue.Queue(maxsize=self.config.utterance_queue_size)
+        self._commands: "queue.Queue[VoiceCommand]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._decode_lock = threading.Lock()
+        # Transcripciones finales en curso: mientras haya alguna, los parciales ceden el modelo
+        self._finals_in_progress = 0
+        self._finals_lock = threading.Lock()
+        
+        # Lo que indique si JARVIS está hablando y qué dice (lo asigna la aplicación): lo que se oiga
+        # durante la respuesta solo se descarta si es su propia voz, así el usuario puede interrumpirla
+        self.output_active: Optional[Callable[[], bool]] = None
+        self.output_text: Optional[Callable[[], Optional[str]]] = None
+        
+        # Transcripción incremental: sin early_commit los parciales se descartan sin decodificar
+        self.early_commit: Optional[EarlyIntentCommit] = None
+        self.early_command_listeners: List[Callable[[VoiceCommand], None]] = []
+        self._partials: "queue.Queue[Utterance]" = queue.Queue(maxsize=1)
+        self._partial_worker: Optional[threading.Thread] = None
+        self._partial_stop = threading.Event()
+        # (segment_id, resultado) del filtro de activación: se evalúa una vez por enunciado
+        self._partial_gate: Optional[Tuple[int, bool]] = None
+        
+        # transcribe=False: los enunciados los consume otro (el runtime asíncrono); un trabajador propio
+        # arrancado aquí dejaría en _commands comandos que nadie lee
+        if self.microphone and self.config.streaming_capture:
+            self.start_streaming(transcribe=transcribe)
+    
+    def _load_model(self):
+        """Registra Whisper en el pool y lo carga en este proceso"""
+        self.model_pool.register(self.model_key, lambda: load_whisper_model(self.config))
+        self.model_pool.preload(self.model_key)
+    
+    def _setup_wake_word_detector(self) -> Optional[WakeWordDetector]:
+        """Carga las plantillas de la palabra de activación si el filtro está habilitado"""
+        if not self.config.wake_word_gate:
+            return None
+        templates_dir = resolve_templates_dir(self.config.wake_word_templates_dir)
+        if not templates_dir:
+            print("⚠️ Sin plantillas de palabra de activación: Whisper transcribirá todo el audio (ejecuta enroll_wake_word.py)")
+            return None
+        
+        detector = WakeWordDetector(threshold=self.config.wake_word_threshold)
+        if detector.load_templates(templates_dir) == 0:
+            return None
+        
+        print(f"✅ Filtro de palabra de activación con {len(detector.templates)} plantillas")
+        return detector
+    
+    def _passes_wake_word_gate(self, samples: np.ndarray) -> bool:
+        """Evita ejecutar Whisper sobre audio que no empieza con la palabra de activación"""
+        if not self.wake_word_detector:
+            return True
+        return bool(self.wake_word_detector.detect(samples))
+    
+    def start_streaming(self, transcribe: bool = True):
+        """Inicia el hilo de captura y, opcionalmente, el trabajador de transcripción"""
+        if not self.microphone:
+            return
+        if self._capture:
+            # Con transcribe=False los enunciados los consume quien llama (next_utterance)
+            if transcribe and not self._worker:
+                self._start_worker()
+            elif not transcribe and self._worker:
+                self._stop_worker()
+            return
+        
+        self._capture = StreamingMicrophoneCapture(
+            self.microphone,
+            self._utterances,
+            ring_buffer_seconds=self.config.ring_buffer_seconds,
+            vad_options={
+                "energy_threshold": self.config.vad_energy_threshold,
+                "end_silence_ms": self.config.vad_end_silence_ms,
+                "max_utterance_ms": self.config.vad_max_utterance_ms
+            },
+            partial_queue=self._partials if self.config.incremental_asr else None,
+            partial_interval_ms=self.config.partial_interval_ms,
+            partial_window_seconds=self.config.partial_window_seconds,
+            output_active=self._is_output_active if self.config.ignore_audio_while_speaking else None,
+            playback_tail_ms=self.config.playback_tail_ms
+        )
+        self._capture.start()
+        if transcribe:
+            self._start_worker()
+        if self.config.incremental_asr:
+            self._partial_stop.clear()
+            self._partial_worker = threading.Thread(target=self._partial_loop, name="jarvis-asr-partial", daemon=True)
+            self._partial_worker.start()
+        print("🎙️ Captura continua de audio activa")
+    
+    def _is_output_active(self) -> bool:
+        """Indica si está sonando una respuesta"""
+        return bool(self.output_active and self.output_active())
+    
+    def _is_own_speech(self, text: str) -> bool:
+        """Lo transcrito durante una respuesta coincide con lo que JARVIS estaba diciendo"""
+        spoken_text = self.output_text() if self.output_text else None
+        return matches_spoken_text(text, spoken_text)
+    
+    @property
+    def is_streaming(self) -> bool:
+        """Indica si la captura continua está activa"""
+        return self._capture is not None and self._capture.is_alive
+    
+    def _check_capture(self):
+        """Si el hilo de captura abandonó, se vuelve a la escucha bloqueante en lugar de esperar para siempre"""
+        if self._capture and not self._capture.is_alive:
+            print("⚠️ La captura continua se detuvo; se usa la escucha bloqueante")
+            self.stop_streaming()
+    
+    def _start_worker(self):
+        """Inicia el trabajador de transcripción"""
+        self._stop_event.clear()
+        self._worker = threading.Thread(target=self._transcription_loop, name="jarvis-asr", daemon=True)
+        self._worker.start()
+    
+    def _stop_worker(self):
+        """Detiene el trabajador de transcripción"""
+        self._stop_event.set()
+        if self._worker:
+            self._worker.join(timeout=2.0)
+            self._worker = None
+    
+    def stop_streaming(self):
+        """Detiene la captura continua"""
+        if self._capture:
+            self._capture.stop()
+            self._capture = None
+        self._stop_worker()
+        self._partial_stop.set()
+        if self._partial_worker:
+            self._partial_worker.join(timeout=2.0)
+            self._partial_worker = None
+    
+    def close(self):
+        """Libera los recursos del adaptador"""
+        self.stop_streaming()
+        if self.batch_scheduler:
+            self.batch_scheduler.close()
+    
+    def listen(self) -> Optional[VoiceCommand]:
+        """Escucha y convierte voz a texto"""
+        self._check_capture()
+        if self._capture:
+            try:
+                return self._commands.get(timeout=self.config.timeout)
+            except queue.Empty:
+                return None
+        
+        if not self.microphone:
+            return None
+        
+        try:
+            with self.microphone as source:
+                print("🎤 Escuchando...")
+                with self.metrics.timer("capture"):
+                    audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=5)
+            ended_at = time.time()
+            during_playback = self.config.ignore_audio_while_speaking and self._is_output_active()
+            
+            # Usar Whisper directamente sobre el buffer en memoria (sin WAV ni ffmpeg)
+            samples = self._prepare(pcm_to_float32(audio.get_raw_data(), audio.sample_width), audio.sample_rate)
+            if samples.size == 0 or not self._passes_wake_word_gate(samples):
+                return None
+            command = self._transcribe(samples, ended_at)
+            if command and during_playback and self._is_own_speech(command.text):
+                # Lo capturado se solapa con la respuesta en curso y es la propia voz de JARVIS
+                return None
+            return command
+        
+        except Exception as e:
+            print(f"❌ Error en reconocimiento: {e}")
+        
+        return None
+    
+    def transcribe_samples(self, samples: np.ndarray, timestamp: Optional[float] = None) -> Optional[VoiceCommand]:
+        """Transcribe audio ya capturado (float32 mono a 16 kHz) aplicando el filtro de activación"""
+        samples = self._prepare(samples, WHISPER_SAMPLE_RATE)
+        if samples.size == 0 or not self._passes_wake_word_gate(samples):
+            return None
+        return self._transcribe(samples, timestamp)
+    
+    def next_utterance(self, timeout: Optional[float] = None) -> Optional[Utterance]:
+        """Siguiente enunciado capturado, sin transcribir"""
+        try:
+            utterance = self._utterances.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if utterance.segment_id is not None and self.early_commit:
+            # El enunciado ya terminó: sus parciales pendientes no valen la pena
+            self.early_commit.close(utterance.segment_id)
+        return utterance
+    
+    def transcribe_utterance(self, utterance: Utterance) -> Optional[VoiceCommand]:
+        """Preprocesa, filtra por palabra de activación y transcribe un enunciado"""
+        self.metrics.observe("capture", utterance.ended_at - utterance.started_at)
+        if utterance.segment_id is not None and self.early_commit and self.early_commit.finish(utterance.segment_id):
+            # La intención ya se publicó a partir de un parcial
+            return None
+        with self._finals_lock:
+            self._finals_in_progress += 1
+        try:
+            samples = self._prepare(utterance.samples, utterance.sample_rate)
+            if samples.size == 0 or not self._passes_wake_word_gate(samples):
+                return None
+            command = self._transcribe(samples, utterance.ended_at)
+            if command and utterance.during_playback and self._is_own_speech(command.text):
+                # Empezó mientras sonaba la respuesta y es su eco: un barge-in real dice otra cosa
+                return None
+            return command
+        finally:
+            with self._finals_lock:
+                self._finals_in_progress -= 1
+    
+    def _final_pending(self) -> bool:
+        """Hay una transcripción final en curso o un enunciado terminado esperando"""
+        return self._finals_in_progress > 0 or not self._utterances.empty()
+    
+    def _transcription_loop(self):
+        """Consume enunciados de la cola y publica los comandos transcritos"""
+        while not self._stop_event.is_set():
+            utterance = self.next_utterance(timeout=0.5)
+            if utterance is None:
+                continue
+            
+            try:
+                command = self.transcribe_utterance(utterance)
+                if command:
+                    self._commands.put(command)
+            except Exception as e:
+                print(f"❌ Error en reconocimiento: {e}")
+    
+    def _partial_loop(self):
+        """Re-decodifica la ventana del enunciado en curso y compromete la intención cuando es estable"""
+        while not self._partial_stop.is_set():
+            try:
+                partial = self._partials.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            early_commit = self.early_commit
+            if early_commit is None or not early_commit.is_open(partial.segment_id) or self._final_pending():
+                # La transcripción final tiene prioridad sobre cualquier parcial
+                continue
+            
+            try:
+                samples = self._prepare(partial.samples, partial.sample_rate)
+                if samples.size == 0 or not self._partial_passes_gate(partial.segment_id, samples):
+                    continue
+                with self.metrics.timer("partial_transcription"):
+                    text = self._decode_partial(samples, partial.segment_id)
+                if text is None or (partial.during_playback and self._is_own_speech(text)):
+                    continue
+                command = early_commit.feed(partial.segment_id, text, time.time())
+            except Exception as e:
+                print(f"❌ Error en reconocimiento parcial: {e}")
+                continue
+            
+            if command:
+                print(f"⚡ Intención comprometida antes del final del enunciado: {command.text}")
+                self._publish_early(command)
+    
+    def _partial_passes_gate(self, segment_id: int, samples: np.ndarray) -> bool:
+        """Filtra el enunciado por palabra de activación en su primer parcial con audio suficiente"""
+        if not self.wake_word_detector:
+            return True
+        if self._partial_gate is not None and self._partial_gate[0] == segment_id:
+            return self._partial_gate[1]
+        if samples.size < WHISPER_SAMPLE_RATE * PARTIAL_GATE_MIN_SECONDS:
+            # La palabra de activación aún puede estar a medias: no se decodifica ni se decide
+            return False
+        passed = self._passes_wake_word_gate(samples)
+        self._partial_gate = (segment_id, passed)
+        return passed
+    
+    def _publish_early(self, command: VoiceCommand):
+        """Entrega el comando comprometido a la cola de comandos o a quien escuche"""
+        if self._worker:
+            self._commands.put(command)
+        for listener in self.early_command_listeners:
+            listener(command)
+    
+    def _prepare(self, samples: np.ndarray, sample_rate: int) -> np.ndarray:
+        """Recorta el silencio, remuestrea y normaliza: Whisper cuesta según la duración de la entrada"""
+        with self.metrics.timer("preprocess"):
+            return prepare_whisper_input(
+                samples,
+                sample_rate,
+                trim=self.config.trim_silence,
+                normalize=self.config.normalize_gain,
+                threshold_db=self.config.silence_threshold_db,
+                padding_ms=self.config.silence_padding_ms,
+                target_rms_db=self.config.target_rms_db
+            )
+    
+    def _transcribe(self, samples: np.ndarray, timestamp: Optional[float] = None) -> Optional[VoiceCommand]:
+        """Transcribe un buffer float32 a 16 kHz"""
+        with self.metrics.timer("transcription"):
+            command_text = self._decode(samples).lower()
+        
+        if command_text.strip():
+            return VoiceCommand(
+                text=command_text,
+                confidence=0.8,
+                timestamp=timestamp if timestamp is not None else 0.0
+            )
+        
+        return None
+    
+    def _decode(self, samples: np.ndarray) -> str:
+        """Decodifica por el planificador o directamente; parciales y finales no usan el modelo a la vez"""
+        if self.batch_scheduler:
+            return self.batch_scheduler.transcribe(samples)
+        with self._decode_lock:
+            return self._run_whisper(samples)
+    
+    def _decode_partial(self, samples: np.ndarray, segment_id: int) -> Optional[str]:
+        """Decodifica un parcial salvo que, al conseguir el modelo, ya espere una final o el enunciado haya cerrado"""
+        if self.batch_scheduler:
+            # El planificador no distingue parciales: la comprobación va antes de encolarlo
+            if self._final_pending() or not self.early_commit.is_open(segment_id):
+                return None
+            return self.batch_scheduler.transcribe(samples)
+        with self._decode_lock:
+            # Una final que esperaba el lock no queda detrás de más de un parcial
+            if self._final_pending() or not self.early_commit.is_open(segment_id):
+                return None
+            return self._run_whisper(samples)
+    
+    def _run_whisper(self, samples: np.ndarray) -> str:
+        """Transcripción completa de un solo enunciado"""
+        with self.model_pool.lease(self.model_key) as whisper_model:
+            result = whisper_model.transcribe(samples, language=self._language, fp16=self._fp16)
+        return result["text"]
+
+class GoogleSpeechRecognitionAdapter:
+    """Adaptador para reconocimiento de voz usando Google Speech"""
+    
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+        self.microphone = sr.Microphone()
+        
+        with self.microphone as source:
+            self.recognizer.adjust_for_ambient_noise(source, duration=1)
+    
+    def listen(self) -> Optional[VoiceCommand]:
+        """Escucha usando Google Speech API"""
+        try:
+            with self.microphone as source:
+                print("🎤 Escuchando...")
+                audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=5)
+            ended_at = time.time()
+            
+            command_text = self.recognizer.recognize_google(audio, language='es-ES').lower()
+            
+            if command_text.strip():
+                return VoiceCommand(
+                    text=command_text,
+                    confidence=0.9,
+                    timestamp=ended_at
+                )
+        
+        except Exception as e:
+            print(f"❌ Error en reconocimiento: {e}")
+        
+        return None
+
+
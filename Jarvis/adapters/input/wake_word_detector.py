@@ -0,0 +1,162 @@
+"""
+Adaptador de entrada - Detección ligera de palabra de activación (MFCC + DTW)
+"""
+import os
+from functools import lru_cache
+from typing import List, Optional
+import numpy as np
+from adapters.input.audio_processing import WHISPER_SAMPLE_RATE, load_wav
+
+FRAME_MS = 25
+HOP_MS = 10
+N_FFT = 512
+N_MELS = 26
+N_MFCC = 13
+
+# Plantillas del usuario (las graba enroll_wake_word.py) y, si no hay, las que acompañan al paquete
+USER_TEMPLATES_DIR = os.path.join(os.path.expanduser("~"), ".local", "share", "jarvis", "wake_word_templates")
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PACKAGE_TEMPLATES_DIR = os.path.join(PACKAGE_DIR, "wake_word_templates")
+
+def resolve_templates_dir(configured: Optional[str] = None) -> Optional[str]:
+    """Directorio de plantillas: el configurado (relativo al paquete) o el del usuario y luego el del paquete"""
+    if configured:
+        candidates = [os.path.join(PACKAGE_DIR, os.path.expanduser(configured))]
+    else:
+        candidates = [USER_TEMPLATES_DIR, PACKAGE_TEMPLATES_DIR]
+    for directory in candidates:
+        if os.path.isdir(directory) and any(name.lower().endswith(".wav") for name in os.listdir(directory)):
+            return directory
+    return None
+
+@lru_cache(maxsize=4)
+def _mel_filterbank(sample_rate: int, n_fft: int = N_FFT, n_mels: int = N_MELS) -> np.ndarray:
+    """Banco de filtros triangulares en escala mel"""
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+    mel_points = np.linspace(hz_to_mel(0.0), hz_to_mel(sample_rate / 2.0), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+
+    filterbank = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            filterbank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            filterbank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return filterbank
+
+@lru_cache(maxsize=4)
+def _dct_matrix(n_mfcc: int = N_MFCC, n_mels: int = N_MELS) -> np.ndarray:
+    """Matriz DCT-II ortonormal"""
+    n = np.arange(n_mels)
+    k = np.arange(n_mfcc)[:, None]
+    dct = np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * np.sqrt(2.0 / n_mels)
+    dct[0] /= np.sqrt(2.0)
+    return dct.astype(np.float32)
+
+def compute_mfcc(samples: np.ndarray, sample_rate: int = WHISPER_SAMPLE_RATE, normalize: bool = True) -> np.ndarray:
+    """Calcula MFCC (tramas x coeficientes), por defecto con normalización de media cepstral"""
+    frame_length = int(sample_rate * FRAME_MS / 1000)
+    hop_length = int(sample_rate * HOP_MS / 1000)
+    if samples.shape[0] < frame_length:
+        return np.zeros((0, N_MFCC - 1), dtype=np.float32)
+
+    emphasized = np.append(samples[0], samples[1:] - 0.97 * samples[:-1]).astype(np.float32)
+    n_frames = 1 + (emphasized.shape[0] - frame_length) // hop_length
+    frames = np.lib.stride_tricks.as_strided(
+        emphasized,
+        shape=(n_frames, frame_length),
+        strides=(emphasized.strides[0] * hop_length, emphasized.strides[0])
+    ) * np.hamming(frame_length).astype(np.float32)
+
+    power = np.abs(np.fft.rfft(frames, n=N_FFT)) ** 2 / N_FFT
+    mel_energy = np.log(power @ _mel_filterbank(sample_rate).T + 1e-10)
+    mfcc = mel_energy @ _dct_matrix().T
+
+    # Se descarta c0 (energía) y se normaliza por la media para tolerar ganancia y canal
+    mfcc = mfcc[:, 1:]
+    if normalize:
+        mfcc = mfcc - mfcc.mean(axis=0)
+    return mfcc.astype(np.float32)
+
+def sliding_mean_normalize(features: np.ndarray, span: int) -> np.ndarray:
+    """Resta a cada trama la media de las span tramas que la rodean (la misma extensión que la plantilla)"""
+    if features.shape[0] == 0:
+        return features
+    span = max(1, min(span, features.shape[0]))
+    cumulative = np.vstack((np.zeros((1, features.shape[1]), dtype=np.float64), np.cumsum(features, axis=0)))
+    starts = np.clip(np.arange(features.shape[0]) - span // 2, 0, features.shape[0] - span)
+    means = (cumulative[starts + span] - cumulative[starts]) / span
+    return (features - means).astype(np.float32)
+
+def subsequence_dtw(template: np.ndarray, query: np.ndarray) -> float:
+    """Distancia DTW normalizada del patrón contra cualquier subsecuencia de la consulta"""
+    if template.shape[0] == 0 or query.shape[0] == 0:
+        return np.inf
+
+    template_n = template / (np.linalg.norm(template, axis=1, keepdims=True) + 1e-8)
+    query_n = query / (np.linalg.norm(query, axis=1, keepdims=True) + 1e-8)
+    cost = 1.0 - template_n @ query_n.T
+
+    # Pasos (1,0), (1,1) y (1,2): cada fila depende solo de la anterior y se vectoriza
+    accumulated = cost[0].copy()
+    for i in range(1, cost.shape[0]):
+        previous = accumulated
+        best = previous.copy()
+        best[1:] = np.minimum(best[1:], previous[:-1])
+        best[2:] = np.minimum(best[2:], previous[:-2])
+        accumulated = cost[i] + best
+
+    return float(accumulated.min() / cost.shape[0])
+
+class WakeWordDetector:
+    """Detector de palabra clave por plantillas MFCC que filtra el audio antes de Whisper"""
+
+    def __init__(self, threshold: float = 0.35, search_seconds: float = 2.5):
+        self.threshold = threshold
+        self.search_seconds = search_seconds
+        self.templates: List[np.ndarray] = []
+
+    @property
+    def is_enrolled(self) -> bool:
+        """Indica si hay plantillas registradas"""
+        return bool(self.templates)
+
+    def add_template(self, samples: np.ndarray, sample_rate: int = WHISPER_SAMPLE_RATE):
+        """Registra una grabación de la palabra de activación como plantilla"""
+        mfcc = compute_mfcc(samples, sample_rate)
+        if mfcc.shape[0]:
+            self.templates.append(mfcc)
+
+    def load_templates(self, directory: str) -> int:
+        """Carga todas las plantillas WAV de un directorio"""
+        loaded = 0
+        for name in sorted(os.listdir(directory)):
+            if name.lower().endswith(".wav"):
+                try:
+                    self.add_template(load_wav(os.path.join(directory, name)))
+                    loaded += 1
+                except Exception as e:
+                    print(f"❌ Error cargando plantilla {name}: {e}")
+        return loaded
+
+    def score(self, samples: np.ndarray, sample_rate: int = WHISPER_SAMPLE_RATE) -> float:
+        """Retorna la menor distancia entre las plantillas y el inicio del audio"""
+        window = samples[:int(sample_rate * self.search_seconds)]
+        features = compute_mfcc(window, sample_rate, normalize=False)
+        # Cada plantilla se normalizó sobre sí misma: la consulta, sobre una ventana de su misma duración
+        return min(
+            (subsequence_dtw(template, sliding_mean_normalize(features, template.shape[0])) for template in self.templates),
+            default=np.inf
+        )
+
+    def detect(self, samples: np.ndarray, sample_rate: int = WHISPER_SAMPLE_RATE) -> Optional[bool]:
+        """Indica si el audio contiene la palabra de activación (None si no hay plantillas)"""
+        if not self.templates:
+            return None
+        return self.score(samples, sample_rate) <= self.threshold
@@ -0,0 +1,48 @@
+"""
+Adaptador de entrada - Carga de Whisper según la configuración (tamaño, precisión e hilos)
+"""
+from typing import Any
+from config.application_config import SpeechConfig
+
+COMPUTE_TYPES = ("float32", "float16", "int8")
+
+def resolve_device(config: SpeechConfig) -> str:
+    """Dispositivo efectivo: int8 siempre en CPU; sin dispositivo configurado, CUDA si está disponible"""
+    if config.whisper_compute_type == "int8":
+        return "cpu"
+    if config.whisper_device not in (None, "auto"):
+        return config.whisper_device
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+def load_whisper_model(config: SpeechConfig) -> Any:
+    """Carga el modelo configurado; int8 aplica cuantización dinámica a las capas lineales en CPU"""
+    import torch
+    import whisper
+
+    compute_type = config.whisper_compute_type
+    if compute_type not in COMPUTE_TYPES:
+        raise ValueError(f"Tipo de cómputo no soportado: {compute_type}")
+    if config.whisper_threads > 0:
+        torch.set_num_threads(config.whisper_threads)
+
+    device = resolve_device(config)
+    if compute_type == "int8" and config.whisper_device not in (None, "auto", "cpu"):
+        print("⚠️ La cuantización int8 solo está disponible en CPU; se usa la CPU")
+
+    model = whisper.load_model(config.whisper_model, device=device)
+
+    if compute_type == "int8":
+        # whisper.model.Linear solo convierte dtypes en forward; en float32 equivale a nn.Linear,
+        # y quantize_dynamic solo reconoce el tipo exacto nn.Linear
+        for module in model.modules():
+            if isinstance(module, torch.nn.Linear):
+                module.__class__ = torch.nn.Linear
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    print(f"✅ Whisper {config.whisper_model} ({compute_type}, {device}, {torch.get_num_threads()} hilos)")
+    return model
+
+def uses_fp16(config: SpeechConfig) -> bool:
+    """Whisper solo decodifica en fp16 en GPU; en CPU lo desactiva con un aviso en cada llamada"""
+    return config.whisper_compute_type == "float16" and resolve_device(config) != "cpu"
@@ -0,0 +1,211 @@
+"""
+Adaptadores - Pool de modelos: carga bajo demanda, coste en memoria y descarga LRU por presupuesto o inactividad
+"""
+import gc
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+MB = 1024 * 1024
+
+def current_rss() -> int:
+    """Memoria residente del proceso en bytes (0 si no se puede medir)"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0
+
+def release_memory():
+    """Devuelve al sistema la memoria de los modelos descargados"""
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+    try:
+        # glibc conserva los bloques liberados; sin esto el RSS apenas baja
+        import ctypes
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+@dataclass
+class PooledModel:
+    """Entrada del pool: cómo cargar el modelo y su estado"""
+    name: str
+    loader: Callable[[], Any]
+    model: Any = None
+    cost_bytes: int = 0
+    last_used: float = 0.0
+    pins: int = 0
+    loads: int = 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.model is not None
+
+class ModelPool:
+    """Modelos compartidos por los adaptadores; los inactivos se descargan y se recargan al volver a usarse"""
+
+    def __init__(self, memory_budget_mb: float = 0, idle_unload_seconds: float = 0, check_interval: float = 30.0):
+        self.memory_budget = int(memory_budget_mb * MB)
+        self.idle_unload_seconds = idle_unload_seconds
+        self.evictions = 0
+        self._entries: Dict[str, PooledModel] = {}
+        self._lock = threading.RLock()
+        # Con presupuesto las cargas se serializan para atribuir el aumento de RSS a un solo modelo
+        self._load_lock = threading.Lock() if self.memory_budget else None
+        self._entry_locks: Dict[str, threading.Lock] = {}
+        self._closed = threading.Event()
+        self._reaper = None
+        if idle_unload_seconds > 0:
+            self._reaper = threading.Thread(
+                target=self._reap_loop,
+                args=(min(check_interval, idle_unload_seconds),),
+                name="jarvis-model-pool",
+                daemon=True
+            )
+            self._reaper.start()
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        """Declara un modelo sin cargarlo; registrar otra vez el mismo nombre no hace nada"""
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = PooledModel(name=name, loader=loader)
+                self._entry_locks[name] = threading.Lock()
+
+    def unregister(self, name: str) -> bool:
+        """Olvida un modelo (por ejemplo si su cargador falló); no se quita mientras esté en uso"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if not entry or entry.pins:
+                return False
+            if entry.is_loaded:
+                self._unload(entry, "baja")
+            del self._entries[name]
+            del self._entry_locks[name]
+            return True
+
+    @contextmanager
+    def lease(self, name: str) -> Iterator[Any]:
+        """Usa el modelo (cargándolo si hace falta); no se descarga mientras esté en uso"""
+        entry = self._entries[name]
+        with self._lock:
+            entry.pins += 1
+        try:
+            yield self._ensure_loaded(entry)
+        finally:
+            with self._lock:
+                entry.pins -= 1
+                entry.last_used = time.monotonic()
+
+    def preload(self, name: str) -> Any:
+        """Carga el modelo ahora; propaga el error de carga"""
+        with self.lease(name) as model:
+            return model
+
+    def _ensure_loaded(self, entry: PooledModel) -> Any:
+        """Carga bajo el lock de la entrada para que dos usuarios no la carguen a la vez"""
+        with self._entry_locks[entry.name]:
+            if entry.is_loaded:
+                return entry.model
+
+            if self._load_lock:
+                with self._load_lock:
+                    self._load(entry)
+            else:
+                self._load(entry)
+        self._enforce_budget(keep=entry.name)
+        return entry.model
+
+    def _load(self, entry: PooledModel):
+        """Ejecuta el cargador y mide lo que cuesta en memoria"""
+        rss_before = current_rss()
+        started = time.perf_counter()
+        model = entry.loader()
+        entry.cost_bytes = max(current_rss() - rss_before, 0)
+        with self._lock:
+            entry.model = model
+            entry.loads += 1
+            entry.last_used = time.monotonic()
+        print(f"📦 Modelo {entry.name} cargado en {time.perf_counter() - started:.1f} s (~{entry.cost_bytes / MB:.0f} MB)")
+
+    def _enforce_budget(self, keep: str):
+        """Descarga los modelos sin uso menos recientes hasta entrar en el presupuesto"""
+        if not self.memory_budget:
+            return
+        with self._lock:
+            while self.resident_bytes > self.memory_budget:
+                candidates = [
+                    entry for entry in self._entries.values()
+                    if entry.is_loaded and not entry.pins and entry.name != keep
+                ]
+                if not candidates:
+                    print(f"⚠️ Modelos en uso por encima del presupuesto ({self.resident_bytes / MB:.0f} MB)")
+                    break
+                self._unload(min(candidates, key=lambda entry: entry.last_used), "presupuesto de memoria")
+
+    def _unload(self, entry: PooledModel, reason: str):
+        """Suelta la referencia al modelo (se llama con el lock tomado)"""
+        entry.model = None
+        self.evictions += 1
+        print(f"♻️ Modelo {entry.name} descargado ({reason}, ~{entry.cost_bytes / MB:.0f} MB)")
+        release_memory()
+
+    def unload(self, name: str) -> bool:
+        """Descarga un modelo si no está en uso"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if not entry or not entry.is_loaded or entry.pins:
+                return False
+            self._unload(entry, "manual")
+            return True
+
+    def _reap_loop(self, interval: float):
+        """Descarga los modelos que llevan más de idle_unload_seconds sin usarse"""
+        while not self._closed.wait(interval):
+            now = time.monotonic()
+            with self._lock:
+                for entry in self._entries.values():
+                    if entry.is_loaded and not entry.pins and now - entry.last_used > self.idle_unload_seconds:
+                        self._unload(entry, f"{now - entry.last_used:.0f} s sin uso")
+
+    @property
+    def resident_bytes(self) -> int:
+        """Coste medido de los modelos cargados"""
+        return sum(entry.cost_bytes for entry in self._entries.values() if entry.is_loaded)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Estado de cada modelo del pool"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "name": entry.name,
+                    "loaded": entry.is_loaded,
+                    "cost_mb": entry.cost_bytes / MB,
+                    "idle_s": now - entry.last_used if entry.last_used else None,
+                    "in_use": entry.pins,
+                    "loads": entry.loads
+                }
+                for entry in self._entries.values()
+            ]
+
+    def close(self):
+        """Detiene la descarga por inactividad y suelta todos los modelos"""
+        self._closed.set()
+        with self._lock:
+            for entry in self._entries.values():
+                entry.model = None
+        release_memory()
@@ -0,0 +1,293 @@
+"""
+Adaptador de salida - Índice de aplicaciones instaladas con búsqueda difusa
+"""
+import json
+import os
+import re
+import shlex
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+INDEX_VERSION = 2
+
+# También en WSL/Linux: los .exe de Windows aparecen en el PATH con extensión
+EXECUTABLE_EXTENSIONS = {".exe", ".bat", ".cmd", ".com"}
+
+# Con menos letras cualquier ejecutable corto se parece demasiado
+MIN_FUZZY_CHARS = 4
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "jarvis", "applications.json")
+
+DEFAULT_DESKTOP_DIRS = [
+    "/usr/share/applications",
+    "/usr/local/share/applications",
+    "/var/lib/flatpak/exports/share/applications",
+    "/var/lib/snapd/desktop/applications",
+    os.path.join(os.path.expanduser("~"), ".local", "share", "applications")
+]
+
+def normalize_name(name: str) -> str:
+    """Minúsculas y sin acentos para comparar nombres hablados con nombres de archivo"""
+    decomposed = unicodedata.normalize("NFKD", name.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).strip()
+
+def trigrams(text: str) -> Set[str]:
+    """Trigramas con relleno para que inicio y fin del nombre pesen"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def name_keys(name: str) -> List[str]:
+    """Nombre completo y sus palabras ("crome" se compara con "chrome", no con todo "google-chrome")"""
+    words = [word for word in re.split(r"[\s\-_.]+", name) if len(word) >= 3 and word != name]
+    return [name] + words
+
+@dataclass
+class ApplicationEntry:
+    """Aplicación resoluble por nombre"""
+    name: str
+    command: List[str]
+    source: str
+
+class ApplicationIndex:
+    """Índice de ejecutables del PATH y archivos .desktop, cacheado en disco"""
+
+    def __init__(
+        self,
+        path_dirs: Optional[List[str]] = None,
+        desktop_dirs: Optional[List[str]] = None,
+        cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+        min_similarity: float = 0.6,
+        check_interval: float = 30.0
+    ):
+        self.path_dirs = path_dirs if path_dirs is not None else os.environ.get("PATH", "").split(os.pathsep)
+        self.desktop_dirs = desktop_dirs if desktop_dirs is not None else DEFAULT_DESKTOP_DIRS
+        self.cache_path = cache_path
+        self.min_similarity = min_similarity
+        self.check_interval = check_interval
+
+        self.entries: List[ApplicationEntry] = []
+        self._by_name: Dict[str, int] = {}
+        # Claves difusas: (texto, índice de la entrada, número de trigramas)
+        self._keys: List[Tuple[str, int, int]] = []
+        self._trigram_index: Dict[str, List[int]] = {}
+        self._signature: Dict[str, float] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    def warm_up(self) -> "ApplicationIndex":
+        """Carga el índice en segundo plano"""
+        threading.Thread(target=self.load, name="jarvis-app-index", daemon=True).start()
+        return self
+
+    def load(self):
+        """Carga el índice desde la caché o lo reconstruye si algún directorio cambió"""
+        try:
+            signature = self._directory_signature()
+            entries = self._load_cache(signature)
+            if entries is None:
+                entries = self._scan()
+                self._save_cache(signature, entries)
+            self._install(entries, signature)
+        except Exception as e:
+            print(f"❌ Error indexando aplicaciones: {e}")
+        finally:
+            self._ready.set()
+
+    def refresh_if_stale(self):
+        """Comprueba en segundo plano si cambió el mtime de algún directorio (como mucho cada check_interval)"""
+        with self._refresh_lock:
+            now = time.monotonic()
+            if now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            # Mientras se reconstruye se sigue sirviendo el índice actual: _install lo sustituye al terminar
+            self._refresh_thread = threading.Thread(target=self._refresh, name="jarvis-app-index-refresh", daemon=True)
+            self._refresh_thread.start()
+
+    def _refresh(self):
+        """Recarga el índice si la firma de los directorios cambió"""
+        if self._directory_signature() != self._signature:
+            self.load()
+
+    def resolve(self, spoken_name: str, timeout: float = 2.0) -> Optional[ApplicationEntry]:
+        """Busca la aplicación por nombre exacto o, si no, por similitud de trigramas"""
+        if not self._ready.wait(timeout):
+            return None
+        self.refresh_if_stale()
+
+        name = normalize_name(spoken_name)
+        with self._lock:
+            index = self._by_name.get(name)
+            if index is not None:
+                return self.entries[index]
+            return self._fuzzy_lookup(name)
+
+    def _fuzzy_lookup(self, name: str) -> Optional[ApplicationEntry]:
+        """Coeficiente de Dice sobre trigramas compartidos con el nombre o con una de sus palabras"""
+        if len(name) < MIN_FUZZY_CHARS:
+            return None
+        query = trigrams(name)
+        shared: Counter = Counter()
+        for trigram in query:
+            shared.update(self._trigram_index.get(trigram, ()))
+
+        best_index, best_rank = None, None
+        for key_id, common in shared.items():
+            key, index, key_trigrams = self._keys[key_id]
+            # Misma inicial, y un ejecutable más corto que es prefijo de lo pedido es otro programa ("calc" no es "cal")
+            if key[0] != name[0] or (len(key) < len(name) and name.startswith(key)):
+                continue
+            score = 2.0 * common / (len(query) + key_trigrams)
+            entry = self.entries[index]
+            # A igual similitud gana el .desktop (nombre pensado para personas) y el nombre completo
+            rank = (score, entry.source == "desktop", key == entry.name)
+            if best_rank is None or rank > best_rank:
+                best_index, best_rank = index, rank
+
+        if best_rank is None or best_rank[0] < self.min_similarity:
+            return None
+        return self.entries[best_index]
+
+    def _install(self, entries: List[ApplicationEntry], signature: Dict[str, float]):
+        """Reemplaza las estructuras de búsqueda"""
+        by_name: Dict[str, int] = {}
+        keys: List[Tuple[str, int, int]] = []
+        trigram_index: Dict[str, List[int]] = defaultdict(list)
+        for index, entry in enumerate(entries):
+            # Los .desktop se recorren primero: a igual nombre se quedan ellos
+            if entry.name in by_name:
+                continue
+            by_name[entry.name] = index
+            for key in name_keys(entry.name):
+                key_trigrams = trigrams(key)
+                for trigram in key_trigrams:
+                    trigram_index[trigram].append(len(keys))
+                keys.append((key, index, len(key_trigrams)))
+
+        with self._lock:
+            self.entries = entries
+            self._by_name = by_name
+            self._keys = keys
+            self._trigram_index = dict(trigram_index)
+            self._signature = signature
+            self._checked_at = time.monotonic()
+
+    def _directory_signature(self) -> Dict[str, float]:
+        """mtime de cada directorio indexado (cambia al instalar o quitar programas)"""
+        signature = {}
+        for directory in self.path_dirs + self.desktop_dirs:
+            try:
+                signature[directory] = os.stat(directory).st_mtime
+            except OSError:
+                continue
+        return signature
+
+    def _scan(self) -> List[ApplicationEntry]:
+        """Recorre los .desktop (nombres legibles primero) y los ejecutables del PATH"""
+        entries = []
+        for directory in self.desktop_dirs:
+            entries.extend(self._scan_desktop_dir(directory))
+        for directory in self.path_dirs:
+            entries.extend(self._scan_path_dir(directory))
+        return entries
+
+    def _scan_path_dir(self, directory: str) -> List[ApplicationEntry]:
+        """Ejecutables de un directorio del PATH"""
+        entries = []
+        try:
+            with os.scandir(directory) as scanner:
+                for item in scanner:
+                    try:
+                        if not item.is_file() or not os.access(item.path, os.X_OK):
+                            continue
+                    except OSError:
+                        continue
+                    stem, extension = os.path.splitext(item.name)
+                    name = normalize_name(stem if extension.lower() in EXECUTABLE_EXTENSIONS else item.name)
+                    entries.append(ApplicationEntry(name=name, command=[item.path], source="path"))
+        except OSError:
+            pass
+        return entries
+
+    def _scan_desktop_dir(self, directory: str) -> List[ApplicationEntry]:
+        """Aplicaciones visibles de un directorio de .desktop, por nombre y por id"""
+        entries = []
+        try:
+            names = sorted(os.listdir(directory))
+        except OSError:
+            return entries
+
+        for file_name in names:
+            if not file_name.endswith(".desktop"):
+                continue
+            fields = self._parse_desktop_file(os.path.join(directory, file_name))
+            if not fields or fields.get("NoDisplay") == "true" or fields.get("Hidden") == "true":
+                continue
+            try:
+                command = [arg for arg in shlex.split(fields.get("Exec", "")) if not arg.startswith("%")]
+            except ValueError:
+                continue
+            if not command:
+                continue
+
+            for name in (fields.get("Name"), file_name[:-len(".desktop")].split(".")[-1]):
+                if name:
+                    entries.append(ApplicationEntry(name=normalize_name(name), command=command, source="desktop"))
+        return entries
+
+    def _parse_desktop_file(self, path: str) -> Dict[str, str]:
+        """Campos de la sección [Desktop Entry]"""
+        fields: Dict[str, str] = {}
+        in_entry = False
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    line = line.strip()
+                    if line.startswith("["):
+                        in_entry = line == "[Desktop Entry]"
+                        continue
+                    if in_entry and "=" in line:
+                        key, value = line.split("=", 1)
+                        fields.setdefault(key.strip(), value.strip())
+        except OSError:
+            return {}
+        return fields
+
+    def _load_cache(self, signature: Dict[str, float]) -> Optional[List[ApplicationEntry]]:
+        """Entradas cacheadas si la firma de directorios coincide"""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != INDEX_VERSION or data.get("signature") != signature:
+            return None
+        return [ApplicationEntry(name, command, source) for name, command, source in data["entries"]]
+
+    def _save_cache(self, signature: Dict[str, float], entries: List[ApplicationEntry]):
+        """Escritura atómica de la caché"""
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": INDEX_VERSION,
+                    "signature": signature,
+                    "entries": [[entry.name, entry.command, entry.source] for entry in entries]
+                }, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            print(f"Error guardando índice de aplicaciones: {e}")
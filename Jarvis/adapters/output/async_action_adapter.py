@@ -0,0 +1,80 @@
+"""
+Adaptador de salida - Ejecución de acciones en un pool de hilos con tiempo límite
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+from core.domain.entities import SystemAction
+from core.domain.services import ActionExecutor
+
+class ActionTimeoutError(TimeoutError):
+    """La acción no terminó dentro de su tiempo límite"""
+
+class AsyncActionExecutor(ActionExecutor):
+    """Envuelve un ejecutor de acciones para lanzarlas sin bloquear la respuesta"""
+
+    runs_inline = False
+
+    def __init__(
+        self,
+        executor: ActionExecutor,
+        max_workers: int = 4,
+        default_timeout: float = 10.0,
+        timeouts: Optional[Dict[str, float]] = None
+    ):
+        self.executor = executor
+        self.default_timeout = default_timeout
+        self.timeouts = dict(timeouts or {})
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jarvis-action")
+
+    def timeout_for(self, action: SystemAction) -> float:
+        """Tiempo límite por tipo de acción"""
+        return self.timeouts.get(action.action_type, self.default_timeout)
+
+    def submit_action(self, action: SystemAction) -> "Future[bool]":
+        """Lanza la acción en el pool; el futuro falla con ActionTimeoutError si excede su límite"""
+        result: "Future[bool]" = Future()
+        task = self._pool.submit(self.executor.execute_action, action)
+        timeout = self.timeout_for(action)
+        lock = threading.Lock()
+
+        def settle(value: Optional[bool] = None, exception: Optional[BaseException] = None):
+            # Gana el primero entre la tarea y el temporizador
+            with lock:
+                if result.done():
+                    return
+                if exception is not None:
+                    result.set_exception(exception)
+                else:
+                    result.set_result(value)
+
+        def expire():
+            # Un hilo no se puede interrumpir: el futuro se resuelve y la tarea termina por su cuenta
+            settle(exception=ActionTimeoutError(f"{action.action_type} excedió {timeout:.1f} s"))
+
+        timer = threading.Timer(timeout, expire)
+        timer.daemon = True
+
+        def complete(task_future: Future):
+            timer.cancel()
+            exception = task_future.exception()
+            if exception is not None:
+                settle(exception=exception)
+            else:
+                settle(task_future.result())
+
+        timer.start()
+        task.add_done_callback(complete)
+        return result
+
+    def execute_action(self, action: SystemAction) -> bool:
+        """Ejecuta la acción esperando su resultado (modo síncrono)"""
+        try:
+            return self.submit_action(action).result()
+        except Exception as e:
+            print(f"Error ejecutando acción: {e}")
+            return False
+
+    def shutdown(self, wait: bool = False):
+        """Detiene el pool de acciones"""
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,111 @@
+"""
+Adaptador de salida - Caché de audio sintetizado
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Set, Tuple
+
+class SynthesizedAudioCache:
+    """Caché LRU de audio sintetizado por (motor, voz, texto) con almacén opcional en disco"""
+
+    def __init__(self, max_entries: int = 128, persist_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.persist_dir = persist_dir
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+        # Frases fijas pre-renderizadas: el desalojo LRU no las toca
+        self._pinned: Set[Tuple[str, str, str]] = set()
+        self._lock = threading.Lock()
+
+        if persist_dir:
+            os.makedirs(persist_dir, exist_ok=True)
+
+    def get(self, engine: str, voice: str, text: str) -> Optional[bytes]:
+        """Obtiene el audio de la caché en memoria o, si no está, del disco"""
+        key = (engine, voice, text)
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return audio
+
+        audio = self._load_from_disk(key)
+        with self._lock:
+            if audio is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store(key, audio)
+        return audio
+
+    def put(self, engine: str, voice: str, text: str, audio: bytes):
+        """Guarda el audio en memoria y en el almacén persistente"""
+        key = (engine, voice, text)
+        with self._lock:
+            self._store(key, audio)
+        self._save_to_disk(key, audio)
+
+    def pin(self, engine: str, voice: str, text: str):
+        """Excluye una frase del desalojo (renders especulativos no la expulsan)"""
+        with self._lock:
+            self._pinned.add((engine, voice, text))
+
+    def contains(self, engine: str, voice: str, text: str) -> bool:
+        """Indica si el audio está disponible sin sintetizar"""
+        key = (engine, voice, text)
+        with self._lock:
+            if key in self._entries:
+                return True
+        path = self._path_for(key)
+        return bool(path and os.path.exists(path))
+
+    def clear(self):
+        """Vacía la caché en memoria"""
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key: Tuple[str, str, str], audio: bytes):
+        """Inserta con desalojo LRU (llamar con el lock tomado)"""
+        self._entries[key] = audio
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            victim = next((entry for entry in self._entries if entry not in self._pinned), None)
+            if victim is None:
+                break
+            del self._entries[victim]
+
+    def _path_for(self, key: Tuple[str, str, str]) -> Optional[str]:
+        """Ruta del archivo persistente para una clave"""
+        if not self.persist_dir:
+            return None
+        digest = hashlib.sha1("\0".join(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.persist_dir, f"{digest}.wav")
+
+    def _load_from_disk(self, key: Tuple[str, str, str]) -> Optional[bytes]:
+        """Lee el audio persistido si existe"""
+        path = self._path_for(key)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError as e:
+            print(f"Error leyendo caché de audio: {e}")
+            return None
+
+    def _save_to_disk(self, key: Tuple[str, str, str], audio: bytes):
+        """Escribe el audio de forma atómica en el almacén persistente"""
+        path = self._path_for(key)
+        if not path:
+            return
+        try:
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(audio)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error guardando caché de audio: {e}")
@@ -0,0 +1,165 @@
+"""
+Adaptador de salida - Reproducción de audio en memoria
+"""
+import io
+import queue
+import threading
+from typing import Callable, Optional, Tuple
+import numpy as np
+import pygame
+from scipy.io import wavfile
+
+def encode_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    """Codifica muestras float en un WAV PCM de 16 bits en memoria"""
+    samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+    peak = float(np.max(np.abs(samples))) if samples.size else 0.0
+    if peak > 1.0:
+        samples = samples / peak
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+
+    buffer = io.BytesIO()
+    wavfile.write(buffer, sample_rate, pcm)
+    return buffer.getvalue()
+
+def decode_wav(audio_data: bytes) -> Tuple[int, np.ndarray]:
+    """Decodifica un WAV en memoria a PCM int16 (muestras x canales)"""
+    sample_rate, samples = wavfile.read(io.BytesIO(audio_data))
+    if samples.dtype.kind == "f":
+        samples = (np.clip(samples, -1.0, 1.0) * 32767.0).astype(np.int16)
+    elif samples.dtype == np.int32:
+        samples = (samples >> 16).astype(np.int16)
+    elif samples.dtype == np.uint8:
+        samples = ((samples.astype(np.int16) - 128) << 8).astype(np.int16)
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    return sample_rate, samples
+
+class AudioPlayer:
+    """Reproductor en un hilo dedicado a partir de buffers PCM, con cancelación (barge-in)"""
+
+    def __init__(self, volume: float = 1.0):
+        self.volume = volume
+        self._queue: "queue.Queue[Optional[Tuple[int, bytes, Optional[Callable[[], None]]]]]" = queue.Queue()
+        self._cancel_event = threading.Event()
+        self._generation = 0
+        self._idle_event = threading.Event()
+        self._idle_event.set()
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_playing(self) -> bool:
+        """Indica si hay audio sonando o en cola"""
+        return not self._idle_event.is_set()
+
+    @property
+    def generation(self) -> int:
+        """Generación actual: el audio etiquetado con una anterior se descarta"""
+        return self._generation
+
+    def play(
+        self,
+        audio_data: bytes,
+        generation: Optional[int] = None,
+        on_start: Optional[Callable[[], None]] = None
+    ) -> bool:
+        """Encola un WAV en memoria y retorna inmediatamente; False si generation ya no es la actual"""
+        self._ensure_thread()
+        with self._pending_lock:
+            if generation is not None and generation != self._generation:
+                return False
+            self._pending += 1
+            self._idle_event.clear()
+            self._queue.put((self._generation, audio_data, on_start))
+        return True
+
+    def next_generation(self) -> int:
+        """Invalida lo encolado sin cortar el buffer que suena; retorna la nueva generación"""
+        with self._pending_lock:
+            self._generation += 1
+            return self._generation
+
+    def stop(self):
+        """Interrumpe la reproducción actual y descarta lo pendiente"""
+        self.next_generation()
+        self._cancel_event.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._mark_done()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que termine todo lo encolado"""
+        return self._idle_event.wait(timeout)
+
+    def close(self):
+        """Detiene el hilo de reproducción"""
+        self.stop()
+        if self._thread and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=1.0)
+
+    def _ensure_thread(self):
+        """Arranca el hilo de reproducción bajo demanda"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._playback_loop, name="jarvis-playback", daemon=True)
+            self._thread.start()
+
+    def _mark_done(self):
+        """Descuenta un elemento pendiente y marca inactividad al vaciarse"""
+        with self._pending_lock:
+            self._pending = max(self._pending - 1, 0)
+            if self._pending == 0:
+                self._idle_event.set()
+
+    def _playback_loop(self):
+        """Reproduce los buffers encolados uno tras otro"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            generation, audio_data, on_start = item
+            try:
+                with self._pending_lock:
+                    # Lo encolado antes del último stop() ya no debe sonar
+                    if generation != self._generation:
+                        continue
+                    self._cancel_event.clear()
+                self._play_buffer(audio_data, on_start)
+            except Exception as e:
+                print(f"Error en reproducción: {e}")
+            finally:
+                self._mark_done()
+
+    def _play_buffer(self, audio_data: bytes, on_start: Optional[Callable[[], None]] = None):
+        """Reproduce un WAV con pygame.mixer.Sound sin pasar por disco"""
+        sample_rate, samples = decode_wav(audio_data)
+        channels = self._init_mixer(sample_rate, samples.shape[1])
+        if samples.shape[1] != channels:
+            samples = np.repeat(samples[:, :1], channels, axis=1)
+
+        sound = pygame.mixer.Sound(buffer=np.ascontiguousarray(samples).tobytes())
+        sound.set_volume(self.volume)
+        channel = sound.play()
+        if on_start:
+            # El audio ya está en el mezclador: aquí empieza lo que oye el usuario
+            on_start()
+
+        while channel is not None and channel.get_busy():
+            if self._cancel_event.wait(0.01):
+                channel.stop()
+                break
+
+    def _init_mixer(self, sample_rate: int, channels: int) -> int:
+        """Inicializa el mezclador con el formato del audio y retorna sus canales"""
+        current = pygame.mixer.get_init()
+        if current and current[0] == sample_rate:
+            return current[2]
+        if current:
+            pygame.mixer.quit()
+        pygame.mixer.init(frequency=sample_rate, size=-16, channels=channels)
+        return pygame.mixer.get_init()[2]
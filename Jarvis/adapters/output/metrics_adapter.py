@@ -0,0 +1,199 @@
+"""
+Adaptador de salida - Histogramas de latencia y exportadores
+"""
+import bisect
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+from core.domain.services import MetricsRecorder
+
+# Límites superiores en segundos, de 0,1 ms a 30 s
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+class LatencyHistogram:
+    """Histograma acumulativo de latencias con cubetas fijas"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        """Agrega una medición"""
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q: float) -> float:
+        """Estima un cuantil interpolando dentro de la cubeta"""
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def snapshot(self) -> Dict[str, float]:
+        """Resumen del histograma"""
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99)
+        }
+
+class MetricsExporter:
+    """Exportador de métricas: recibe cada medición y/o lee los histogramas"""
+
+    def start(self, recorder: "HistogramMetricsRecorder"):
+        """Se conecta al registrador"""
+        pass
+
+    def on_observation(self, stage: str, seconds: float):
+        """Recibe una medición individual"""
+        pass
+
+    def close(self):
+        """Libera los recursos del exportador"""
+        pass
+
+class HistogramMetricsRecorder(MetricsRecorder):
+    """Registrador en proceso con un histograma por etapa"""
+
+    def __init__(self, exporters: Optional[List[MetricsExporter]] = None, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.exporters = list(exporters or [])
+        self._lock = threading.Lock()
+        for exporter in self.exporters:
+            exporter.start(self)
+
+    def observe(self, stage: str, seconds: float):
+        """Registra la duración de una etapa"""
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram(self.buckets)
+            histogram.observe(seconds)
+
+        for exporter in self.exporters:
+            exporter.on_observation(stage, seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Resumen de todas las etapas"""
+        with self._lock:
+            return {stage: histogram.snapshot() for stage, histogram in self.histograms.items()}
+
+    def render_prometheus(self) -> str:
+        """Formato de texto de Prometheus"""
+        lines = [
+            "# HELP jarvis_stage_latency_seconds Latencia por etapa del pipeline de JARVIS",
+            "# TYPE jarvis_stage_latency_seconds histogram"
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'jarvis_stage_latency_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'jarvis_stage_latency_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'jarvis_stage_latency_seconds_sum{{stage="{stage}"}} {histogram.total}')
+                lines.append(f'jarvis_stage_latency_seconds_count{{stage="{stage}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        """Cierra los exportadores"""
+        for exporter in self.exporters:
+            exporter.close()
+
+class JsonLinesExporter(MetricsExporter):
+    """Escribe cada medición como una línea JSON, en lotes desde un hilo de fondo"""
+
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._pending: List[Tuple[float, str, float]] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, recorder: "HistogramMetricsRecorder"):
+        self._thread = threading.Thread(target=self._flush_loop, name="jarvis-metrics-jsonl", daemon=True)
+        self._thread.start()
+
+    def on_observation(self, stage: str, seconds: float):
+        with self._lock:
+            self._pending.append((time.time(), stage, seconds))
+
+    def flush(self):
+        """Escribe las mediciones pendientes"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                for timestamp, stage, seconds in pending:
+                    f.write(json.dumps({"ts": timestamp, "stage": stage, "seconds": seconds}) + "\n")
+        except OSError as e:
+            print(f"Error exportando métricas: {e}")
+
+    def _flush_loop(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        self.flush()
+
+class PrometheusTextExporter(MetricsExporter):
+    """Expone /metrics en formato de texto de Prometheus en un puerto local"""
+
+    def __init__(self, port: int = 9464, host: str = "127.0.0.1"):
+        self.port = port
+        self.host = host
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def start(self, recorder: "HistogramMetricsRecorder"):
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = recorder.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), MetricsHandler)
+        except OSError as e:
+            print(f"❌ Error iniciando exportador Prometheus: {e}")
+            return
+        threading.Thread(target=self._server.serve_forever, name="jarvis-metrics-http", daemon=True).start()
+        print(f"📈 Métricas en http://{self.host}:{self.port}/metrics")
+
+    def close(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
@@ -0,0 +1,67 @@
+"""
+Adaptador de salida - Plantillas de respuesta y respuesta en texto
+"""
+from typing import Callable, Iterable, Optional
+from core.domain.entities import VoiceResponse
+from core.domain.services import ResponseGenerator, NullMetricsRecorder
+
+RESPONSE_TEMPLATES = {
+    "open_application": "Abriendo {target}",
+    "search_web": "Buscando {target}",
+    "system_control": "Ejecutando comando de sistema",
+    "media_control": "Control de medios ejecutado",
+    "information": "Aquí tienes la información",
+    "greeting": "Hola, ¿en qué puedo ayudarte?",
+    "exit": "Hasta luego, que tengas un buen día"
+}
+
+DEFAULT_RESPONSE = "Comando ejecutado"
+
+def fixed_response_phrases() -> list:
+    """Frases de respuesta que no dependen del objetivo del comando"""
+    phrases = [template for template in RESPONSE_TEMPLATES.values() if "{" not in template]
+    return phrases + [DEFAULT_RESPONSE]
+
+class TextResponseAdapter(ResponseGenerator):
+    """Generador de respuestas solo texto, sin dependencias de audio"""
+
+    metrics = NullMetricsRecorder()
+    # Texto de la última respuesta reproducida: el reconocedor lo usa para no transcribir su propio eco
+    last_spoken_text: Optional[str] = None
+
+    @property
+    def is_available(self) -> bool:
+        """Indica si hay un motor de síntesis cargado"""
+        return False
+
+    @property
+    def is_speaking(self) -> bool:
+        """Indica si hay una respuesta sonando"""
+        return False
+
+    def generate_response(self, intent, context: Optional[dict] = None) -> VoiceResponse:
+        """Genera la respuesta en texto"""
+        return VoiceResponse(text=self._generate_response_text(intent, context))
+
+    def _generate_response_text(self, intent, context: Optional[dict] = None) -> str:
+        """Genera el texto de respuesta"""
+        response_template = RESPONSE_TEMPLATES.get(intent.command_type.value, DEFAULT_RESPONSE)
+        return response_template.format(target=intent.target or "aplicación")
+
+    def synthesize_response(self, text: str) -> VoiceResponse:
+        """Construye una respuesta para un texto fijo"""
+        return VoiceResponse(text=text)
+
+    def prerender(self, phrases: Optional[Iterable[str]] = None) -> int:
+        """Sin motor no hay nada que pre-renderizar"""
+        return 0
+
+    def speak(self, response: VoiceResponse, wait: bool = False, on_start: Optional[Callable[[], None]] = None):
+        """Muestra la respuesta por consola"""
+        print(f"JARVIS: {response.text}")
+        if on_start:
+            on_start()
+
+    def stop_speaking(self):
+        """Sin reproducción no hay nada que cortar"""
+        pass
@@ -0,0 +1,275 @@
+"""
+Adaptador de salida - Historial de comandos e intenciones en SQLite
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+from core.domain.entities import CommandIntent, CommandType, SentimentType, VoiceCommand
+from core.domain.repositories import CommandRepository, IntentRepository
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS commands (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    timestamp REAL NOT NULL,
+    sentiment TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_commands_timestamp ON commands (timestamp);
+CREATE TABLE IF NOT EXISTS intents (
+    id INTEGER PRIMARY KEY,
+    command_type TEXT NOT NULL,
+    target TEXT,
+    parameters TEXT,
+    confidence REAL NOT NULL,
+    command_id INTEGER REFERENCES commands (id),
+    recognized INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_intents_command_type ON intents (command_type);
+"""
+
+# Bases creadas antes de enlazar intención y comando
+MIGRATE_INTENTS_COMMAND_ID = "ALTER TABLE intents ADD COLUMN command_id INTEGER REFERENCES commands (id)"
+INDEX_INTENTS_COMMAND_ID = "CREATE INDEX IF NOT EXISTS idx_intents_command_id ON intents (command_id)"
+# Bases creadas antes de guardar si algún patrón reconoció el comando
+MIGRATE_INTENTS_RECOGNIZED = "ALTER TABLE intents ADD COLUMN recognized INTEGER NOT NULL DEFAULT 1"
+
+INSERT_COMMAND = "INSERT INTO commands (text, confidence, timestamp, sentiment) VALUES (?, ?, ?, ?)"
+INSERT_INTENT = (
+    "INSERT INTO intents (command_type, target, parameters, confidence, recognized, command_id) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+SELECT_INTENTS = "SELECT command_type, target, parameters, confidence, recognized FROM intents ORDER BY id DESC LIMIT ?"
+
+_STOP = object()
+# Comando e intención que se insertan juntos: la intención recibe el id del comando
+_INTERACTION = object()
+
+class SQLiteHistoryRepository(CommandRepository, IntentRepository):
+    """Persistencia en SQLite (WAL) con escrituras por lotes en segundo plano y caché de recientes"""
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 64,
+        flush_interval: float = 1.0,
+        recent_size: int = 100,
+        max_pending: int = 10000
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        # Conexión de lectura; el hilo escritor abre la suya
+        self._read_connection = self._connect()
+        self._read_connection.executescript(SCHEMA)
+        self._migrate()
+        self._read_lock = threading.Lock()
+        self._closed = False
+        # Cierre y encolado son atómicos: nada entra en la cola después de _STOP
+        self._close_lock = threading.Lock()
+
+        # Los últimos N registros se sirven desde memoria
+        self._recent_commands: Deque[VoiceCommand] = deque(maxlen=recent_size)
+        self._recent_intents: Deque[CommandIntent] = deque(maxlen=recent_size)
+        self._recent_lock = threading.Lock()
+        self._load_recent(recent_size)
+
+        self._pending: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._writer = threading.Thread(target=self._write_loop, name="jarvis-history-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Conexión en modo WAL: las lecturas no esperan a las escrituras"""
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _migrate(self):
+        """Añade intents.command_id e intents.recognized a las bases antiguas"""
+        columns = {row[1] for row in self._read_connection.execute("PRAGMA table_info(intents)")}
+        if "command_id" not in columns:
+            self._read_connection.execute(MIGRATE_INTENTS_COMMAND_ID)
+        if "recognized" not in columns:
+            self._read_connection.execute(MIGRATE_INTENTS_RECOGNIZED)
+        self._read_connection.execute(INDEX_INTENTS_COMMAND_ID)
+
+    def save_command(self, command: VoiceCommand) -> bool:
+        """Encola el comando; nunca espera al disco"""
+        with self._recent_lock:
+            self._recent_commands.append(command)
+        return self._enqueue(INSERT_COMMAND, self._command_row(command))
+
+    def save_intent(self, intent: CommandIntent) -> bool:
+        """Encola la intención sin comando asociado; nunca espera al disco"""
+        with self._recent_lock:
+            self._recent_intents.append(intent)
+        return self._enqueue(INSERT_INTENT, self._intent_row(intent) + (None,))
+
+    def save_interaction(self, command: VoiceCommand, intent: CommandIntent) -> bool:
+        """Encola comando e intención como un solo registro: se escriben en el mismo lote, enlazados por command_id"""
+        with self._recent_lock:
+            self._recent_commands.append(command)
+            self._recent_intents.append(intent)
+        return self._enqueue(_INTERACTION, (self._command_row(command), self._intent_row(intent)))
+
+    @staticmethod
+    def _command_row(command: VoiceCommand) -> Tuple:
+        sentiment = command.sentiment.value if command.sentiment else None
+        return (command.text, command.confidence, command.timestamp, sentiment)
+
+    @staticmethod
+    def _intent_row(intent: CommandIntent) -> Tuple:
+        parameters = json.dumps(intent.parameters, ensure_ascii=False) if intent.parameters else None
+        return (intent.command_type.value, intent.target, parameters, intent.confidence, int(intent.recognized))
+
+    def get_recent_commands(self, limit: int = 10) -> List[VoiceCommand]:
+        """Comandos más recientes primero"""
+        with self._recent_lock:
+            if self._closed or limit <= len(self._recent_commands) or len(self._recent_commands) < self._recent_commands.maxlen:
+                return list(reversed(self._recent_commands))[:limit]
+
+        rows = self._query(
+            "SELECT text, confidence, timestamp, sentiment FROM commands ORDER BY timestamp DESC, id DESC LIMIT ?",
+            limit
+        )
+        return [self._row_to_command(row) for row in rows]
+
+    def get_intent_history(self, limit: int = 10) -> List[CommandIntent]:
+        """Intenciones más recientes primero"""
+        with self._recent_lock:
+            if self._closed or limit <= len(self._recent_intents) or len(self._recent_intents) < self._recent_intents.maxlen:
+                return list(reversed(self._recent_intents))[:limit]
+
+        rows = self._query(SELECT_INTENTS, limit)
+        return [self._row_to_intent(row) for row in rows]
+
+    def flush(self, timeout: Optional[float] = None):
+        """Espera a que se escriba todo lo encolado (tras close() no queda escritor al que esperar)"""
+        done = threading.Event()
+        with self._close_lock:
+            if self._closed or not self._writer.is_alive():
+                return
+            self._pending.put((None, done))
+        done.wait(timeout)
+
+    def close(self):
+        """Escribe lo pendiente y cierra las conexiones"""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._pending.put(_STOP)
+        self._writer.join(timeout=5.0)
+        with self._read_lock:
+            self._read_connection.close()
+
+    def _enqueue(self, statement: str, row: Tuple) -> bool:
+        """Si la cola está llena se descarta el registro en lugar de bloquear"""
+        with self._close_lock:
+            if not self._closed:
+                try:
+                    self._pending.put_nowait((statement, row))
+                    return True
+                except queue.Full:
+                    pass
+        self.dropped += 1
+        return False
+
+    def _query(self, sql: str, *args) -> List[Tuple]:
+        """Consulta las filas ya escritas y las pendientes (se vacía la cola antes, con espera acotada)"""
+        self.flush(timeout=5.0)
+        with self._read_lock:
+            return self._read_connection.execute(sql, args).fetchall()
+
+    def _load_recent(self, limit: int):
+        """Rellena el búfer de recientes desde la base de datos"""
+        with self._read_lock:
+            commands = self._read_connection.execute(
+                "SELECT text, confidence, timestamp, sentiment FROM commands ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+            intents = self._read_connection.execute(SELECT_INTENTS, (limit,)).fetchall()
+        self._recent_commands.extend(self._row_to_command(row) for row in reversed(commands))
+        self._recent_intents.extend(self._row_to_intent(row) for row in reversed(intents))
+
+    def _write_loop(self):
+        """Agrupa las inserciones en transacciones de hasta batch_size filas"""
+        connection = self._connect()
+        stopping = False
+        while not stopping:
+            batch: List[Tuple[str, Tuple]] = []
+            waiters: List[threading.Event] = []
+            try:
+                item = self._pending.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            while True:
+                if item is _STOP:
+                    stopping = True
+                elif item[0] is None:
+                    waiters.append(item[1])
+                else:
+                    batch.append(item)
+                if stopping or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._pending.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write_batch(connection, batch)
+            for waiter in waiters:
+                waiter.set()
+        connection.close()
+
+    def _write_batch(self, connection: sqlite3.Connection, batch: List[Tuple[str, Tuple]]):
+        """Un solo commit (y un solo fsync) por lote"""
+        try:
+            connection.execute("BEGIN")
+            for statement, row in batch:
+                if statement is _INTERACTION:
+                    command_row, intent_row = row
+                    command_id = connection.execute(INSERT_COMMAND, command_row).lastrowid
+                    connection.execute(INSERT_INTENT, intent_row + (command_id,))
+                else:
+                    connection.execute(statement, row)
+            connection.execute("COMMIT")
+        except sqlite3.Error as e:
+            print(f"Error guardando historial: {e}")
+            try:
+                connection.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+
+    @staticmethod
+    def _row_to_command(row: Tuple) -> VoiceCommand:
+        text, confidence, timestamp, sentiment = row
+        return VoiceCommand(
+            text=text,
+            confidence=confidence,
+            timestamp=timestamp,
+            sentiment=SentimentType(sentiment) if sentiment else None
+        )
+
+    @staticmethod
+    def _row_to_intent(row: Tuple) -> CommandIntent:
+        command_type, target, parameters, confidence, recognized = row
+        return CommandIntent(
+            command_type=CommandType(command_type),
+            target=target,
+            parameters=json.loads(parameters) if parameters else None,
+            confidence=confidence,
+            recognized=bool(recognized)
+        )
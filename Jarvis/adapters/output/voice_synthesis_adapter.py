@@ -1,173 +1,279 @@
-"""
-Adaptador de salida - Síntesis de voz
-"""
-import torch
-import numpy as np
-from scipy.io import wavfile
-import tempfile
-import pygame
-import os
-from typing import Optional
-from core.domain.entities import VoiceResponse
-from core.domain.services import ResponseGenerator
-
-class VibeVoiceSynthesisAdapter(ResponseGenerator):
-    """Adaptador para síntesis de voz usando VibeVoice"""
-    
-    def __init__(self):
-        try:
-            from vibevoice import VibeVoice
-            self.vibevoice = VibeVoice.from_pretrained("microsoft/speecht5_tts")
-            self.vibevoice.eval()
-            self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-            self.vibevoice.to(self.device)
-            self.use_vibevoice = True
-            pygame.mixer.init()
-            print("✅ VibeVoice configurado")
-        except Exception as e:
-            print(f"❌ Error configurando VibeVoice: {e}")
-            self.use_vibevoice = False
-    
-    def generate_response(self, intent, context: Optional[dict] = None) -> VoiceResponse:
-        """Genera respuesta de voz usando VibeVoice"""
-        response_text = self._generate_response_text(intent, context)
-        
-        if self.use_vibevoice:
-            audio_data = self._synthesize_speech(response_text)
-            return VoiceResponse(
-                text=response_text,
-                audio_data=audio_data
-            )
-        else:
-            return VoiceResponse(text=response_text)
-    
-    def _generate_response_text(self, intent, context: Optional[dict] = None) -> str:
-        """Genera el texto de respuesta"""
-        responses = {
-            "open_application": "Abriendo {target}",
-            "search_web": "Buscando {target}",
-            "system_control": "Ejecutando comando de sistema",
-            "media_control": "Control de medios ejecutado",
-            "information": "Aquí tienes la información",
-            "greeting": "Hola, ¿en qué puedo ayudarte?",
-            "exit": "Hasta luego, que tengas un buen día"
-        }
-        
-        response_template = responses.get(intent.command_type.value, "Comando ejecutado")
-        return response_template.format(target=intent.target or "aplicación")
-    
-    def _synthesize_speech(self, text: str) -> Optional[bytes]:
-        """Sintetiza voz usando VibeVoice"""
-        try:
-            with torch.no_grad():
-                audio = self.vibevoice.generate_speech(text, self.device)
-            
-            audio_np = audio.cpu().numpy()
-            audio_np = audio_np / np.max(np.abs(audio_np))
-            
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-            wavfile.write(temp_file.name, 22050, audio_np)
-            
-            with open(temp_file.name, 'rb') as f:
-                audio_data = f.read()
-            
-            os.unlink(temp_file.name)
-            return audio_data
-            
-        except Exception as e:
-            print(f"Error en síntesis: {e}")
-            return None
-    
-    def speak(self, response: VoiceResponse):
-        """Reproduce la respuesta de voz"""
-        if response.audio_data and self.use_vibevoice:
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-            temp_file.write(response.audio_data)
-            temp_file.close()
-            
-            pygame.mixer.music.load(temp_file.name)
-            pygame.mixer.music.play()
-            
-            while pygame.mixer.music.get_busy():
-                pygame.time.wait(100)
-            
-            os.unlink(temp_file.name)
-        else:
-            print(f"JARVIS: {response.text}")
-
-class CoquiTTSSynthesisAdapter(ResponseGenerator):
-    """Adaptador para síntesis de voz usando Coqui TTS"""
-    
-    def __init__(self):
-        try:
-            from TTS.api import TTS
-            self.tts = TTS("tts_models/es/css10/vits")
-            self.use_coqui = True
-            pygame.mixer.init()
-            print("✅ Coqui TTS configurado")
-        except Exception as e:
-            print(f"❌ Error configurando Coqui TTS: {e}")
-            self.use_coqui = False
-    
-    def generate_response(self, intent, context: Optional[dict] = None) -> VoiceResponse:
-        """Genera respuesta usando Coqui TTS"""
-        response_text = self._generate_response_text(intent, context)
-        
-        if self.use_coqui:
-            audio_data = self._synthesize_speech(response_text)
-            return VoiceResponse(
-                text=response_text,
-                audio_data=audio_data
-            )
-        else:
-            return VoiceResponse(text=response_text)
-    
-    def _generate_response_text(self, intent, context: Optional[dict] = None) -> str:
-        """Genera el texto de respuesta"""
-        # Similar al VibeVoice adapter
-        responses = {
-            "open_application": "Abriendo {target}",
-            "search_web": "Buscando {target}",
-            "system_control": "Ejecutando comando de sistema",
-            "media_control": "Control de medios ejecutado",
-            "information": "Aquí tienes la información",
-            "greeting": "Hola, ¿en qué puedo ayudarte?",
-            "exit": "Hasta luego, que tengas un buen día"
-        }
-        
-        response_template = responses.get(intent.command_type.value, "Comando ejecutado")
-        return response_template.format(target=intent.target or "aplicación")
-    
-    def _synthesize_speech(self, text: str) -> Optional[bytes]:
-        """Sintetiza voz usando Coqui TTS"""
-        try:
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-            self.tts.tts_to_file(text=text, file_path=temp_file.name)
-            
-            with open(temp_file.name, 'rb') as f:
-                audio_data = f.read()
-            
-            os.unlink(temp_file.name)
-            return audio_data
-            
-        except Exception as e:
-            print(f"Error en síntesis: {e}")
-            return None
-    
-    def speak(self, response: VoiceResponse):
-        """Reproduce la respuesta de voz"""
-        if response.audio_data and self.use_coqui:
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-            temp_file.write(response.audio_data)
-            temp_file.close()
-            
-            pygame.mixer.music.load(temp_file.name)
-            pygame.mixer.music.play()
-            
-            while pygame.mixer.music.get_busy():
-                pygame.time.wait(100)
-            
-            os.unlink(temp_file.name)
-        else:
-            print(f"JARVIS: {response.text}")
-
+"""
+Adaptador de salida - Síntesis de voz
+"""
+import re
+import numpy as np
+import threading
+from typing import Callable, Iterable, List, Optional
+from core.domain.entities import VoiceResponse
+from config.application_config import VoiceConfig
+from adapters.output.response_templates import TextResponseAdapter, fixed_response_phrases
+from adapters.output.audio_cache import SynthesizedAudioCache
+from adapters.output.audio_playback import AudioPlayer, encode_wav
+from adapters.model_pool import ModelPool
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?;:…])\s+")
+CLAUSE_BOUNDARY = re.compile(r"(?<=,)\s+")
+
+def split_into_chunks(text: str, max_chars: int = 120) -> List[str]:
+    """Divide el texto en oraciones y, si son largas, en cláusulas"""
+    chunks = []
+    for sentence in SENTENCE_BOUNDARY.split(text.strip()):
+        if len(sentence) <= max_chars:
+            if sentence:
+                chunks.append(sentence)
+            continue
+        
+        current = ""
+        for clause in CLAUSE_BOUNDARY.split(sentence):
+            if current and len(current) + len(clause) + 1 > max_chars:
+                chunks.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}" if current else clause
+        if current:
+            chunks.append(current)
+    return chunks
+
+class CachedSynthesisAdapter(TextResponseAdapter):
+    """Base de los adaptadores de síntesis con caché de audio por (motor, voz, texto)"""
+    
+    engine_name = "base"
+    voice_name = "default"
+    
+    def __init__(self, config: Optional[VoiceConfig] = None, model_pool: Optional[ModelPool] = None):
+        self.config = config or VoiceConfig()
+        # Con la caché de audio el motor pasa mucho tiempo inactivo: el pool puede descargarlo
+        self.model_pool = model_pool or ModelPool()
+        self.audio_cache = SynthesizedAudioCache(
+            max_entries=self.config.audio_cache_size,
+            persist_dir=self.config.audio_cache_dir
+        )
+        self._render_lock = threading.Lock()
+        self.player = AudioPlayer(volume=self.config.voice_volume)
+        self._stream_thread: Optional[threading.Thread] = None
+    
+    def generate_response(self, intent, context: Optional[dict] = None) -> VoiceResponse:
+        """Genera respuesta de voz con el motor configurado"""
+        response_text = self._generate_response_text(intent, context)
+        
+        if self.is_available and self._should_stream(response_text):
+            # El audio se sintetiza por fragmentos al reproducir
+            return VoiceResponse(text=response_text)
+        elif self.is_available:
+            audio_data = self._synthesize_speech(response_text)
+            return VoiceResponse(
+                text=response_text,
+                audio_data=audio_data
+            )
+        else:
+            return VoiceResponse(text=response_text)
+    
+    def prerender_response(self, intent, context: Optional[dict] = None) -> bool:
+        """Sintetiza y cachea la respuesta de una intención antes de que el núcleo la pida"""
+        if not self.is_available or (self.config.audio_cache_size <= 0 and not self.config.audio_cache_dir):
+            # Sin caché el audio especulativo no se podría reutilizar
+            return False
+        response_text = self._generate_response_text(intent, context)
+        if self._should_stream(response_text):
+            return False
+        return self._synthesize_speech(response_text) is not None
+    
+    def _synthesize_speech(self, text: str) -> Optional[bytes]:
+        """Sintetiza voz reutilizando el audio cacheado cuando existe"""
+        audio_data = self.audio_cache.get(self.engine_name, self.voice_name, text)
+        if audio_data is not None:
+            return audio_data
+        
+        with self._render_lock:
+            # Otro hilo pudo haber sintetizado la misma frase mientras esperábamos
+            audio_data = self.audio_cache.get(self.engine_name, self.voice_name, text)
+            if audio_data is not None:
+                return audio_data
+            
+            with self.metrics.timer("synthesis"):
+                audio_data = self._render_speech(text)
+            if audio_data:
+                self.audio_cache.put(self.engine_name, self.voice_name, text, audio_data)
+        return audio_data
+    
+    def synthesize_response(self, text: str) -> VoiceResponse:
+        """Construye una respuesta de voz para un texto fijo"""
+        if self.is_available:
+            return VoiceResponse(text=text, audio_data=self._synthesize_speech(text))
+        return VoiceResponse(text=text)
+    
+    def _render_speech(self, text: str) -> Optional[bytes]:
+        """Ejecuta el modelo de síntesis (implementado por cada motor)"""
+        return None
+    
+    def prerender(self, phrases: Optional[Iterable[str]] = None) -> int:
+        """Sintetiza por adelantado las frases fijas para reproducirlas sin latencia"""
+        if not self.is_available:
+            return 0
+        
+        rendered = 0
+        for phrase in phrases if phrases is not None else fixed_response_phrases():
+            self.audio_cache.pin(self.engine_name, self.voice_name, phrase)
+            if self.audio_cache.contains(self.engine_name, self.voice_name, phrase):
+                continue
+            if self._synthesize_speech(phrase):
+                rendered += 1
+        return rendered
+    
+    def speak(self, response: VoiceResponse, wait: bool = False, on_start: Optional[Callable[[], None]] = None):
+        """Reproduce la respuesta de voz en el hilo de reproducción sin bloquear; on_start avisa del primer audio"""
+        if response.audio_data and self.is_available:
+            self.last_spoken_text = response.text
+            self.player.play(response.audio_data, on_start=on_start)
+            if wait:
+                self.player.wait()
+        elif self.is_available and self._should_stream(response.text):
+            self.speak_streaming(response.text, wait=wait, on_start=on_start)
+        else:
+            print(f"JARVIS: {response.text}")
+            if on_start:
+                on_start()
+    
+    def speak_streaming(self, text: str, wait: bool = False, on_start: Optional[Callable[[], None]] = None):
+        """Sintetiza por fragmentos y reproduce el primero mientras se generan los siguientes"""
+        # Una respuesta nueva sustituye a la anterior: sus fragmentos pendientes ya no se reproducen
+        generation = self.player.next_generation()
+        self.last_spoken_text = text
+        chunks = split_into_chunks(text, self.config.streaming_chunk_chars)
+        
+        def produce():
+            first_audio = on_start
+            for chunk in chunks:
+                if generation != self.player.generation:
+                    return
+                audio_data = self._synthesize_speech(chunk)
+                if not audio_data:
+                    continue
+                # El reproductor compara la generación bajo su lock: no hay carrera con stop()
+                if not self.player.play(audio_data, generation, first_audio):
+                    return
+                first_audio = None
+        
+        self._stream_thread = threading.Thread(target=produce, name="jarvis-tts-stream", daemon=True)
+        self._stream_thread.start()
+        
+        if wait:
+            self._stream_thread.join()
+            self.player.wait()
+    
+    def _should_stream(self, text: str) -> bool:
+        """Solo las respuestas largas compensan la síntesis por fragmentos"""
+        return self.config.streaming_synthesis and len(text) >= self.config.streaming_min_chars
+    
+    def stop_speaking(self):
+        """Corta la respuesta en curso (barge-in)"""
+        self.player.stop()
+    
+    def close(self):
+        """Detiene el hilo de reproducción y el productor de fragmentos"""
+        # close() avanza la generación: el productor sale antes de sintetizar el siguiente fragmento
+        self.player.close()
+        if self._stream_thread is not None:
+            self._stream_thread.join(timeout=1.0)
+    
+    @property
+    def is_speaking(self) -> bool:
+        """Indica si hay una respuesta sonando"""
+        stream_active = self._stream_thread is not None and self._stream_thread.is_alive()
+        return stream_active or self.player.is_playing
+
+class VibeVoiceSynthesisAdapter(CachedSynthesisAdapter):
+    """Adaptador para síntesis de voz usando VibeVoice"""
+    
+    engine_name = "vibevoice"
+    voice_name = "microsoft/speecht5_tts"
+    
+    def __init__(self, config: Optional[VoiceConfig] = None, model_pool: Optional[ModelPool] = None):
+        super().__init__(config, model_pool)
+        self.model_key = f"vibevoice-{self.voice_name}"
+        try:
+            import torch
+            self._torch = torch
+            self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            self.model_pool.register(self.model_key, self._load_vibevoice)
+            self.model_pool.preload(self.model_key)
+            self.use_vibevoice = True
+            print("✅ VibeVoice configurado")
+        except Exception as e:
+            print(f"❌ Error configurando VibeVoice: {e}")
+            # El pool es compartido: no debe quedar un cargador que ya sabemos que falla
+            self.model_pool.unregister(self.model_key)
+            self.use_vibevoice = False
+    
+    def _load_vibevoice(self):
+        """Carga VibeVoice en el dispositivo elegido (un fallo no deja el modelo a medias en memoria)"""
+        from vibevoice import VibeVoice
+        vibevoice = VibeVoice.from_pretrained(self.voice_name)
+        vibevoice.eval()
+        vibevoice.to(self.device)
+        return vibevoice
+    
+    @property
+    def is_available(self) -> bool:
+        return self.use_vibevoice
+    
+    def _render_speech(self, text: str) -> Optional[bytes]:
+        """Sintetiza voz usando VibeVoice"""
+        try:
+            with self.model_pool.lease(self.model_key) as vibevoice, self._torch.no_grad():
+                audio = vibevoice.generate_speech(text, self.device)
+            
+            audio_np = audio.cpu().numpy()
+            audio_np = audio_np / np.max(np.abs(audio_np))
+            return encode_wav(audio_np, 22050)
+        
+        except Exception as e:
+            print(f"Error en síntesis: {e}")
+            return None
+
+class CoquiTTSSynthesisAdapter(CachedSynthesisAdapter):
+    """Adaptador para síntesis de voz usando Coqui TTS"""
+    
+    engine_name = "coqui"
+    voice_name = "tts_models/es/css10/vits"
+    
+    def __init__(self, config: Optional[VoiceConfig] = None, model_pool: Optional[ModelPool] = None):
+        super().__init__(config, model_pool)
+        self.model_key = f"coqui-{self.voice_name}"
+        try:
+            self.model_pool.register(self.model_key, self._load_tts)
+            self.model_pool.preload(self.model_key)
+            self.use_coqui = True
+            print("✅ Coqui TTS configurado")
+        except Exception as e:
+            print(f"❌ Error configurando Coqui TTS: {e}")
+            self.model_pool.unregister(self.model_key)
+            self.use_coqui = False
+    
+    def _load_tts(self):
+        """Carga el modelo de Coqui TTS"""
+        from TTS.api import TTS
+        return TTS(self.voice_name)
+    
+    @property
+    def is_available(self) -> bool:
+        return self.use_coqui
+    
+    def _render_speech(self, text: str) -> Optional[bytes]:
+        """Sintetiza voz usando Coqui TTS"""
+        try:
+            with self.model_pool.lease(self.model_key) as tts:
+                samples = tts.tts(text=text)
+                return encode_wav(np.asarray(samples), tts.synthesizer.output_sample_rate)
+        
+        except Exception as e:
+            print(f"Error en síntesis: {e}")
+            return None
+
+def create_synthesis_adapter(config: VoiceConfig, model_pool: Optional[ModelPool] = None) -> CachedSynthesisAdapter:
+    """VibeVoice y, si no está disponible, Coqui TTS cuando la configuración lo permite"""
+    voice_synthesis = VibeVoiceSynthesisAdapter(config, model_pool)
+    if not voice_synthesis.use_vibevoice and config.fallback_to_coqui:
+        voice_synthesis = CoquiTTSSynthesisAdapter(config, model_pool)
+    return voice_synthesis
@@ -0,0 +1,131 @@
+"""
+Aplicación - Comparación de backends de Whisper: factor de tiempo real (RTF) y tasa de error por palabra (WER)
+"""
+import argparse
+import json
+import re
+import time
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional
+from application.benchmark import BenchmarkItem, load_corpus, percentile
+from config.application_config import SpeechConfig
+
+def normalize_words(text: str) -> List[str]:
+    """Palabras en minúsculas sin puntuación (Whisper puntúa, las referencias no siempre)"""
+    return re.sub(r"[^\w\s]", " ", text.lower()).split()
+
+def word_edit_distance(reference: List[str], hypothesis: List[str]) -> int:
+    """Distancia de Levenshtein entre secuencias de palabras"""
+    previous = list(range(len(hypothesis) + 1))
+    for i, reference_word in enumerate(reference, 1):
+        current = [i] + [0] * len(hypothesis)
+        for j, hypothesis_word in enumerate(hypothesis, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (reference_word != hypothesis_word)
+            )
+        previous = current
+    return previous[-1]
+
+@dataclass
+class BackendResult:
+    """Resultados de una configuración de Whisper sobre el corpus"""
+    name: str
+    load_seconds: float = 0.0
+    audio_seconds: float = 0.0
+    transcription_seconds: float = 0.0
+    word_errors: int = 0
+    reference_words: int = 0
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def rtf(self) -> float:
+        """Segundos de cómputo por segundo de audio (menor es mejor)"""
+        return self.transcription_seconds / self.audio_seconds if self.audio_seconds else 0.0
+
+    @property
+    def wer(self) -> float:
+        """Errores de palabra sobre las palabras de referencia"""
+        return self.word_errors / self.reference_words if self.reference_words else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        """Resumen para la tabla y el JSON"""
+        latencies = sorted(self.latencies)
+        return {
+            "load_s": self.load_seconds,
+            "rtf": self.rtf,
+            "wer": self.wer,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000
+        }
+
+def run_backend(config: SpeechConfig, items: List[BenchmarkItem], warmup: int = 1) -> BackendResult:
+    """Carga el backend y transcribe el corpus midiendo RTF y WER"""
+    from adapters.input.audio_processing import WHISPER_SAMPLE_RATE, load_wav
+    from adapters.input.speech_recognition_adapter import WhisperSpeechRecognitionAdapter
+
+    result = BackendResult(name=f"{config.whisper_model}/{config.whisper_compute_type}")
+    started = time.perf_counter()
+    adapter = WhisperSpeechRecognitionAdapter(config, use_microphone=False)
+    result.load_seconds = time.perf_counter() - started
+
+    audio = [(item, load_wav(item.wav_path)) for item in items]
+    for _, samples in audio[:warmup]:
+        adapter.transcribe_samples(samples)
+
+    for item, samples in audio:
+        started = time.perf_counter()
+        command = adapter.transcribe_samples(samples)
+        elapsed = time.perf_counter() - started
+
+        result.latencies.append(elapsed)
+        result.transcription_seconds += elapsed
+        result.audio_seconds += len(samples) / WHISPER_SAMPLE_RATE
+        if item.text is not None:
+            reference = normalize_words(item.text)
+            hypothesis = normalize_words(command.text if command else "")
+            result.word_errors += word_edit_distance(reference, hypothesis)
+            result.reference_words += len(reference)
+    return result
+
+def print_report(results: List[BackendResult]):
+    """Tabla comparativa"""
+    print(f"{'backend':<20}{'carga s':>9}{'RTF':>8}{'WER':>8}{'p50 ms':>10}{'p95 ms':>10}")
+    for result in results:
+        stats = result.summary()
+        print(
+            f"{result.name:<20}{stats['load_s']:>9.1f}{stats['rtf']:>8.3f}{stats['wer']:>8.1%}"
+            f"{stats['p50_ms']:>10.0f}{stats['p95_ms']:>10.0f}"
+        )
+
+def main(argv: Optional[List[str]] = None):
+    """Punto de entrada de la comparación de backends"""
+    parser = argparse.ArgumentParser(description="Compara tamaños y precisiones de Whisper en CPU")
+    parser.add_argument("corpus", help="directorio de WAV con transcripciones de referencia .txt")
+    parser.add_argument("--models", default="tiny,base,small")
+    parser.add_argument("--compute-types", default="float32,int8")
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--json", dest="json_path", help="guarda los resultados en JSON")
+    args = parser.parse_args(argv)
+
+    items = [item for item in load_corpus(args.corpus) if item.wav_path]
+    if not items:
+        print("❌ El corpus no contiene archivos WAV")
+        return
+
+    base_config = SpeechConfig(streaming_capture=False, wake_word_gate=False, whisper_threads=args.threads)
+    results = []
+    for model in args.models.split(","):
+        for compute_type in args.compute_types.split(","):
+            config = replace(base_config, whisper_model=model, whisper_compute_type=compute_type)
+            try:
+                results.append(run_backend(config, items, args.warmup))
+            except Exception as e:
+                print(f"❌ Error con {model}/{compute_type}: {e}")
+
+    print_report(results)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({result.name: result.summary() for result in results}, f, indent=2)
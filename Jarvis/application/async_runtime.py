@@ -0,0 +1,221 @@
+"""
+Aplicación - Runtime asíncrono: captura, ASR, núcleo, síntesis y reproducción como etapas concurrentes
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from core.domain.entities import CommandContext, VoiceCommand, VoiceResponse
+from config.application_config import RuntimeConfig
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+@dataclass
+class PipelineItem:
+    """Trabajo que avanza por las etapas del runtime"""
+    command: VoiceCommand
+    generation: int
+    context: Optional[CommandContext] = None
+    text: Optional[str] = None
+    response: Optional[VoiceResponse] = None
+    is_exit: bool = False
+
+class StageQueue:
+    """Cola acotada entre etapas con política explícita de descarte"""
+
+    def __init__(self, name: str, maxsize: int, policy: str = DROP_OLDEST):
+        self.name = name
+        self.policy = policy
+        self.dropped = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def offer(self, item: Any) -> bool:
+        """Encola sin bloquear; si está llena descarta según la política"""
+        if self._queue.full():
+            self.dropped += 1
+            if self.policy == DROP_NEWEST:
+                print(f"⏭️ Cola {self.name} llena: se descarta el elemento nuevo")
+                return False
+            self._queue.get_nowait()
+            print(f"⏭️ Cola {self.name} llena: se descarta el elemento más antiguo")
+        self._queue.put_nowait(item)
+        return True
+
+    async def put(self, item: Any):
+        """Encola esperando espacio (contrapresión hacia la etapa anterior)"""
+        await self._queue.put(item)
+
+    async def get(self) -> Any:
+        """Espera el siguiente elemento"""
+        return await self._queue.get()
+
+class AsyncJarvisRuntime:
+    """Ejecuta el bucle de voz de JarvisApplication como etapas unidas por colas acotadas"""
+
+    def __init__(self, app, config: Optional[RuntimeConfig] = None):
+        self.app = app
+        self.config = config or app.config.runtime
+        self.generation = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._finished: Optional[asyncio.Event] = None
+        self._accepting = True
+
+        # Un hilo por modelo: ASR y TTS se solapan, pero cada modelo atiende una llamada a la vez
+        self._capture_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jarvis-capture")
+        self._asr_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jarvis-asr")
+        self._core_executor = ThreadPoolExecutor(max_workers=self.config.core_workers, thread_name_prefix="jarvis-core")
+        self._tts_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jarvis-tts")
+
+    async def run(self):
+        """Arranca las etapas y espera al comando de salida"""
+        self._loop = asyncio.get_running_loop()
+        self._finished = asyncio.Event()
+        size = self.config.stage_queue_size
+        policy = self.config.drop_policy
+
+        # Entrada: se descarta según la política para no frenar al micrófono
+        self.utterances = StageQueue("enunciados", size, policy)
+        self.commands = StageQueue("comandos", size, policy)
+        # Salida: contrapresión; las respuestas obsoletas se descartan por generación
+        self.responses = StageQueue("respuestas", size)
+        self.playback = StageQueue("reproducción", size)
+
+        speech_recognition = await self._call(self._capture_executor, self.app.speech_recognition.resolve)
+        streaming = getattr(speech_recognition, "is_streaming", False)
+        if streaming:
+            speech_recognition.start_streaming(transcribe=False)
+            # Transcripción incremental: las intenciones comprometidas antes del final entran como comandos
+            early_listeners = getattr(speech_recognition, "early_command_listeners", None)
+            if early_listeners is not None:
+                early_listeners.append(self._on_early_command)
+
+        tasks = [
+            asyncio.create_task(self._capture_stage(speech_recognition, streaming)),
+            asyncio.create_task(self._core_stage()),
+            asyncio.create_task(self._synthesis_stage()),
+            asyncio.create_task(self._playback_stage())
+        ]
+        if streaming:
+            tasks.append(asyncio.create_task(self._asr_stage(speech_recognition)))
+
+        try:
+            await self._finished.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for executor in (self._capture_executor, self._asr_executor, self._core_executor, self._tts_executor):
+                executor.shutdown(wait=False)
+
+    async def _call(self, executor: Optional[ThreadPoolExecutor], function: Callable, *args) -> Any:
+        """Ejecuta una llamada bloqueante fuera del bucle de eventos"""
+        return await self._loop.run_in_executor(executor, function, *args)
+
+    async def _capture_stage(self, speech_recognition, streaming: bool):
+        """1. Captura: enunciados del micrófono (o comandos ya transcritos sin captura continua)"""
+        while self._accepting:
+            if streaming and not speech_recognition.is_streaming:
+                # La captura continua abandonó: listen() pasa a la escucha bloqueante
+                streaming = False
+            if streaming:
+                utterance = await self._call(self._capture_executor, speech_recognition.next_utterance, 0.5)
+                if utterance is not None:
+                    self.utterances.offer(utterance)
+            else:
+                command = await self._call(self._capture_executor, speech_recognition.listen)
+                if command:
+                    self.commands.offer(command)
+
+    def _on_early_command(self, command: VoiceCommand):
+        """Llamado desde el hilo de parciales: encola el comando en el bucle de eventos"""
+        self._loop.call_soon_threadsafe(self.commands.offer, command)
+
+    async def _asr_stage(self, speech_recognition):
+        """2. ASR: transcribe cada enunciado en el hilo del modelo"""
+        while True:
+            utterance = await self.utterances.get()
+            if self._is_stale(utterance.ended_at):
+                print("⏭️ Enunciado descartado por antigüedad")
+                continue
+            try:
+                command = await self._call(self._asr_executor, speech_recognition.transcribe_utterance, utterance)
+            except Exception as e:
+                print(f"❌ Error en reconocimiento: {e}")
+                continue
+            if command:
+                self.commands.offer(command)
+
+    async def _core_stage(self):
+        """3. Núcleo: activa, interrumpe la respuesta en curso y resuelve intención y acción"""
+        while True:
+            command = await self.commands.get()
+            if self._is_stale(command.timestamp):
+                print(f"⏭️ Comando descartado por antigüedad: {command.text}")
+                continue
+
+            text = command.text.lower()
+            if self.app.wake_word in text:
+                # Barge-in: todo lo pendiente de generaciones anteriores queda obsoleto
+                self.generation += 1
+                self.app.voice_synthesis.stop_speaking()
+                core = self.app.core
+                try:
+                    context = await self._call(
+                        self._core_executor, core.run_pipeline, command, core.skip_stages | {"response"}
+                    )
+                except Exception as e:
+                    print(f"❌ Error procesando comando: {e}")
+                    continue
+
+                is_exit = self.app.is_exit_command(command.text)
+                await self.responses.put(PipelineItem(command, self.generation, context=context, is_exit=is_exit))
+                if is_exit:
+                    self._accepting = False
+                    return
+
+            elif any(word in text for word in ["hola jarvis", "hey jarvis"]):
+                await self.responses.put(PipelineItem(command, self.generation, text=self.app.GREETING_TEXT))
+
+    async def _synthesis_stage(self):
+        """4. Síntesis: genera el audio de la respuesta en el hilo del motor de voz"""
+        while True:
+            item: PipelineItem = await self.responses.get()
+            if item.generation != self.generation and not item.is_exit:
+                continue
+
+            try:
+                if item.context is not None:
+                    item.response = await self._call(self._tts_executor, self.app.core.generate_response, item.context)
+                else:
+                    item.response = await self._call(
+                        self._tts_executor, self.app.voice_synthesis.synthesize_response, item.text
+                    )
+            except Exception as e:
+                print(f"❌ Error en síntesis: {e}")
+                if item.is_exit:
+                    self._finished.set()
+                continue
+            await self.playback.put(item)
+
+    async def _playback_stage(self):
+        """5. Reproducción: ocupa la etapa mientras suena para que la contrapresión sea real"""
+        while True:
+            item: PipelineItem = await self.playback.get()
+            if item.generation != self.generation and not item.is_exit:
+                continue
+
+            self.app.speak_response(item.command, item.response)
+            while self.app.voice_synthesis.is_speaking and item.generation == self.generation:
+                await asyncio.sleep(0.05)
+
+            if item.is_exit:
+                self._finished.set()
+                return
+
+    def _is_stale(self, timestamp: Optional[float]) -> bool:
+        """Un comando que esperó más de max_command_age ya no es relevante"""
+        if not timestamp or self.config.max_command_age <= 0:
+            return False
+        return time.time() - timestamp > self.config.max_command_age
@@ -0,0 +1,214 @@
+"""
+Aplicación - Banco de pruebas de latencia extremo a extremo sin micrófono ni altavoces
+"""
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+from core.domain.entities import SystemAction, VoiceCommand
+from core.domain.services import ActionExecutor, JarvisCore
+from adapters.input.command_processing_adapter import AICommandProcessorAdapter, IntentAnalyzerAdapter
+from adapters.output.response_templates import TextResponseAdapter
+from config.application_config import JarvisConfig
+
+# Sin etapa de reproducción: sin altavoz solo se mediría el descarte del audio
+STAGES = ("transcription", "core", "synthesis", "total")
+
+class StubActionExecutor(ActionExecutor):
+    """Ejecutor que solo registra las acciones"""
+
+    def __init__(self):
+        self.actions: List[SystemAction] = []
+
+    def execute_action(self, action: SystemAction) -> bool:
+        self.actions.append(action)
+        return True
+
+@dataclass
+class BenchmarkItem:
+    """Elemento del corpus: audio o transcripción"""
+    name: str
+    text: Optional[str] = None
+    wav_path: Optional[str] = None
+
+@dataclass
+class BenchmarkResult:
+    """Latencias por etapa y rendimiento global"""
+    samples: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    items: int = 0
+    # Audios sin comando (descartados por la palabra de activación o sin texto): no cuentan en items
+    dropped: int = 0
+    wall_time: float = 0.0
+
+    def record(self, stage: str, seconds: float):
+        """Registra una medición"""
+        self.samples[stage].append(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Percentiles p50/p95/p99 en milisegundos por etapa"""
+        report = {}
+        for stage in STAGES:
+            values = sorted(self.samples.get(stage, []))
+            if not values:
+                continue
+            report[stage] = {
+                "count": len(values),
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "max_ms": values[-1] * 1000
+            }
+        return report
+
+    def throughput(self) -> float:
+        """Comandos procesados por segundo"""
+        return self.items / self.wall_time if self.wall_time else 0.0
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Percentil con interpolación lineal sobre valores ordenados"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+def load_corpus(path: str) -> Iterator[BenchmarkItem]:
+    """Lee un directorio de WAV (con .txt opcional de referencia) o un archivo de transcripciones"""
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if not name.lower().endswith(".wav"):
+                continue
+            wav_path = os.path.join(path, name)
+            reference_path = os.path.splitext(wav_path)[0] + ".txt"
+            reference = None
+            if os.path.exists(reference_path):
+                with open(reference_path, encoding="utf-8") as f:
+                    reference = f.read().strip()
+            yield BenchmarkItem(name=name, text=reference, wav_path=wav_path)
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    yield BenchmarkItem(name=f"línea {line_number}", text=line.strip())
+
+class BenchmarkRunner:
+    """Alimenta el corpus por ASR, núcleo y síntesis midiendo cada etapa"""
+
+    def __init__(self, speech_recognition=None, response_generator=None):
+        self.speech_recognition = speech_recognition
+        self.response_generator = response_generator or TextResponseAdapter()
+        self.action_executor = StubActionExecutor()
+        self.core = JarvisCore(
+            command_processor=AICommandProcessorAdapter(),
+            intent_analyzer=IntentAnalyzerAdapter(),
+            response_generator=self.response_generator,
+            action_executor=self.action_executor
+        )
+
+    def run(self, items: List[BenchmarkItem], warmup: int = 1, repeat: int = 1) -> BenchmarkResult:
+        """Ejecuta el corpus y retorna las latencias"""
+        for item in items[:warmup]:
+            self._run_item(item, BenchmarkResult())
+
+        result = BenchmarkResult()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for item in items:
+                if self._run_item(item, result):
+                    result.items += 1
+                else:
+                    result.dropped += 1
+        result.wall_time = time.perf_counter() - started
+        return result
+
+    def _run_item(self, item: BenchmarkItem, result: BenchmarkResult) -> bool:
+        """Procesa un elemento midiendo cada etapa; False si no produjo comando"""
+        item_started = time.perf_counter()
+
+        if item.wav_path and self.speech_recognition:
+            from adapters.input.audio_processing import load_wav
+            samples = load_wav(item.wav_path)
+            started = time.perf_counter()
+            command = self.speech_recognition.transcribe_samples(samples, timestamp=time.time())
+            result.record("transcription", time.perf_counter() - started)
+            if command is None:
+                return False
+        elif item.text:
+            command = VoiceCommand(text=item.text, confidence=1.0, timestamp=time.time())
+        else:
+            return False
+
+        started = time.perf_counter()
+        context = self.core.run_pipeline(command, skip_stages=self.core.skip_stages | {"response"})
+        result.record("core", time.perf_counter() - started)
+
+        started = time.perf_counter()
+        self.response_generator.generate_response(context.intent)
+        result.record("synthesis", time.perf_counter() - started)
+
+        result.record("total", time.perf_counter() - item_started)
+        return True
+
+def print_report(result: BenchmarkResult):
+    """Muestra la tabla de latencias"""
+    print(f"📊 {result.items} comandos en {result.wall_time:.2f} s ({result.throughput():.1f} comandos/s)")
+    if result.dropped:
+        print(f"🔇 {result.dropped} audios sin comando (palabra de activación no detectada o sin texto)")
+    print(f"{'etapa':<14}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage, stats in result.summary().items():
+        print(
+            f"{stage:<14}{stats['count']:>7}{stats['p50_ms']:>10.2f}"
+            f"{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}"
+        )
+
+def create_response_generator(engine: str, config: JarvisConfig):
+    """Construye el generador de respuestas indicado"""
+    if engine == "vibevoice":
+        from adapters.output.voice_synthesis_adapter import VibeVoiceSynthesisAdapter
+        return VibeVoiceSynthesisAdapter(config.voice)
+    if engine == "coqui":
+        from adapters.output.voice_synthesis_adapter import CoquiTTSSynthesisAdapter
+        return CoquiTTSSynthesisAdapter(config.voice)
+    return TextResponseAdapter()
+
+def main(argv: Optional[List[str]] = None):
+    """Punto de entrada del banco de pruebas"""
+    parser = argparse.ArgumentParser(description="Banco de pruebas de latencia de JARVIS")
+    parser.add_argument("corpus", help="directorio de WAV o archivo con una transcripción por línea")
+    parser.add_argument("--tts", choices=["none", "vibevoice", "coqui"], default="none")
+    parser.add_argument("--no-tts-cache", action="store_true", help="sintetiza cada respuesta desde cero")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", dest="json_path", help="guarda el resumen en JSON")
+    args = parser.parse_args(argv)
+
+    config = JarvisConfig()
+    config.speech.streaming_capture = False
+    if args.no_tts_cache:
+        config.voice.audio_cache_size = 0
+        config.voice.audio_cache_dir = None
+
+    items = list(load_corpus(args.corpus))
+    speech_recognition = None
+    if any(item.wav_path for item in items):
+        from adapters.input.speech_recognition_adapter import WhisperSpeechRecognitionAdapter
+        speech_recognition = WhisperSpeechRecognitionAdapter(config.speech, use_microphone=False)
+
+    runner = BenchmarkRunner(speech_recognition, create_response_generator(args.tts, config))
+    result = runner.run(items, warmup=args.warmup, repeat=args.repeat)
+    print_report(result)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "items": result.items,
+                "dropped": result.dropped,
+                "wall_time_s": result.wall_time,
+                "throughput_per_s": result.throughput(),
+                "stages": result.summary()
+            }, f, indent=2, ensure_ascii=False)
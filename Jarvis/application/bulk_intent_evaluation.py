@@ -0,0 +1,168 @@
+"""
+Aplicación - Evaluación masiva de intenciones en modo texto con un pool de procesos
+"""
+import argparse
+import json
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from core.domain.entities import CommandType, VoiceCommand
+from core.domain.services import JarvisCore
+from adapters.input.command_processing_adapter import AICommandProcessorAdapter, IntentAnalyzerAdapter
+from adapters.output.response_templates import TextResponseAdapter
+from application.benchmark import StubActionExecutor
+
+# Solo se resuelve la intención: sin respuesta, acción ni sentimiento
+EVALUATION_SKIPPED_STAGES = frozenset({"sentiment", "response", "action"})
+
+_worker_core: Optional[JarvisCore] = None
+
+def _init_worker():
+    """Construye los adaptadores una vez por proceso"""
+    global _worker_core
+    _worker_core = JarvisCore(
+        command_processor=AICommandProcessorAdapter(),
+        intent_analyzer=IntentAnalyzerAdapter(),
+        response_generator=TextResponseAdapter(),
+        action_executor=StubActionExecutor(),
+        skip_stages=EVALUATION_SKIPPED_STAGES
+    )
+
+def evaluate_chunk(chunk: List[Tuple[Optional[str], str]]) -> List[Dict[str, Optional[str]]]:
+    """Resuelve la intención de un bloque de transcripciones"""
+    if _worker_core is None:
+        _init_worker()
+
+    results = []
+    for expected, text in chunk:
+        context = _worker_core.run_pipeline(VoiceCommand(text=text, confidence=1.0, timestamp=0.0))
+        results.append({
+            "text": text,
+            "expected": expected,
+            "predicted": context.intent.command_type.value,
+            "target": context.intent.target
+        })
+    return results
+
+def read_transcripts(lines: Iterable[str]) -> Iterator[Tuple[Optional[str], str]]:
+    """Lee 'texto' o 'tipo_esperado<TAB>texto' por línea"""
+    valid_types = {command_type.value for command_type in CommandType}
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+        label, separator, text = line.partition("\t")
+        if separator and label in valid_types:
+            yield label, text
+        else:
+            yield None, line
+
+def chunked(items: Iterator, size: int) -> Iterator[list]:
+    """Agrupa un iterador en bloques sin materializarlo"""
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+class ConfusionMatrix:
+    """Matriz de confusión esperado x predicho"""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.labeled = 0
+        self.correct = 0
+
+    def add(self, expected: Optional[str], predicted: str):
+        """Acumula un resultado etiquetado"""
+        if expected is None:
+            return
+        self.counts[(expected, predicted)] += 1
+        self.labeled += 1
+        self.correct += expected == predicted
+
+    @property
+    def accuracy(self) -> float:
+        """Exactitud sobre las líneas etiquetadas"""
+        return self.correct / self.labeled if self.labeled else 0.0
+
+    def to_dict(self) -> Dict[str, Dict[str, int]]:
+        """Matriz como diccionario anidado"""
+        labels = [command_type.value for command_type in CommandType]
+        return {
+            expected: {predicted: self.counts[(expected, predicted)] for predicted in labels}
+            for expected in labels
+        }
+
+    def render(self) -> str:
+        """Tabla de texto de la matriz"""
+        labels = [command_type.value for command_type in CommandType]
+        width = max(len(label) for label in labels) + 2
+        header = " " * width + "".join(f"{label[:10]:>12}" for label in labels)
+        rows = [header]
+        for expected in labels:
+            row = "".join(f"{self.counts[(expected, predicted)]:>12}" for predicted in labels)
+            rows.append(f"{expected:<{width}}{row}")
+        return "\n".join(rows)
+
+def evaluate_stream(
+    lines: Iterable[str],
+    output: TextIO,
+    workers: Optional[int] = None,
+    chunk_size: int = 1000,
+    max_pending: Optional[int] = None
+) -> Tuple[int, ConfusionMatrix]:
+    """Reparte las transcripciones en bloques por el pool y escribe los resultados en orden"""
+    matrix = ConfusionMatrix()
+    processed = 0
+
+    workers = workers or os.cpu_count() or 1
+    # Un máximo de bloques en vuelo mantiene la memoria acotada sin importar el tamaño del corpus
+    max_pending = max_pending or 2 * workers
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        pending = deque()
+
+        def drain_oldest():
+            nonlocal processed
+            for result in pending.popleft().result():
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                matrix.add(result["expected"], result["predicted"])
+                processed += 1
+
+        for chunk in chunked(read_transcripts(lines), chunk_size):
+            if len(pending) >= max_pending:
+                drain_oldest()
+            pending.append(executor.submit(evaluate_chunk, chunk))
+
+        while pending:
+            drain_oldest()
+
+    return processed, matrix
+
+def main(argv: Optional[List[str]] = None):
+    """Punto de entrada de la evaluación masiva"""
+    parser = argparse.ArgumentParser(description="Evaluación masiva de intenciones de JARVIS")
+    parser.add_argument("transcripts", help="archivo con 'texto' o 'tipo<TAB>texto' por línea")
+    parser.add_argument("--output", default="intents.jsonl", help="intenciones resueltas en JSON lines")
+    parser.add_argument("--matrix", help="guarda la matriz de confusión en JSON")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    with open(args.transcripts, encoding="utf-8") as lines, open(args.output, "w", encoding="utf-8") as output:
+        processed, matrix = evaluate_stream(lines, output, args.workers, args.chunk_size)
+    elapsed = time.perf_counter() - started
+
+    print(f"📊 {processed} transcripciones en {elapsed:.2f} s ({processed / elapsed if elapsed else 0:.0f}/s)")
+    if matrix.labeled:
+        print(f"🎯 Exactitud: {matrix.accuracy:.2%} sobre {matrix.labeled} etiquetadas")
+        print(matrix.render())
+
+    if args.matrix:
+        with open(args.matrix, "w", encoding="utf-8") as f:
+            json.dump({"accuracy": matrix.accuracy, "labeled": matrix.labeled, "matrix": matrix.to_dict()}, f, indent=2)
@@ -1,103 +1,343 @@
-"""
-Aplicación principal de JARVIS usando Arquitectura Hexagonal
-"""
-import time
-from typing import Optional
-from core.domain.entities import VoiceCommand, VoiceResponse
-from core.domain.services import JarvisCore
-from adapters.input.speech_recognition_adapter import WhisperSpeechRecognitionAdapter
-from adapters.input.command_processing_adapter import AICommandProcessorAdapter, IntentAnalyzerAdapter
-from adapters.output.voice_synthesis_adapter import VibeVoiceSynthesisAdapter, CoquiTTSSynthesisAdapter
-from adapters.output.system_action_adapter import SystemActionAdapter
-
-class JarvisApplication:
-    """Aplicación principal de JARVIS"""
-    
-    def __init__(self):
-        print("🤖 Inicializando JARVIS con Arquitectura Hexagonal...")
-        
-        # Configurar adaptadores
-        self._setup_adapters()
-        
-        # Configurar núcleo
-        self._setup_core()
-        
-        # Configuración de la aplicación
-        self.is_running = True
-        self.wake_word = "jarvis"
-        
-        print("✅ JARVIS inicializado correctamente")
-    
-    def _setup_adapters(self):
-        """Configura los adaptadores de entrada y salida"""
-        # Adaptadores de entrada
-        self.speech_recognition = WhisperSpeechRecognitionAdapter()
-        self.command_processor = AICommandProcessorAdapter()
-        self.intent_analyzer = IntentAnalyzerAdapter()
-        
-        # Adaptadores de salida
-        self.voice_synthesis = VibeVoiceSynthesisAdapter()
-        self.system_action = SystemActionAdapter()
-        
-        # Fallback para síntesis de voz
-        if not hasattr(self.voice_synthesis, 'use_vibevoice') or not self.voice_synthesis.use_vibevoice:
-            self.voice_synthesis = CoquiTTSSynthesisAdapter()
-    
-    def _setup_core(self):
-        """Configura el núcleo de JARVIS"""
-        self.core = JarvisCore(
-            command_processor=self.command_processor,
-            intent_analyzer=self.intent_analyzer,
-            response_generator=self.voice_synthesis,
-            action_executor=self.system_action
-        )
-    
-    def run(self):
-        """Ejecuta la aplicación principal"""
-        # Mensaje de bienvenida
-        welcome_response = VoiceResponse(text="JARVIS está activo y listo para ayudarte")
-        self.voice_synthesis.speak(welcome_response)
-        
-        print("�� JARVIS está escuchando...")
-        print("💡 Di 'Jarvis' seguido de tu comando")
-        print("🔴 Di 'adiós' para salir")
-        
-        while self.is_running:
-            # Escuchar comando
-            command = self.speech_recognition.listen()
-            
-            if command:
-                # Verificar palabra de activación
-                if self.wake_word in command.text.lower():
-                    # Procesar comando
-                    response = self.core.handle_voice_command(command)
-                    
-                    # Reproducir respuesta
-                    self.voice_synthesis.speak(response)
-                    
-                    # Verificar si es comando de salida
-                    if "adiós" in command.text.lower() or "salir" in command.text.lower():
-                        self.is_running = False
-                
-                elif any(word in command.text.lower() for word in ["hola jarvis", "hey jarvis"]):
-                    # Saludo directo
-                    greeting_response = VoiceResponse(text="Hola, ¿en qué puedo ayudarte?")
-                    self.voice_synthesis.speak(greeting_response)
-        
-        # Mensaje de despedida
-        goodbye_response = VoiceResponse(text="JARVIS se está cerrando. Hasta luego!")
-        self.voice_synthesis.speak(goodbye_response)
-        print("👋 JARVIS se ha cerrado")
-
-def main():
-    """Función principal"""
-    try:
-        jarvis = JarvisApplication()
-        jarvis.run()
-    except KeyboardInterrupt:
-        print("\n👋 JARVIS interrumpido por el usuario")
-    except Exception as e:
-        print(f"❌ Error en JARVIS: {e}")
-
-if __name__ == "__main__":
+"""
+Aplicación principal de JARVIS usando Arquitectura Hexagonal
+"""
+import argparse
+import asyncio
+import time
+import threading
+from typing import List, Optional
+from core.domain.entities import CommandContext, VoiceCommand, VoiceResponse
+from core.domain.services import JarvisCore, MetricsRecorder, NullMetricsRecorder
+from adapters.input.command_processing_adapter import AICommandProcessorAdapter, IntentAnalyzerAdapter
+from adapters.input.cached_command_processor import CachedCommandProcessor
+from adapters.output.response_templates import TextResponseAdapter, fixed_response_phrases
+from adapters.output.system_action_adapter import SystemActionAdapter
+from adapters.model_pool import ModelPool
+from application.lazy_adapter import LazyAdapter, StartupReport
+from config.application_config import JarvisConfig, DEFAULT_CONFIG
+
+class JarvisApplication:
+    """Aplicación principal de JARVIS"""
+    
+    WELCOME_TEXT = "JARVIS está activo y listo para ayudarte"
+    GREETING_TEXT = "Hola, ¿en qué puedo ayudarte?"
+    GOODBYE_TEXT = "JARVIS se está cerrando. Hasta luego!"
+    APPLICATION_PHRASES = [WELCOME_TEXT, GREETING_TEXT, GOODBYE_TEXT]
+    
+    def __init__(self, config: Optional[JarvisConfig] = None, text_mode: bool = False, headless: bool = False):
+        print("🤖 Inicializando JARVIS con Arquitectura Hexagonal...")
+        self.config = config or DEFAULT_CONFIG
+        self.text_mode = text_mode
+        # Sin micrófono ni altavoces locales: el audio llega y sale por el servidor
+        self.headless = headless
+        self.startup_report = StartupReport()
+        self.metrics = self._create_metrics()
+        self.model_pool = ModelPool(
+            memory_budget_mb=self.config.runtime.model_memory_budget_mb,
+            idle_unload_seconds=self.config.runtime.model_idle_unload_seconds
+        )
+        
+        # Configurar adaptadores
+        self._setup_adapters()
+        
+        # Configurar núcleo
+        self._setup_core()
+        
+        # Configuración de la aplicación
+        self.is_running = True
+        self.wake_word = self.config.speech.wake_word
+        
+        self.startup_report.record("núcleo y adaptadores ligeros", self.startup_report.elapsed())
+        self._report_when_warm()
+        print("✅ JARVIS inicializado correctamente")
+    
+    def _create_metrics(self) -> MetricsRecorder:
+        """Construye el registro de latencias (sin coste si está deshabilitado)"""
+        metrics_config = self.config.metrics
+        if not metrics_config.enabled:
+            return NullMetricsRecorder()
+        
+        from adapters.output.metrics_adapter import HistogramMetricsRecorder, JsonLinesExporter, PrometheusTextExporter
+        exporters = []
+        if metrics_config.jsonl_path:
+            exporters.append(JsonLinesExporter(metrics_config.jsonl_path))
+        if metrics_config.prometheus_port:
+            exporters.append(PrometheusTextExporter(metrics_config.prometheus_port))
+        return HistogramMetricsRecorder(exporters)
+    
+    def _setup_adapters(self):
+        """Configura los adaptadores de entrada y salida"""
+        # Adaptadores de entrada (los modelos se cargan en segundo plano)
+        self.speech_recognition = LazyAdapter(
+            "reconocimiento de voz",
+            self._create_speech_recognition,
+            report=self.startup_report
+        )
+        self.command_processor = CachedCommandProcessor(
+            AICommandProcessorAdapter(),
+            max_entries=self.config.runtime.intent_cache_size
+        )
+        self.intent_analyzer = IntentAnalyzerAdapter()
+        
+        # Adaptadores de salida: mientras la síntesis carga se responde en texto
+        self.voice_synthesis = LazyAdapter(
+            "síntesis de voz",
+            self._create_voice_synthesis,
+            fallback=TextResponseAdapter(),
+            report=self.startup_report
+        )
+        self.system_action = SystemActionAdapter()
+        if self.config.system.async_actions:
+            from adapters.output.async_action_adapter import AsyncActionExecutor
+            self.system_action = AsyncActionExecutor(
+                self.system_action,
+                max_workers=self.config.system.action_workers,
+                default_timeout=self.config.system.action_timeout
+            )
+        
+        self.voice_synthesis.warm_up()
+        if not self.text_mode:
+            self.speech_recognition.warm_up()
+    
+    def _create_speech_recognition(self):
+        """Construye el adaptador de Whisper (importa torch y carga el modelo)"""
+        if self.config.runtime.model_processes:
+            from application.model_workers import ProcessSpeechRecognitionAdapter
+            speech_recognition = ProcessSpeechRecognitionAdapter(
+                self.config.speech,
+                use_microphone=not self.headless,
+                transcribe=not self.config.runtime.async_pipeline,
+                **self._worker_options()
+            )
+        else:
+            from adapters.input.speech_recognition_adapter import WhisperSpeechRecognitionAdapter
+            speech_recognition = WhisperSpeechRecognitionAdapter(
+                self.config.speech,
+                use_microphone=not self.headless,
+                model_pool=self.model_pool,
+                transcribe=not self.config.runtime.async_pipeline
+            )
+        speech_recognition.metrics = self.metrics
+        speech_recognition.output_active = lambda: self.voice_synthesis.is_speaking
+        speech_recognition.output_text = lambda: self.voice_synthesis.last_spoken_text
+        
+        speech_config = self.config.speech
+        if speech_config.incremental_asr:
+            # Los parciales no pasan por la caché de intenciones: casi nunca se repiten
+            from adapters.input.early_intent_commit import EarlyIntentCommit
+            speech_recognition.early_commit = EarlyIntentCommit(
+                self.command_processor.processor,
+                wake_word=speech_config.wake_word,
+                eligible_intents=speech_config.early_commit_intents,
+                stable_partials=speech_config.early_commit_stable_partials,
+                on_match=self._speculate
+            )
+        return speech_recognition
+    
+    def _create_voice_synthesis(self):
+        """Construye la síntesis de voz con fallback a Coqui y pre-renderiza las frases fijas"""
+        if self.config.runtime.model_processes:
+            from application.model_workers import ProcessSynthesisAdapter
+            voice_synthesis = ProcessSynthesisAdapter(self.config.voice, **self._worker_options())
+        else:
+            from adapters.output.voice_synthesis_adapter import create_synthesis_adapter
+            voice_synthesis = create_synthesis_adapter(self.config.voice, self.model_pool)
+        
+        voice_synthesis.metrics = self.metrics
+        voice_synthesis.prerender(self.APPLICATION_PHRASES + fixed_response_phrases())
+        return voice_synthesis
+    
+    def _worker_options(self) -> dict:
+        """Opciones de los procesos de modelos"""
+        return {
+            "health_interval": self.config.runtime.worker_health_interval,
+            "start_timeout": self.config.runtime.worker_start_timeout
+        }
+    
+    def _report_when_warm(self):
+        """Muestra el reporte de arranque cuando terminan las cargas en segundo plano"""
+        adapters: List[LazyAdapter] = [self.voice_synthesis]
+        if not self.text_mode:
+            adapters.append(self.speech_recognition)
+        
+        def report():
+            for adapter in adapters:
+                adapter.wait_ready()
+            self.startup_report.print_summary()
+        
+        threading.Thread(target=report, name="jarvis-startup-report", daemon=True).start()
+    
+    def _create_history(self):
+        """Abre el historial en SQLite; si falla, JARVIS sigue sin historial"""
+        history_config = self.config.history
+        if not history_config.enabled:
+            return None
+        
+        from adapters.output.sqlite_repository import SQLiteHistoryRepository
+        try:
+            return SQLiteHistoryRepository(
+                history_config.path,
+                batch_size=history_config.batch_size,
+                flush_interval=history_config.flush_interval,
+                recent_size=history_config.recent_size
+            )
+        except Exception as e:
+            print(f"❌ Error abriendo el historial: {e}")
+            return None
+    
+    def _setup_core(self):
+        """Configura el núcleo de JARVIS"""
+        self.history = self._create_history()
+        self.core = JarvisCore(
+            command_processor=self.command_processor,
+            intent_analyzer=self.intent_analyzer,
+            response_generator=self.voice_synthesis,
+            action_executor=self.system_action,
+            metrics=self.metrics,
+            command_repository=self.history,
+            intent_repository=self.history,
+            concurrent_stages=self.config.runtime.concurrent_core_stages,
+            speculative_synthesis=self.config.runtime.speculative_synthesis
+        )
+        self.core.action_listeners.append(self._report_action_failure)
+    
+    def _speculate(self, command: VoiceCommand):
+        """Adelanta la síntesis de la respuesta de una intención vista en un parcial"""
+        try:
+            self.core.speculate(command)
+        except Exception as e:
+            print(f"❌ Error en síntesis especulativa: {e}")
+    
+    def _report_action_failure(self, context: CommandContext):
+        """Avisa cuando una acción lanzada en segundo plano no se pudo completar"""
+        if context.action_result is False:
+            print(f"⚠️ No se pudo completar: {context.action.action_type} {context.action.target}")
+    
+    def run(self):
+        """Ejecuta la aplicación principal"""
+        # Mensaje de bienvenida
+        welcome_response = self.voice_synthesis.synthesize_response(self.WELCOME_TEXT)
+        self.voice_synthesis.speak(welcome_response)
+        
+        print("�� JARVIS está escuchando...")
+        print("💡 Di 'Jarvis' seguido de tu comando")
+        print("🔴 Di 'adiós' para salir")
+        
+        if self.config.runtime.async_pipeline:
+            from application.async_runtime import AsyncJarvisRuntime
+            asyncio.run(AsyncJarvisRuntime(self).run())
+        else:
+            self._run_sequential()
+        
+        self.speech_recognition.close()
+        self._say_goodbye()
+    
+    def _run_sequential(self):
+        """Bucle secuencial: escuchar, procesar y responder un comando a la vez"""
+        while self.is_running:
+            # Escuchar comando
+            command = self.speech_recognition.listen()
+            
+            if command:
+                # Verificar palabra de activación
+                if self.wake_word in command.text.lower():
+                    # Barge-in: un comando nuevo interrumpe la respuesta en curso
+                    self.voice_synthesis.stop_speaking()
+                    
+                    # Procesar comando
+                    response = self.core.handle_voice_command(command)
+                    
+                    # Reproducir respuesta sin bloquear la escucha
+                    self.speak_response(command, response)
+                    
+                    # Verificar si es comando de salida
+                    if self.is_exit_command(command.text):
+                        self.is_running = False
+                
+                elif any(word in command.text.lower() for word in ["hola jarvis", "hey jarvis"]):
+                    # Saludo directo
+                    greeting_response = self.voice_synthesis.synthesize_response(self.GREETING_TEXT)
+                    self.voice_synthesis.speak(greeting_response)
+    
+    def run_text_console(self):
+        """Consola de texto: disponible de inmediato, sin esperar a los modelos de voz"""
+        print("⌨️ Modo texto: escribe tu comando ('adiós' para salir)")
+        
+        while self.is_running:
+            try:
+                text = input("> ")
+            except EOFError:
+                break
+            
+            if not text.strip():
+                continue
+            
+            command = VoiceCommand(text=text, confidence=1.0, timestamp=time.time())
+            self.voice_synthesis.stop_speaking()
+            response = self.core.handle_voice_command(command)
+            self.speak_response(command, response)
+            
+            if self.is_exit_command(command.text):
+                self.is_running = False
+        
+        self._say_goodbye()
+    
+    def speak_response(self, command: VoiceCommand, response: VoiceResponse):
+        """Reproduce la respuesta y registra la latencia desde el fin del enunciado hasta el primer audio"""
+        if not self.metrics.enabled:
+            self.voice_synthesis.speak(response)
+            return
+        
+        enqueued = time.perf_counter()
+        
+        def on_first_audio():
+            self.metrics.observe("playback", time.perf_counter() - enqueued)
+            if command.timestamp:
+                self.metrics.observe("end_to_end", time.time() - command.timestamp)
+        
+        self.voice_synthesis.speak(response, on_start=on_first_audio)
+    
+    def is_exit_command(self, text: str) -> bool:
+        """Verifica si es comando de salida"""
+        text_lower = text.lower()
+        return "adiós" in text_lower or "salir" in text_lower
+    
+    def _say_goodbye(self):
+        """Mensaje de despedida"""
+        goodbye_response = self.voice_synthesis.synthesize_response(self.GOODBYE_TEXT)
+        self.voice_synthesis.speak(goodbye_response, wait=True)
+        self.shutdown()
+        print("👋 JARVIS se ha cerrado")
+    
+    def shutdown(self):
+        """Detiene los hilos, los procesos de modelos y los recursos compartidos"""
+        if hasattr(self.system_action, "shutdown"):
+            self.system_action.shutdown()
+        if self.history:
+            self.history.close()
+        if self.voice_synthesis.is_ready and hasattr(self.voice_synthesis, "close"):
+            self.voice_synthesis.close()
+        self.core.shutdown()
+        self.model_pool.close()
+        if hasattr(self.metrics, "close"):
+            self.metrics.close()
+
+def main(argv: Optional[List[str]] = None):
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="JARVIS - asistente de voz")
+    parser.add_argument("--text", action="store_true", help="consola de texto sin micrófono")
+    args = parser.parse_args(argv)
+    
+    try:
+        jarvis = JarvisApplication(text_mode=args.text)
+        if args.text:
+            jarvis.run_text_console()
+        else:
+            jarvis.run()
+    except KeyboardInterrupt:
+        print("\n👋 JARVIS interrumpido por el usuario")
+    except Exception as e:
+        print(f"❌ Error en JARVIS: {e}")
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
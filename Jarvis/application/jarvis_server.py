@@ -0,0 +1,388 @@
+"""
+Aplicación - Modo servidor local: un solo juego de modelos compartido por varios clientes
+"""
+import argparse
+import hmac
+import json
+import os
+import secrets
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from core.domain.entities import VoiceCommand
+from config.application_config import JarvisConfig, DEFAULT_CONFIG
+
+# Trama: longitud de la cabecera JSON (4 bytes, big-endian), cabecera y payload de "payload_size" bytes
+HEADER_LENGTH = struct.Struct(">I")
+MAX_HEADER_BYTES = 64 * 1024
+# Tiempo para presentar el token antes de que se cierre la conexión
+AUTH_TIMEOUT = 10.0
+
+class ProtocolError(Exception):
+    """Trama mal formada o demasiado grande"""
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """Lee exactamente size bytes; None si el otro extremo cerró"""
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 16))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+def send_frame(sock: socket.socket, header: Dict[str, Any], payload: bytes = b""):
+    """Envía una cabecera JSON y un payload binario opcional"""
+    header = dict(header, payload_size=len(payload))
+    encoded = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    sock.sendall(HEADER_LENGTH.pack(len(encoded)) + encoded + payload)
+
+def recv_frame(sock: socket.socket, max_payload: int = DEFAULT_CONFIG.server.max_frame_bytes) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    """Recibe una trama; None si la conexión se cerró"""
+    prefix = _recv_exact(sock, HEADER_LENGTH.size)
+    if prefix is None:
+        return None
+    (header_size,) = HEADER_LENGTH.unpack(prefix)
+    if header_size > MAX_HEADER_BYTES:
+        raise ProtocolError(f"Cabecera demasiado grande: {header_size} bytes")
+
+    encoded = _recv_exact(sock, header_size)
+    if encoded is None:
+        return None
+    header = json.loads(encoded.decode("utf-8"))
+
+    payload_size = int(header.get("payload_size", 0))
+    if payload_size > max_payload:
+        raise ProtocolError(f"Payload demasiado grande: {payload_size} bytes")
+    payload = _recv_exact(sock, payload_size) if payload_size else b""
+    if payload is None:
+        return None
+    return header, payload
+
+def create_session_token(path: str) -> str:
+    """Genera un token nuevo y lo guarda con permisos 0600 (escritura atómica, sin seguir enlaces)"""
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    token = secrets.token_urlsafe(32)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.lexists(temp_path):
+        os.unlink(temp_path)
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+    os.replace(temp_path, path)
+    return token
+
+def read_session_token(path: str) -> str:
+    """Lee el token del servidor en ejecución"""
+    with open(path, encoding="utf-8") as f:
+        return f.read().strip()
+
+class JarvisServer(socketserver.ThreadingTCPServer):
+    """Aloja JarvisCore y los adaptadores cargados una vez; atiende a cada cliente en su hilo"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, config: Optional[JarvisConfig] = None):
+        from application.jarvis_application import JarvisApplication
+
+        self.config = config or DEFAULT_CONFIG
+        self.app = JarvisApplication(self.config, headless=True)
+        # Sin planificador por lotes Whisper atiende una transcripción a la vez; la síntesis ya serializa su modelo
+        self.asr_lock = threading.Lock()
+        self.clients = 0
+        self._clients_lock = threading.Lock()
+        super().__init__((self.config.server.host, self.config.server.port), JarvisRequestHandler)
+        # Cualquier usuario local llega al puerto: sin el token no se despacha nada ("abrir X" ejecuta programas)
+        self.token = create_session_token(self.config.server.token_path)
+
+    def check_token(self, token: Any) -> bool:
+        """Compara en tiempo constante con el token de esta sesión"""
+        return isinstance(token, str) and hmac.compare_digest(token.encode("utf-8"), self.token.encode("utf-8"))
+
+    def handle_text(self, header: Dict[str, Any]) -> Tuple[Dict[str, Any], bytes]:
+        """Procesa un comando ya transcrito"""
+        command = VoiceCommand(text=header.get("text", ""), confidence=1.0, timestamp=time.time())
+        return self._respond(command, header)
+
+    def handle_audio(self, header: Dict[str, Any], payload: bytes) -> Tuple[Dict[str, Any], bytes]:
+        """Transcribe PCM del cliente y procesa el comando"""
+        from adapters.input.audio_capture import Utterance
+        from adapters.input.audio_processing import pcm_to_float32
+
+        sample_rate = int(header.get("sample_rate", 16000))
+        samples = pcm_to_float32(payload, int(header.get("sample_width", 2)), int(header.get("channels", 1)))
+        ended_at = float(header.get("ended_at") or time.time())
+        utterance = Utterance(
+            samples=samples,
+            sample_rate=sample_rate,
+            started_at=ended_at - samples.size / sample_rate,
+            ended_at=ended_at
+        )
+
+        speech_recognition = self.app.speech_recognition
+        if speech_recognition.batch_scheduler:
+            # El planificador serializa el modelo y agrupa las peticiones concurrentes
+            command = speech_recognition.transcribe_utterance(utterance)
+        else:
+            with self.asr_lock:
+                command = speech_recognition.transcribe_utterance(utterance)
+        if command is None:
+            return {"type": "ignored", "reason": "sin voz reconocida"}, b""
+        return self._respond(command, header)
+
+    def _respond(self, command: VoiceCommand, header: Dict[str, Any]) -> Tuple[Dict[str, Any], bytes]:
+        """Pasa el comando por el núcleo y retorna texto y audio WAV"""
+        if header.get("require_wake_word") and self.app.wake_word not in command.text.lower():
+            return {"type": "ignored", "reason": "sin palabra de activación", "transcript": command.text}, b""
+
+        context = self.app.core.run_pipeline(command)
+        response = context.response
+        audio_data = response.audio_data
+        if audio_data is None and header.get("want_audio", True) and self.app.voice_synthesis.is_available:
+            # Las respuestas largas se sintetizan por fragmentos al hablar; aquí se necesita el audio completo
+            audio_data = self.app.voice_synthesis.synthesize_response(response.text).audio_data
+
+        reply = {
+            "type": "response",
+            "transcript": command.text,
+            "intent": context.intent.command_type.value,
+            "target": context.intent.target,
+            "text": response.text,
+            "exit": self.app.is_exit_command(command.text)
+        }
+        return reply, audio_data or b""
+
+    def client_connected(self) -> int:
+        """Cuenta un cliente nuevo y retorna los activos"""
+        with self._clients_lock:
+            self.clients += 1
+            return self.clients
+
+    def client_disconnected(self):
+        """Descuenta un cliente"""
+        with self._clients_lock:
+            self.clients -= 1
+
+    def server_close(self):
+        """Cierra el socket y libera los adaptadores compartidos"""
+        super().server_close()
+        try:
+            os.unlink(self.config.server.token_path)
+        except OSError:
+            pass
+        if self.app.speech_recognition.is_ready:
+            self.app.speech_recognition.close()
+        # Acciones, despacho del núcleo, métricas, proceso de síntesis, historial y pool de modelos
+        self.app.shutdown()
+
+class JarvisRequestHandler(socketserver.BaseRequestHandler):
+    """Conexión de un cliente: una trama de petición, una trama de respuesta"""
+
+    def handle(self):
+        server: JarvisServer = self.server
+        try:
+            if not self._authenticate(server):
+                return
+        except (ProtocolError, ValueError, OSError) as e:
+            print(f"🚫 Cliente rechazado: {e}")
+            return
+
+        print(f"🔌 Cliente conectado ({server.client_connected()} activos)")
+        max_payload = server.config.server.max_frame_bytes
+        try:
+            while True:
+                frame = recv_frame(self.request, max_payload)
+                if frame is None:
+                    break
+                header, payload = frame
+                request_type = header.get("type")
+
+                try:
+                    if request_type == "audio":
+                        reply, reply_payload = server.handle_audio(header, payload)
+                    elif request_type == "text":
+                        reply, reply_payload = server.handle_text(header)
+                    elif request_type == "ping":
+                        reply, reply_payload = {"type": "pong"}, b""
+                    else:
+                        reply, reply_payload = {"type": "error", "error": f"tipo desconocido: {request_type}"}, b""
+                except Exception as e:
+                    print(f"❌ Error atendiendo cliente: {e}")
+                    reply, reply_payload = {"type": "error", "error": str(e)}, b""
+
+                reply["id"] = header.get("id")
+                send_frame(self.request, reply, reply_payload)
+        except (ProtocolError, ValueError, OSError) as e:
+            print(f"❌ Conexión cerrada por error: {e}")
+        finally:
+            server.client_disconnected()
+            print("🔌 Cliente desconectado")
+
+    def _authenticate(self, server: "JarvisServer") -> bool:
+        """La primera trama debe ser {"type": "auth", "token": ...} sin payload"""
+        self.request.settimeout(AUTH_TIMEOUT)
+        frame = recv_frame(self.request, max_payload=0)
+        if frame is None:
+            return False
+        header, _ = frame
+        if header.get("type") != "auth" or not server.check_token(header.get("token")):
+            send_frame(self.request, {"type": "error", "error": "no autorizado", "id": header.get("id")})
+            print("🚫 Cliente rechazado: token de sesión inválido")
+            return False
+        send_frame(self.request, {"type": "auth_ok", "id": header.get("id")})
+        self.request.settimeout(None)
+        return True
+
+class JarvisClient:
+    """Cliente ligero: no carga modelos, solo envía audio o texto y recibe la respuesta"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        timeout: float = 120.0,
+        token: Optional[str] = None
+    ):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self._next_id = 0
+        try:
+            self._authenticate(token if token is not None else read_session_token(DEFAULT_CONFIG.server.token_path))
+        except BaseException:
+            self.sock.close()
+            raise
+
+    def _authenticate(self, token: str):
+        """Presenta el token de sesión leído del archivo del servidor"""
+        reply, _ = self.request({"type": "auth", "token": token})
+        if reply.get("type") != "auth_ok":
+            raise PermissionError("El servidor rechazó el token de sesión")
+
+    def request(self, header: Dict[str, Any], payload: bytes = b"") -> Tuple[Dict[str, Any], bytes]:
+        """Envía una petición y espera su respuesta"""
+        self._next_id += 1
+        send_frame(self.sock, dict(header, id=self._next_id), payload)
+        frame = recv_frame(self.sock)
+        if frame is None:
+            raise ConnectionError("El servidor cerró la conexión")
+        return frame
+
+    def send_text(self, text: str, want_audio: bool = True) -> Tuple[Dict[str, Any], bytes]:
+        """Envía un comando de texto"""
+        return self.request({"type": "text", "text": text, "want_audio": want_audio})
+
+    def send_audio(
+        self,
+        pcm: bytes,
+        sample_rate: int,
+        sample_width: int = 2,
+        channels: int = 1,
+        require_wake_word: bool = True
+    ) -> Tuple[Dict[str, Any], bytes]:
+        """Envía un enunciado en PCM entero para que el servidor lo transcriba"""
+        return self.request({
+            "type": "audio",
+            "sample_rate": sample_rate,
+            "sample_width": sample_width,
+            "channels": channels,
+            "ended_at": time.time(),
+            "require_wake_word": require_wake_word
+        }, pcm)
+
+    def close(self):
+        """Cierra la conexión"""
+        self.sock.close()
+
+def _create_player():
+    """Reproductor local si pygame está disponible; si no, solo texto"""
+    try:
+        from adapters.output.audio_playback import AudioPlayer
+        return AudioPlayer()
+    except Exception as e:
+        print(f"⚠️ Sin reproducción de audio: {e}")
+        return None
+
+def run_client(host: str, port: int, text_mode: bool, token_path: str = DEFAULT_CONFIG.server.token_path):
+    """Cliente de consola (texto) o de micrófono (voz)"""
+    client = JarvisClient(host, port, token=read_session_token(token_path))
+    player = None if text_mode else _create_player()
+    print(f"🔌 Conectado a JARVIS en {host}:{port}")
+
+    microphone = recognizer = None
+    if not text_mode:
+        import speech_recognition as sr
+        recognizer = sr.Recognizer()
+        microphone = sr.Microphone()
+        with microphone as source:
+            recognizer.adjust_for_ambient_noise(source, duration=1)
+
+    try:
+        while True:
+            if text_mode:
+                try:
+                    text = input("> ")
+                except EOFError:
+                    break
+                if not text.strip():
+                    continue
+                reply, audio_data = client.send_text(text, want_audio=False)
+            else:
+                with microphone as source:
+                    try:
+                        audio = recognizer.listen(source, timeout=5, phrase_time_limit=5)
+                    except Exception:
+                        continue
+                reply, audio_data = client.send_audio(audio.get_raw_data(), audio.sample_rate, audio.sample_width)
+
+            if reply.get("type") == "response":
+                print(f"JARVIS: {reply['text']}")
+                if audio_data and player:
+                    player.play(audio_data)
+                if reply.get("exit"):
+                    break
+            elif reply.get("type") == "error":
+                print(f"❌ {reply.get('error')}")
+    finally:
+        if player:
+            player.wait(timeout=10.0)
+            player.close()
+        client.close()
+
+def main(argv: Optional[List[str]] = None):
+    """Punto de entrada del servidor (o del cliente con --client)"""
+    parser = argparse.ArgumentParser(description="JARVIS - modo servidor local")
+    parser.add_argument("--client", action="store_true", help="conecta a un servidor en lugar de iniciarlo")
+    parser.add_argument("--text", action="store_true", help="cliente de texto sin micrófono")
+    parser.add_argument("--host", default=DEFAULT_CONFIG.server.host)
+    parser.add_argument("--port", type=int, default=DEFAULT_CONFIG.server.port)
+    parser.add_argument("--token-file", default=DEFAULT_CONFIG.server.token_path, help="token de sesión (0600)")
+    args = parser.parse_args(argv)
+
+    if args.client:
+        try:
+            run_client(args.host, args.port, args.text, args.token_file)
+        except KeyboardInterrupt:
+            print("\n👋 Cliente cerrado")
+        except OSError as e:
+            print(f"❌ No se pudo conectar con JARVIS: {e}")
+        return
+
+    config = JarvisConfig()
+    config.speech.streaming_capture = False
+    config.speech.asr_batching = True
+    config.server.host = args.host
+    config.server.port = args.port
+    config.server.token_path = args.token_file
+
+    server = JarvisServer(config)
+    print(f"🛰️ JARVIS sirviendo en {args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Servidor detenido")
+    finally:
+        server.server_close()
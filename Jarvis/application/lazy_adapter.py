@@ -0,0 +1,111 @@
+"""
+Aplicación - Construcción diferida de adaptadores y reporte de arranque
+"""
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+class StartupReport:
+    """Mide el tiempo de cada fase del arranque"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def elapsed(self) -> float:
+        """Segundos desde el inicio del arranque"""
+        return time.perf_counter() - self.started_at
+
+    def record(self, name: str, seconds: float):
+        """Registra la duración de una fase"""
+        with self._lock:
+            self.phases.append((name, seconds))
+
+    def print_summary(self):
+        """Muestra el reporte de arranque"""
+        with self._lock:
+            phases = list(self.phases)
+        print(f"⏱️ Arranque: {self.elapsed() * 1000:.0f} ms desde el inicio")
+        for name, seconds in phases:
+            print(f"   • {name}: {seconds * 1000:.0f} ms")
+
+class LazyAdapter:
+    """Proxy que construye el adaptador real en segundo plano o en el primer uso"""
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        fallback: Any = None,
+        report: Optional[StartupReport] = None
+    ):
+        self._lazy_name = name
+        self._lazy_factory = factory
+        self._lazy_fallback = fallback
+        self._lazy_report = report
+        self._lazy_instance = None
+        self._lazy_error: Optional[BaseException] = None
+        self._lazy_lock = threading.Lock()
+        self._lazy_ready = threading.Event()
+        self._lazy_thread: Optional[threading.Thread] = None
+
+    @property
+    def is_ready(self) -> bool:
+        """Indica si el adaptador real ya está construido"""
+        return self._lazy_ready.is_set() and self._lazy_error is None
+
+    def warm_up(self) -> "LazyAdapter":
+        """Inicia la construcción en un hilo de fondo"""
+        if self._lazy_thread is None and not self._lazy_ready.is_set():
+            self._lazy_thread = threading.Thread(
+                target=self._lazy_load,
+                name=f"jarvis-warmup-{self._lazy_name}",
+                daemon=True
+            )
+            self._lazy_thread.start()
+        return self
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que el adaptador esté construido"""
+        if self._lazy_thread is None:
+            self._lazy_load()
+        return self._lazy_ready.wait(timeout) and self._lazy_error is None
+
+    def resolve(self) -> Any:
+        """Retorna el adaptador real, construyéndolo si hace falta"""
+        self._lazy_load()
+        self._lazy_ready.wait()
+        if self._lazy_error is not None:
+            if self._lazy_fallback is not None:
+                return self._lazy_fallback
+            raise self._lazy_error
+        return self._lazy_instance
+
+    def _lazy_load(self):
+        """Construye el adaptador una sola vez"""
+        with self._lazy_lock:
+            if self._lazy_ready.is_set():
+                return
+
+            started = time.perf_counter()
+            try:
+                self._lazy_instance = self._lazy_factory()
+            except Exception as e:
+                print(f"❌ Error inicializando {self._lazy_name}: {e}")
+                self._lazy_error = e
+            finally:
+                if self._lazy_report:
+                    self._lazy_report.record(self._lazy_name, time.perf_counter() - started)
+                self._lazy_ready.set()
+
+    def _lazy_target(self) -> Any:
+        """Adaptador a usar ahora: el real si está listo o el de respaldo sin bloquear"""
+        if self._lazy_ready.is_set() or self._lazy_fallback is None:
+            return self.resolve()
+        return self._lazy_fallback
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_lazy_"):
+            raise AttributeError(name)
+        return getattr(self._lazy_target(), name)
@@ -0,0 +1,340 @@
+"""
+Aplicación - Modelos de ASR y TTS en procesos propios con audio en memoria compartida
+"""
+import multiprocessing
+import threading
+from dataclasses import replace
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from config.application_config import SpeechConfig, VoiceConfig
+from adapters.input.speech_recognition_adapter import WhisperSpeechRecognitionAdapter
+from adapters.output.voice_synthesis_adapter import CachedSynthesisAdapter
+
+# Capacidad de los búferes compartidos; lo que no cabe viaja en el propio mensaje
+DEFAULT_INPUT_BYTES = 60 * 16000 * 4
+DEFAULT_OUTPUT_BYTES = 8 * 1024 * 1024
+
+class ModelWorkerError(RuntimeError):
+    """El proceso del modelo falló o no respondió a tiempo"""
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Se adjunta a un segmento creado por el proceso principal; solo este lo libera"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: con spawn el hijo comparte el rastreador de recursos del padre, que ya registra el segmento
+        return shared_memory.SharedMemory(name=name)
+
+class _SpeechRecognitionHandler:
+    """Lado del trabajador: Whisper cargado en el proceso hijo"""
+
+    def __init__(self, config: SpeechConfig):
+        from adapters.input.whisper_backend import load_whisper_model, uses_fp16
+        self.model = load_whisper_model(config)
+        self.language = config.language.split("-")[0]
+        self.fp16 = uses_fp16(config)
+
+    def info(self) -> Dict[str, Any]:
+        """Datos que el proceso principal necesita del modelo"""
+        return {}
+
+    def handle(self, method: str, argument: Any, samples: Optional[np.ndarray]) -> Tuple[Any, Optional[bytes]]:
+        """Transcribe el audio recibido"""
+        if method == "transcribe":
+            result = self.model.transcribe(samples, language=self.language, fp16=self.fp16)
+            return result["text"], None
+        raise ValueError(f"Método desconocido: {method}")
+
+class _VoiceSynthesisHandler:
+    """Lado del trabajador: motor de síntesis cargado en el proceso hijo (sin caché ni reproductor propio)"""
+
+    def __init__(self, config: VoiceConfig):
+        from adapters.output.voice_synthesis_adapter import create_synthesis_adapter
+        self.adapter = create_synthesis_adapter(replace(config, audio_cache_size=0, audio_cache_dir=None))
+
+    def info(self) -> Dict[str, Any]:
+        """Motor y voz para las claves de la caché de audio del proceso principal"""
+        return {
+            "available": self.adapter.is_available,
+            "engine_name": self.adapter.engine_name,
+            "voice_name": self.adapter.voice_name
+        }
+
+    def handle(self, method: str, argument: Any, samples: Optional[np.ndarray]) -> Tuple[Any, Optional[bytes]]:
+        """Sintetiza el texto y retorna el WAV"""
+        if method == "render":
+            return None, self.adapter._render_speech(argument)
+        raise ValueError(f"Método desconocido: {method}")
+
+_HANDLERS = {"asr": _SpeechRecognitionHandler, "tts": _VoiceSynthesisHandler}
+
+def _worker_main(kind: str, config: Any, connection, input_name: str, output_name: str):
+    """Bucle del proceso hijo: carga el modelo y atiende peticiones de una en una"""
+    input_segment = _attach_shared_memory(input_name)
+    output_segment = _attach_shared_memory(output_name)
+    try:
+        try:
+            handler = _HANDLERS[kind](config)
+            connection.send(("ready", handler.info()))
+        except Exception as e:
+            connection.send(("failed", str(e)))
+            return
+        _serve_requests(handler, connection, input_segment, output_segment)
+    finally:
+        # También si el modelo no llegó a cargar
+        input_segment.close()
+        output_segment.close()
+
+def _serve_requests(handler: Any, connection, input_segment, output_segment):
+    """Atiende peticiones hasta "stop" o hasta que se cierre la tubería"""
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            break
+        method, argument, sample_count, inline_samples = message
+        if method == "stop":
+            break
+        if method == "ping":
+            connection.send(("ok", "pong", None, None))
+            continue
+
+        try:
+            samples = None
+            if inline_samples is not None:
+                samples = inline_samples
+            elif sample_count:
+                # Copia: el búfer se reutiliza en la siguiente petición
+                samples = np.ndarray((sample_count,), dtype=np.float32, buffer=input_segment.buf).copy()
+
+            result, audio = handler.handle(method, argument, samples)
+            if audio is not None and len(audio) <= output_segment.size:
+                output_segment.buf[:len(audio)] = audio
+                connection.send(("ok", result, len(audio), None))
+            else:
+                connection.send(("ok", result, None, audio))
+        except Exception as e:
+            connection.send(("error", str(e), None, None))
+
+class ModelWorker:
+    """Proceso hijo que aloja un modelo, con chequeos de salud y reinicio tras una caída"""
+
+    def __init__(
+        self,
+        kind: str,
+        config: Any,
+        start_timeout: float = 300.0,
+        request_timeout: float = 120.0,
+        health_interval: float = 5.0,
+        input_bytes: int = DEFAULT_INPUT_BYTES,
+        output_bytes: int = DEFAULT_OUTPUT_BYTES
+    ):
+        self.kind = kind
+        self.config = config
+        self.start_timeout = start_timeout
+        self.request_timeout = request_timeout
+        self.health_interval = health_interval
+        self.info: Dict[str, Any] = {}
+        self.restarts = 0
+
+        self._context = multiprocessing.get_context("spawn")
+        self._input = shared_memory.SharedMemory(create=True, size=input_bytes)
+        self._output = shared_memory.SharedMemory(create=True, size=output_bytes)
+        self._lock = threading.Lock()
+        self._process = None
+        self._connection = None
+        self._closed = threading.Event()
+
+        try:
+            self._start()
+        except BaseException:
+            # Sin proceso no habrá close(): los segmentos se liberan aquí
+            self._release_segments()
+            raise
+        self._monitor = threading.Thread(target=self._health_loop, name=f"jarvis-{kind}-health", daemon=True)
+        self._monitor.start()
+
+    def _start(self):
+        """Lanza el proceso y espera a que cargue el modelo"""
+        parent_connection, child_connection = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_worker_main,
+            args=(self.kind, self.config, child_connection, self._input.name, self._output.name),
+            name=f"jarvis-{self.kind}-worker",
+            daemon=True
+        )
+        self._process.start()
+        child_connection.close()
+        self._connection = parent_connection
+
+        try:
+            if not parent_connection.poll(self.start_timeout):
+                raise TimeoutError(f"no arrancó en {self.start_timeout:.0f} s")
+            status, payload = parent_connection.recv()
+        except (EOFError, OSError, TimeoutError) as e:
+            self._kill()
+            raise ModelWorkerError(f"El trabajador {self.kind} no arrancó: {str(e) or 'el proceso terminó'}")
+        if status != "ready":
+            self._kill()
+            raise ModelWorkerError(f"El trabajador {self.kind} falló al cargar: {payload}")
+        self.info = payload
+        print(f"✅ Trabajador {self.kind} listo (pid {self._process.pid})")
+
+    def _kill(self):
+        """Termina el proceso sin esperar a que responda"""
+        if self._process and self._process.is_alive():
+            self._process.kill()
+            self._process.join(timeout=5.0)
+        if self._connection:
+            self._connection.close()
+
+    def _restart(self, reason: str):
+        """Reemplaza el proceso caído o bloqueado (se llama con el lock tomado)"""
+        print(f"⚠️ Reiniciando trabajador {self.kind}: {reason}")
+        self._kill()
+        self.restarts += 1
+        self._start()
+
+    @property
+    def is_alive(self) -> bool:
+        """Indica si el proceso sigue en ejecución"""
+        return self._process is not None and self._process.is_alive()
+
+    def call(
+        self,
+        method: str,
+        argument: Any = None,
+        samples: Optional[np.ndarray] = None,
+        timeout: Optional[float] = None
+    ) -> Tuple[Any, Optional[bytes]]:
+        """Petición al modelo: el audio de entrada y salida pasa por memoria compartida"""
+        timeout = timeout or self.request_timeout
+        with self._lock:
+            if self._closed.is_set():
+                raise ModelWorkerError(f"El trabajador {self.kind} está cerrado")
+            if not self.is_alive:
+                self._restart("el proceso terminó")
+
+            sample_count, inline_samples = 0, None
+            if samples is not None:
+                samples = np.ascontiguousarray(samples, dtype=np.float32)
+                if samples.nbytes <= self._input.size:
+                    np.ndarray(samples.shape, dtype=np.float32, buffer=self._input.buf)[:] = samples
+                    sample_count = samples.size
+                else:
+                    inline_samples = samples
+
+            try:
+                self._connection.send((method, argument, sample_count, inline_samples))
+                if not self._connection.poll(timeout):
+                    raise TimeoutError(f"sin respuesta en {timeout:.0f} s")
+                status, result, audio_size, inline_audio = self._connection.recv()
+            except (EOFError, OSError, TimeoutError) as e:
+                self._restart(str(e) or type(e).__name__)
+                raise ModelWorkerError(f"El trabajador {self.kind} falló durante {method}: {str(e) or type(e).__name__}")
+
+            if status == "error":
+                raise ModelWorkerError(result)
+            audio = bytes(self._output.buf[:audio_size]) if audio_size is not None else inline_audio
+            return result, audio
+
+    def _health_loop(self):
+        """Comprueba periódicamente que el proceso siga vivo y responda"""
+        while not self._closed.wait(self.health_interval):
+            # Si hay una petición en curso el proceso está ocupado, no colgado: se espera al siguiente ciclo
+            if not self._lock.acquire(blocking=False):
+                continue
+            try:
+                if self._closed.is_set():
+                    return
+                if not self.is_alive:
+                    self._restart("el proceso terminó")
+                    continue
+                self._connection.send(("ping", None, 0, None))
+                if not self._connection.poll(10.0):
+                    self._restart("no respondió al chequeo de salud")
+                else:
+                    self._connection.recv()
+            except Exception as e:
+                try:
+                    self._restart(str(e) or type(e).__name__)
+                except Exception as restart_error:
+                    print(f"❌ No se pudo reiniciar el trabajador {self.kind}: {restart_error}")
+            finally:
+                self._lock.release()
+
+    def close(self):
+        """Detiene el proceso y libera la memoria compartida"""
+        self._closed.set()
+        with self._lock:
+            try:
+                if self.is_alive:
+                    self._connection.send(("stop", None, 0, None))
+                    self._process.join(timeout=5.0)
+            except OSError:
+                pass
+            self._kill()
+        self._release_segments()
+
+    def _release_segments(self):
+        """Cierra y elimina los segmentos de memoria compartida"""
+        for segment in (self._input, self._output):
+            segment.close()
+            segment.unlink()
+
+class ProcessSpeechRecognitionAdapter(WhisperSpeechRecognitionAdapter):
+    """Captura, VAD y preprocesado en este proceso; la inferencia de Whisper en un proceso hijo"""
+
+    def __init__(
+        self,
+        config: Optional[SpeechConfig] = None,
+        use_microphone: bool = True,
+        transcribe: bool = True,
+        **worker_options
+    ):
+        self._worker_options = worker_options
+        # El planificador por lotes necesita el modelo en este proceso
+        super().__init__(replace(config or SpeechConfig(), asr_batching=False), use_microphone, transcribe=transcribe)
+
+    def _load_model(self):
+        """Lanza el proceso de Whisper en lugar de cargar el modelo aquí"""
+        self.worker = ModelWorker("asr", self.config, **self._worker_options)
+
+    def _run_whisper(self, samples: np.ndarray) -> str:
+        """El audio viaja por memoria compartida; solo el texto vuelve por la tubería"""
+        text, _ = self.worker.call("transcribe", samples=samples)
+        return text
+
+    def close(self):
+        """Detiene la captura y el proceso de Whisper"""
+        super().close()
+        self.worker.close()
+
+class ProcessSynthesisAdapter(CachedSynthesisAdapter):
+    """Caché, fragmentación y reproducción en este proceso; el motor de síntesis en un proceso hijo"""
+
+    def __init__(self, config: Optional[VoiceConfig] = None, **worker_options):
+        super().__init__(config)
+        self.worker = ModelWorker("tts", self.config, **worker_options)
+        self.engine_name = self.worker.info.get("engine_name", self.engine_name)
+        self.voice_name = self.worker.info.get("voice_name", self.voice_name)
+        self._available = bool(self.worker.info.get("available"))
+
+    @property
+    def is_available(self) -> bool:
+        return self._available
+
+    def _render_speech(self, text: str) -> Optional[bytes]:
+        """Sintetiza en el proceso hijo; el WAV vuelve por memoria compartida"""
+        try:
+            _, audio = self.worker.call("render", text)
+            return audio
+        except ModelWorkerError as e:
+            print(f"Error en síntesis: {e}")
+            return None
+
+    def close(self):
+        """Detiene la reproducción y el proceso de síntesis"""
+        super().close()
+        self.worker.close()
@@ -0,0 +1,97 @@
+"""
+Aplicación - Registro de plantillas de la palabra de activación para el filtro previo a Whisper
+"""
+import argparse
+import io
+import os
+import wave
+from typing import List, Optional
+import numpy as np
+from adapters.input.audio_processing import WHISPER_SAMPLE_RATE, pcm_to_float32, prepare_whisper_input, save_wav
+from adapters.input.wake_word_detector import USER_TEMPLATES_DIR, WakeWordDetector
+from config.application_config import DEFAULT_CONFIG, VoiceConfig
+
+def record_templates(count: int, seconds: float) -> List[np.ndarray]:
+    """Graba la palabra de activación count veces desde el micrófono"""
+    import speech_recognition as sr
+
+    recognizer = sr.Recognizer()
+    templates = []
+    with sr.Microphone() as source:
+        recognizer.adjust_for_ambient_noise(source, duration=1)
+        while len(templates) < count:
+            print(f"🎤 ({len(templates) + 1}/{count}) Di solo la palabra de activación...")
+            try:
+                audio = recognizer.listen(source, timeout=5, phrase_time_limit=seconds)
+            except sr.WaitTimeoutError:
+                continue
+
+            samples = pcm_to_float32(audio.get_raw_data(), audio.sample_width)
+            samples = prepare_whisper_input(samples, audio.sample_rate, padding_ms=50)
+            if samples.size < WHISPER_SAMPLE_RATE * 0.2:
+                print("⚠️ Demasiado corta, repite")
+                continue
+            templates.append(samples)
+    return templates
+
+def synthesize_template(phrase: str) -> List[np.ndarray]:
+    """Plantilla inicial con el motor de síntesis (independiente del hablante, menos precisa)"""
+    from adapters.output.voice_synthesis_adapter import create_synthesis_adapter
+
+    adapter = create_synthesis_adapter(VoiceConfig(audio_cache_size=0))
+    audio_data = adapter.synthesize_response(phrase).audio_data
+    if not audio_data:
+        print("❌ No hay motor de síntesis disponible")
+        return []
+
+    with wave.open(io.BytesIO(audio_data), "rb") as wav_file:
+        raw = wav_file.readframes(wav_file.getnframes())
+        samples = pcm_to_float32(raw, wav_file.getsampwidth(), wav_file.getnchannels())
+        return [prepare_whisper_input(samples, wav_file.getframerate(), padding_ms=50)]
+
+def leave_one_out_scores(templates: List[np.ndarray]) -> List[float]:
+    """Distancia de cada grabación a las demás: orienta el umbral del detector"""
+    scores = []
+    for index, samples in enumerate(templates):
+        detector = WakeWordDetector()
+        for other_index, other in enumerate(templates):
+            if other_index != index:
+                detector.add_template(other)
+        scores.append(detector.score(samples))
+    return scores
+
+def save_templates(templates: List[np.ndarray], directory: str) -> List[str]:
+    """Guarda las plantillas sin sobrescribir las existentes"""
+    os.makedirs(directory, exist_ok=True)
+    existing = len([name for name in os.listdir(directory) if name.lower().endswith(".wav")])
+    paths = []
+    for offset, samples in enumerate(templates):
+        path = os.path.join(directory, f"wake_word_{existing + offset + 1:02d}.wav")
+        save_wav(path, samples)
+        paths.append(path)
+    return paths
+
+def main(argv: Optional[List[str]] = None):
+    """Punto de entrada del registro de plantillas"""
+    parser = argparse.ArgumentParser(description="Registra plantillas de la palabra de activación de JARVIS")
+    parser.add_argument("--count", type=int, default=5, help="grabaciones a registrar")
+    parser.add_argument("--seconds", type=float, default=2.0, help="duración máxima de cada grabación")
+    parser.add_argument("--output", default=USER_TEMPLATES_DIR, help="directorio de plantillas")
+    parser.add_argument("--tts", action="store_true", help="genera una plantilla con el motor de síntesis en lugar del micrófono")
+    parser.add_argument("--phrase", default=DEFAULT_CONFIG.speech.wake_word)
+    args = parser.parse_args(argv)
+
+    templates = synthesize_template(args.phrase) if args.tts else record_templates(args.count, args.seconds)
+    if not templates:
+        return
+
+    if len(templates) > 1:
+        scores = leave_one_out_scores(templates)
+        print("📏 Distancia de cada grabación a las demás: " + ", ".join(f"{score:.3f}" for score in scores))
+        print(
+            f"💡 Umbral sugerido (SpeechConfig.wake_word_threshold): {max(scores) * 1.2:.2f} "
+            f"(actual {DEFAULT_CONFIG.speech.wake_word_threshold:.2f})"
+        )
+
+    for path in save_templates(templates, args.output):
+        print(f"✅ Plantilla guardada: {path}")
@@ -1,56 +1,150 @@
-"""
-Configuración de la aplicación JARVIS
-"""
-from dataclasses import dataclass
-from typing import Dict, Any
-
-@dataclass
-class SpeechConfig:
-    """Configuración de reconocimiento de voz"""
-    wake_word: str = "jarvis"
-    language: str = "es-ES"
-    timeout: int = 5
-    phrase_time_limit: int = 5
-    use_whisper: bool = True
-    whisper_model: str = "base"
-
-@dataclass
-class VoiceConfig:
-    """Configuración de síntesis de voz"""
-    use_vibevoice: bool = True
-    fallback_to_coqui: bool = True
-    voice_rate: int = 150
-    voice_volume: float = 0.9
-
-@dataclass
-class SystemConfig:
-    """Configuración del sistema"""
-    applications: Dict[str, str] = None
-    web_search_engine: str = "https://www.google.com/search?q={}"
-    require_confirmation: bool = False
-
-@dataclass
-class JarvisConfig:
-    """Configuración principal de JARVIS"""
-    speech: SpeechConfig = None
-    voice: VoiceConfig = None
-    system: SystemConfig = None
-    
-    def __post_init__(self):
-        if self.speech is None:
-            self.speech = SpeechConfig()
-        if self.voice is None:
-            self.voice = VoiceConfig()
-        if self.system is None:
-            self.system = SystemConfig(
-                applications={
-                    "calculadora": "calc",
-                    "notepad": "notepad",
-                    "explorador": "explorer",
-                    "chrome": "chrome",
-                    "spotify": "spotify"
-                }
-            )
-
-# Configuración por defecto
+"""
+Configuración de la aplicación JARVIS
+"""
+import os
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
+
+@dataclass
+class SpeechConfig:
+    """Configuración de reconocimiento de voz"""
+    wake_word: str = "jarvis"
+    language: str = "es-ES"
+    timeout: int = 5
+    phrase_time_limit: int = 5
+    use_whisper: bool = True
+    whisper_model: str = "base"
+    whisper_compute_type: str = "float32"
+    # None o "auto": CUDA si está disponible, si no CPU
+    whisper_device: Optional[str] = None
+    whisper_threads: int = 0
+    streaming_capture: bool = True
+    ring_buffer_seconds: float = 30.0
+    vad_energy_threshold: float = 0.01
+    vad_end_silence_ms: int = 600
+    vad_max_utterance_ms: int = 8000
+    utterance_queue_size: int = 8
+    wake_word_gate: bool = True
+    # None: plantillas del usuario (~/.local/share/jarvis/wake_word_templates) o las del paquete
+    wake_word_templates_dir: Optional[str] = None
+    wake_word_threshold: float = 0.35
+    # Descarta lo que se oiga durante una respuesta solo si es su eco; la voz del usuario la interrumpe
+    ignore_audio_while_speaking: bool = True
+    playback_tail_ms: int = 300
+    trim_silence: bool = True
+    silence_threshold_db: float = -35.0
+    silence_padding_ms: int = 200
+    normalize_gain: bool = True
+    target_rms_db: float = -20.0
+    asr_batching: bool = False
+    asr_max_batch_size: int = 8
+    asr_max_wait_ms: int = 10
+    incremental_asr: bool = False
+    partial_interval_ms: int = 400
+    partial_window_seconds: float = 6.0
+    early_commit_stable_partials: int = 2
+    early_commit_intents: Tuple[str, ...] = ("open_application", "system_control", "media_control", "information")
+
+@dataclass
+class VoiceConfig:
+    """Configuración de síntesis de voz"""
+    use_vibevoice: bool = True
+    fallback_to_coqui: bool = True
+    voice_rate: int = 150
+    voice_volume: float = 0.9
+    audio_cache_size: int = 64
+    audio_cache_dir: Optional[str] = None
+    streaming_synthesis: bool = True
+    streaming_min_chars: int = 60
+    streaming_chunk_chars: int = 120
+
+@dataclass
+class SystemConfig:
+    """Configuración del sistema"""
+    applications: Dict[str, str] = None
+    web_search_engine: str = "https://www.google.com/search?q={}"
+    require_confirmation: bool = False
+    async_actions: bool = True
+    action_workers: int = 4
+    action_timeout: float = 10.0
+
+@dataclass
+class MetricsConfig:
+    """Configuración de métricas de latencia"""
+    enabled: bool = False
+    jsonl_path: Optional[str] = None
+    prometheus_port: Optional[int] = None
+
+@dataclass
+class HistoryConfig:
+    """Configuración del historial de comandos"""
+    enabled: bool = True
+    path: str = os.path.join(os.path.expanduser("~"), ".local", "share", "jarvis", "history.db")
+    batch_size: int = 64
+    flush_interval: float = 1.0
+    recent_size: int = 100
+
+@dataclass
+class RuntimeConfig:
+    """Configuración del runtime asíncrono por etapas"""
+    async_pipeline: bool = True
+    stage_queue_size: int = 2
+    max_command_age: float = 10.0
+    drop_policy: str = "drop_oldest"
+    core_workers: int = 2
+    intent_cache_size: int = 256
+    concurrent_core_stages: bool = True
+    speculative_synthesis: bool = False
+    model_processes: bool = False
+    worker_health_interval: float = 5.0
+    worker_start_timeout: float = 300.0
+    # Pool de modelos: 0 desactiva el límite de memoria y la descarga por inactividad
+    model_memory_budget_mb: float = 0
+    model_idle_unload_seconds: float = 0
+
+@dataclass
+class ServerConfig:
+    """Configuración del modo servidor local"""
+    host: str = "127.0.0.1"
+    port: int = 8765
+    max_frame_bytes: int = 16 * 1024 * 1024
+    # Token de sesión (permisos 0600): solo el usuario que lanzó el servidor puede leerlo y conectarse
+    token_path: str = os.path.join(os.path.expanduser("~"), ".local", "share", "jarvis", "server.token")
+
+@dataclass
+class JarvisConfig:
+    """Configuración principal de JARVIS"""
+    speech: SpeechConfig = None
+    voice: VoiceConfig = None
+    system: SystemConfig = None
+    metrics: MetricsConfig = None
+    runtime: RuntimeConfig = None
+    history: HistoryConfig = None
+    server: ServerConfig = None
+    
+    def __post_init__(self):
+        if self.speech is None:
+            self.speech = SpeechConfig()
+        if self.voice is None:
+            self.voice = VoiceConfig()
+        if self.metrics is None:
+            self.metrics = MetricsConfig()
+        if self.runtime is None:
+            self.runtime = RuntimeConfig()
+        if self.history is None:
+            self.history = HistoryConfig()
+        if self.server is None:
+            self.server = ServerConfig()
+        if self.system is None:
+            self.system = SystemConfig(
+                applications={
+                    "calculadora": "calc",
+                    "notepad": "notepad",
+                    "explorador": "explorer",
+                    "chrome": "chrome",
+                    "spotify": "spotify"
+                }
+            )
+
+# Configuración por defecto
 DEFAULT_CONFIG = JarvisConfig()
\ No newline at end of file
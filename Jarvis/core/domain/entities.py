@@ -1,54 +1,68 @@
-"""
-Entidades del dominio - Core de JARVIS
-"""
-from dataclasses import dataclass
-from typing import Optional, Dict, Any
-from enum import Enum
-
-class CommandType(Enum):
-    """Tipos de comandos disponibles"""
-    OPEN_APPLICATION = "open_application"
-    SEARCH_WEB = "search_web"
-    SYSTEM_CONTROL = "system_control"
-    MEDIA_CONTROL = "media_control"
-    INFORMATION = "information"
-    GREETING = "greeting"
-    EXIT = "exit"
-
-class SentimentType(Enum):
-    """Tipos de sentimientos"""
-    POSITIVE = "positive"
-    NEGATIVE = "negative"
-    NEUTRAL = "neutral"
-
-@dataclass
-class VoiceCommand:
-    """Comando de voz del usuario"""
-    text: str
-    confidence: float
-    timestamp: float
-    sentiment: Optional[SentimentType] = None
-
-@dataclass
-class CommandIntent:
-    """Intención del comando"""
-    command_type: CommandType
-    target: Optional[str] = None
-    parameters: Optional[Dict[str, Any]] = None
-    confidence: float = 0.0
-
-@dataclass
-class VoiceResponse:
-    """Respuesta de voz de JARVIS"""
-    text: str
-    audio_data: Optional[bytes] = None
-    emotion: Optional[str] = None
-    priority: int = 1
-
-@dataclass
-class SystemAction:
-    """Acción del sistema a ejecutar"""
-    action_type: str
-    target: str
-    parameters: Optional[Dict[str, Any]] = None
-    requires_confirmation: bool = False
+"""
+Entidades del dominio - Core de JARVIS
+"""
+from dataclasses import dataclass
+from typing import Optional, Dict, Any
+from enum import Enum
+
+class CommandType(Enum):
+    """Tipos de comandos disponibles"""
+    OPEN_APPLICATION = "open_application"
+    SEARCH_WEB = "search_web"
+    SYSTEM_CONTROL = "system_control"
+    MEDIA_CONTROL = "media_control"
+    INFORMATION = "information"
+    GREETING = "greeting"
+    EXIT = "exit"
+
+class SentimentType(Enum):
+    """Tipos de sentimientos"""
+    POSITIVE = "positive"
+    NEGATIVE = "negative"
+    NEUTRAL = "neutral"
+
+@dataclass
+class VoiceCommand:
+    """Comando de voz del usuario"""
+    text: str
+    confidence: float
+    timestamp: float
+    sentiment: Optional[SentimentType] = None
+
+@dataclass
+class CommandIntent:
+    """Intención del comando"""
+    command_type: CommandType
+    target: Optional[str] = None
+    parameters: Optional[Dict[str, Any]] = None
+    confidence: float = 0.0
+    # False cuando ningún patrón reconoce el comando (la confianza puede ser 0.0 en comandos válidos)
+    recognized: bool = True
+
+@dataclass
+class VoiceResponse:
+    """Respuesta de voz de JARVIS"""
+    text: str
+    audio_data: Optional[bytes] = None
+    emotion: Optional[str] = None
+    priority: int = 1
+
+@dataclass
+class SystemAction:
+    """Acción del sistema a ejecutar"""
+    action_type: str
+    target: str
+    parameters: Optional[Dict[str, Any]] = None
+    requires_confirmation: bool = False
+
+@dataclass
+class CommandContext:
+    """Resultados compartidos entre las etapas del pipeline de un comando"""
+    command: VoiceCommand
+    normalized_text: str = ""
+    intent: Optional[CommandIntent] = None
+    sentiment: Optional[SentimentType] = None
+    response: Optional[VoiceResponse] = None
+    action: Optional[SystemAction] = None
+    action_result: Optional[bool] = None
+    action_future: Optional[Any] = None
@@ -1,100 +1,331 @@
-"""
-Servicios del dominio - Lógica de negocio
-"""
-from abc import ABC, abstractmethod
-from typing import List, Optional
-from .entities import VoiceCommand, CommandIntent, VoiceResponse, SystemAction, CommandType, SentimentType
-
-class CommandProcessor(ABC):
-    """Procesador de comandos - Puerto de entrada"""
-    
-    @abstractmethod
-    def process_command(self, command: VoiceCommand) -> CommandIntent:
-        """Procesa un comando de voz y retorna la intención"""
-        pass
-
-class IntentAnalyzer(ABC):
-    """Analizador de intenciones - Puerto de entrada"""
-    
-    @abstractmethod
-    def analyze_intent(self, command: VoiceCommand) -> CommandIntent:
-        """Analiza la intención del comando"""
-        pass
-
-class ResponseGenerator(ABC):
-    """Generador de respuestas - Puerto de salida"""
-    
-    @abstractmethod
-    def generate_response(self, intent: CommandIntent, context: Optional[dict] = None) -> VoiceResponse:
-        """Genera una respuesta basada en la intención"""
-        pass
-
-class ActionExecutor(ABC):
-    """Ejecutor de acciones - Puerto de salida"""
-    
-    @abstractmethod
-    def execute_action(self, action: SystemAction) -> bool:
-        """Ejecuta una acción del sistema"""
-        pass
-
-class JarvisCore:
-    """Núcleo principal de JARVIS - Orquestador"""
-    
-    def __init__(
-        self,
-        command_processor: CommandProcessor,
-        intent_analyzer: IntentAnalyzer,
-        response_generator: ResponseGenerator,
-        action_executor: ActionExecutor
-    ):
-        self.command_processor = command_processor
-        self.intent_analyzer = intent_analyzer
-        self.response_generator = response_generator
-        self.action_executor = action_executor
-    
-    def handle_voice_command(self, command: VoiceCommand) -> VoiceResponse:
-        """Maneja un comando de voz completo"""
-        # 1. Procesar comando
-        intent = self.command_processor.process_command(command)
-        
-        # 2. Analizar intención
-        analyzed_intent = self.intent_analyzer.analyze_intent(command)
-        
-        # 3. Generar respuesta
-        response = self.response_generator.generate_response(analyzed_intent)
-        
-        # 4. Ejecutar acción si es necesaria
-        if analyzed_intent.command_type != CommandType.GREETING:
-            action = self._create_system_action(analyzed_intent)
-            if action:
-                self.action_executor.execute_action(action)
-        
-        return response
-    
-    def _create_system_action(self, intent: CommandIntent) -> Optional[SystemAction]:
-        """Crea una acción del sistema basada en la intención"""
-        if intent.command_type == CommandType.OPEN_APPLICATION:
-            return SystemAction(
-                action_type="open_application",
-                target=intent.target or "",
-                parameters=intent.parameters
-            )
-        elif intent.command_type == CommandType.SEARCH_WEB:
-            return SystemAction(
-                action_type="search_web",
-                target=intent.target or "",
-                parameters=intent.parameters
-            )
-        elif intent.command_type == CommandType.SYSTEM_CONTROL:
-            return SystemAction(
-                action_type="system_control",
-                target=intent.target or "",
-                parameters=intent.parameters
-            )
-        elif intent.command_type == CommandType.MEDIA_CONTROL:
-            return SystemAction(
-                action_type="media_control",
-                target=intent.target or "",
-                parameters=intent.parameters
-            )
-        return None
+"""
+Servicios del dominio - Lógica de negocio
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from typing import Callable, Iterable, List, Optional, Tuple
+from .entities import VoiceCommand, CommandIntent, VoiceResponse, SystemAction, CommandType, SentimentType, CommandContext
+from .repositories import CommandRepository, IntentRepository
+
+class CommandProcessor(ABC):
+    """Procesador de comandos - Puerto de entrada"""
+    
+    @abstractmethod
+    def process_command(self, command: VoiceCommand) -> CommandIntent:
+        """Procesa un comando de voz y retorna la intención"""
+        pass
+
+class IntentAnalyzer(ABC):
+    """Analizador de intenciones - Puerto de entrada"""
+    
+    @abstractmethod
+    def analyze_intent(self, command: VoiceCommand) -> CommandIntent:
+        """Analiza la intención del comando"""
+        pass
+    
+    def analyze_sentiment(self, command: VoiceCommand) -> SentimentType:
+        """Analiza el sentimiento del comando"""
+        return SentimentType.NEUTRAL
+
+class ResponseGenerator(ABC):
+    """Generador de respuestas - Puerto de salida"""
+    
+    @abstractmethod
+    def generate_response(self, intent: CommandIntent, context: Optional[dict] = None) -> VoiceResponse:
+        """Genera una respuesta basada en la intención"""
+        pass
+    
+    def prerender_response(self, intent: CommandIntent, context: Optional[dict] = None) -> bool:
+        """Prepara por adelantado la respuesta de una intención probable; por defecto no hace nada"""
+        return False
+
+class ActionExecutor(ABC):
+    """Ejecutor de acciones - Puerto de salida"""
+    
+    # submit_action ejecuta la acción antes de retornar (el núcleo puede lanzarla en su propio hilo)
+    runs_inline = True
+    
+    @abstractmethod
+    def execute_action(self, action: SystemAction) -> bool:
+        """Ejecuta una acción del sistema"""
+        pass
+    
+    def submit_action(self, action: SystemAction) -> "Future[bool]":
+        """Lanza una acción y retorna un futuro; por defecto se ejecuta en línea"""
+        future: "Future[bool]" = Future()
+        try:
+            future.set_result(self.execute_action(action))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+class MetricsRecorder(ABC):
+    """Registro de latencias por etapa - Puerto de salida"""
+    
+    enabled = True
+    
+    @abstractmethod
+    def observe(self, stage: str, seconds: float):
+        """Registra la duración de una etapa"""
+        pass
+    
+    def timer(self, stage: str) -> "StageTimer":
+        """Context manager que mide un bloque y lo registra"""
+        return StageTimer(self, stage)
+
+class StageTimer:
+    """Cronómetro de una etapa"""
+    
+    def __init__(self, recorder: MetricsRecorder, stage: str):
+        self.recorder = recorder
+        self.stage = stage
+        self.started = 0.0
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        self.recorder.observe(self.stage, time.perf_counter() - self.started)
+        return False
+
+class _NullTimer:
+    """Cronómetro sin efecto para cuando las métricas están deshabilitadas"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+class NullMetricsRecorder(MetricsRecorder):
+    """Métricas deshabilitadas: sin coste por etapa"""
+    
+    enabled = False
+    _timer = _NullTimer()
+    
+    def observe(self, stage: str, seconds: float):
+        pass
+    
+    def timer(self, stage: str) -> _NullTimer:
+        return self._timer
+
+class JarvisCore:
+    """Núcleo principal de JARVIS - Orquestador"""
+    
+    STAGES = ("normalize", "intent", "sentiment", "response", "action", "persist")
+    
+    # Nadie consume el sentimiento por defecto; se activa quitándolo de esta lista
+    DEFAULT_SKIPPED_STAGES = frozenset({"sentiment"})
+    
+    def __init__(
+        self,
+        command_processor: CommandProcessor,
+        intent_analyzer: IntentAnalyzer,
+        response_generator: ResponseGenerator,
+        action_executor: ActionExecutor,
+        skip_stages: Optional[Iterable[str]] = None,
+        metrics: Optional[MetricsRecorder] = None,
+        command_repository: Optional[CommandRepository] = None,
+        intent_repository: Optional[IntentRepository] = None,
+        concurrent_stages: bool = False,
+        speculative_synthesis: bool = False
+    ):
+        self.command_processor = command_processor
+        self.intent_analyzer = intent_analyzer
+        self.response_generator = response_generator
+        self.action_executor = action_executor
+        self.skip_stages = frozenset(self.DEFAULT_SKIPPED_STAGES if skip_stages is None else skip_stages)
+        self.metrics = metrics or NullMetricsRecorder()
+        self.command_repository = command_repository
+        self.intent_repository = intent_repository
+        # Se notifican al terminar (o fallar) cada acción, aunque la respuesta ya se haya dado
+        self.action_listeners: List[Callable[[CommandContext], None]] = []
+        self.concurrent_stages = concurrent_stages
+        self.speculative_synthesis = speculative_synthesis
+        self._dispatcher: Optional[ThreadPoolExecutor] = None
+        if concurrent_stages:
+            self._dispatcher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="jarvis-core")
+        # Hilo propio para la síntesis especulativa: no ocupa el despacho de acciones y, como atiende
+        # un render a la vez, los que queden superados en la cola se descartan sin ejecutarse
+        self._speculative: Optional[ThreadPoolExecutor] = None
+        self._speculation_generation = 0
+        self._speculation_lock = threading.Lock()
+        if speculative_synthesis:
+            self._speculative = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jarvis-speculative")
+        
+        # Respuesta y acción solo dependen de la intención: en modo concurrente la acción se lanza
+        # primero y la síntesis avanza mientras se ejecuta
+        response_and_action = [("response", self._response_stage), ("action", self._action_stage)]
+        if concurrent_stages:
+            response_and_action.reverse()
+        self._stages: List[Tuple[str, Callable[[CommandContext], None]]] = [
+            ("normalize", self._normalize_stage),
+            ("intent", self._intent_stage),
+            ("sentiment", self._sentiment_stage),
+            *response_and_action,
+            ("persist", self._persist_stage)
+        ]
+    
+    def handle_voice_command(self, command: VoiceCommand) -> VoiceResponse:
+        """Maneja un comando de voz completo"""
+        return self.run_pipeline(command).response
+    
+    def run_pipeline(self, command: VoiceCommand, skip_stages: Optional[Iterable[str]] = None) -> CommandContext:
+        """Ejecuta las etapas en orden; cada resultado se calcula una vez y se comparte"""
+        skipped = self.skip_stages if skip_stages is None else frozenset(skip_stages)
+        context = CommandContext(command=command)
+        
+        metrics = self.metrics if self.metrics.enabled else None
+        for name, stage in self._stages:
+            if name in skipped:
+                continue
+            if metrics:
+                started = time.perf_counter()
+                stage(context)
+                metrics.observe(name, time.perf_counter() - started)
+            else:
+                stage(context)
+        
+        return context
+    
+    def _normalize_stage(self, context: CommandContext):
+        """1. Normaliza el texto una sola vez para todas las etapas"""
+        context.normalized_text = " ".join(context.command.text.lower().split())
+        context.command = replace(context.command, text=context.normalized_text)
+    
+    def _intent_stage(self, context: CommandContext):
+        """2. Resuelve la intención y su objetivo con el procesador de comandos"""
+        intent = self.command_processor.process_command(context.command)
+        
+        # El analizador por palabras clave solo se consulta si los patrones no reconocen el comando
+        if not intent.recognized:
+            intent = self.intent_analyzer.analyze_intent(context.command)
+        
+        context.intent = intent
+        if self.speculative_synthesis and intent.recognized:
+            # La síntesis arranca ya; la etapa de respuesta encontrará el audio en caché
+            self._prerender(intent, context.normalized_text)
+    
+    def _sentiment_stage(self, context: CommandContext):
+        """3. Analiza el sentimiento (opcional)"""
+        context.sentiment = self.intent_analyzer.analyze_sentiment(context.command)
+        context.command.sentiment = context.sentiment
+    
+    def _response_stage(self, context: CommandContext):
+        """4. Genera la respuesta con la intención ya resuelta"""
+        self.generate_response(context)
+    
+    def generate_response(self, context: CommandContext) -> VoiceResponse:
+        """Genera la respuesta de un contexto ya resuelto (permite diferir la síntesis)"""
+        context.response = self.response_generator.generate_response(
+            context.intent,
+            {"text": context.normalized_text, "sentiment": context.sentiment}
+        )
+        return context.response
+    
+    def speculate(self, command: VoiceCommand) -> Optional[Future]:
+        """Modo especulativo: pre-sintetiza la respuesta probable en cuanto el tipo de comando coincide"""
+        if not self.speculative_synthesis:
+            return None
+        
+        context = CommandContext(command=command)
+        self._normalize_stage(context)
+        intent = self.command_processor.process_command(context.command)
+        if not intent.recognized:
+            return None
+        return self._prerender(intent, context.normalized_text)
+    
+    def _prerender(self, intent: CommandIntent, text: str) -> Future:
+        """La respuesta real reutiliza el audio cacheado (o espera a que termine este render)"""
+        with self._speculation_lock:
+            self._speculation_generation += 1
+            generation = self._speculation_generation
+        return self._speculative.submit(self._run_prerender, generation, intent, text)
+    
+    def _run_prerender(self, generation: int, intent: CommandIntent, text: str) -> bool:
+        """Solo se sintetiza la hipótesis más reciente"""
+        if generation != self._speculation_generation:
+            return False
+        return self.response_generator.prerender_response(intent, {"text": text, "sentiment": None})
+    
+    def shutdown(self):
+        """Detiene los hilos de despacho y de síntesis especulativa del núcleo"""
+        for executor in (self._dispatcher, self._speculative):
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _action_stage(self, context: CommandContext):
+        """5. Ejecuta la acción del sistema si es necesaria"""
+        if context.intent.command_type == CommandType.GREETING:
+            return
+        
+        context.action = self._create_system_action(context.intent)
+        if not context.action:
+            return
+        
+        # Con un ejecutor asíncrono la acción sigue en curso mientras se responde
+        started = time.perf_counter()
+        if self.concurrent_stages and self.action_executor.runs_inline:
+            context.action_future = self._dispatcher.submit(self.action_executor.execute_action, context.action)
+        else:
+            context.action_future = self.action_executor.submit_action(context.action)
+        context.action_future.add_done_callback(
+            lambda future: self._on_action_completed(context, future, started)
+        )
+    
+    def _persist_stage(self, context: CommandContext):
+        """6. Guarda el comando y su intención en el historial (si hay repositorios)"""
+        repository = self.command_repository
+        if context.intent and repository is self.intent_repository and hasattr(repository, "save_interaction"):
+            # Mismo almacén: comando e intención en la misma transacción, enlazados
+            repository.save_interaction(context.command, context.intent)
+            return
+        if self.command_repository:
+            self.command_repository.save_command(context.command)
+        if self.intent_repository and context.intent:
+            self.intent_repository.save_intent(context.intent)
+    
+    def _on_action_completed(self, context: CommandContext, future: Future, started: float):
+        """Registra el resultado de una acción y avisa a los interesados"""
+        try:
+            context.action_result = bool(future.result())
+        except Exception as e:
+            print(f"❌ La acción {context.action.action_type} falló: {e}")
+            context.action_result = False
+        
+        if self.metrics.enabled:
+            self.metrics.observe("action_completion", time.perf_counter() - started)
+        for listener in self.action_listeners:
+            listener(context)
+    
+    def _create_system_action(self, intent: CommandIntent) -> Optional[SystemAction]:
+        """Crea una acción del sistema basada en la intención"""
+        if intent.command_type == CommandType.OPEN_APPLICATION:
+            return SystemAction(
+                action_type="open_application",
+                target=intent.target or "",
+                parameters=intent.parameters
+            )
+        elif intent.command_type == CommandType.SEARCH_WEB:
+            return SystemAction(
+                action_type="search_web",
+                target=intent.target or "",
+                parameters=intent.parameters
+            )
+        elif intent.command_type == CommandType.SYSTEM_CONTROL:
+            return SystemAction(
+                action_type="system_control",
+                target=intent.target or "",
+                parameters=intent.parameters
+            )
+        elif intent.command_type == CommandType.MEDIA_CONTROL:
+            return SystemAction(
+                action_type="media_control",
+                target=intent.target or "",
+                parameters=intent.parameters
+            )
+        return None
@@ -0,0 +1,10 @@
+import sys
+import os
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from application.jarvis_server import main
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file